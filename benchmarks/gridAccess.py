@@ -0,0 +1,60 @@
+""" Compares the per call cost of the dispatching GameGrid.get with the plain cell accessors.
+
+Run with ``python -m benchmarks.gridAccess``.
+"""
+from time import perf_counter
+from typing import Callable
+
+from game.gameGrid import GameGrid
+from game.pose import Pose
+
+
+def time_per_call(function: Callable[[], object], calls: int) -> float:
+    """
+    :return: Nanoseconds per call of a function that makes `calls` lookups
+    """
+    start_time = perf_counter()
+    function()
+    return (perf_counter() - start_time) / calls * 1e9
+
+
+def main():
+    size = 100
+    grid = GameGrid(size, size)
+    poses = [Pose(x, y) for x in range(size) for y in range(size)]
+    cells = [(x, y) for x in range(size) for y in range(size)]
+    rounds = 20
+    calls = rounds * len(cells)
+
+    def get_pose():
+        for _ in range(rounds):
+            for pose in poses:
+                grid.get(pose)
+
+    def cell_at():
+        for _ in range(rounds):
+            for pose in poses:
+                grid.cell_at(pose)
+
+    def get_xy():
+        for _ in range(rounds):
+            for x, y in cells:
+                grid.get(x, y)
+
+    def cell():
+        for _ in range(rounds):
+            for x, y in cells:
+                grid.cell(x, y)
+
+    def rect():
+        for _ in range(rounds):
+            grid.cells_in_rect(0, 0, size, size)
+
+    print(f'{"accessor":<22}{"ns/cell":>10}')
+    for name, function in [('get(pose)', get_pose), ('cell_at(pose)', cell_at), ('get(x, y)', get_xy),
+                           ('cell(x, y)', cell), ('cells_in_rect', rect)]:
+        print(f'{name:<22}{time_per_call(function, calls):>10.1f}')
+
+
+if __name__ == '__main__':
+    main()
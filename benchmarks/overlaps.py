@@ -0,0 +1,54 @@
+""" Compares the batched overlap pass of GameGrid with calling overlaps on every object in the same cells,
+on a spike field covering thousands of players.
+
+Run with ``python -m benchmarks.overlaps``.
+"""
+from time import perf_counter
+
+from game.gameGrid import GameGrid
+from game.player import Player
+from game.pose import Pose
+from game.spike import Spike
+
+
+def spike_field(size: int, component_store: bool = False) -> GameGrid:
+    """
+    :return: Grid with a spike and a player on every cell
+    """
+    grid = GameGrid(size, size, component_store=component_store)
+    for x in range(size):
+        for y in range(size):
+            grid.add(Spike(damage=1, pose=Pose(x, y)))
+            grid.add(Player(Pose(x, y)))
+    return grid
+
+
+def per_object(grid: GameGrid) -> None:
+    """ The overlap pass before it was batched
+    """
+    for x, y in grid.active_cells:
+        others = grid.cell(x, y)
+        for element in tuple(others):
+            if type(element).has_overlap_effect():
+                element.overlaps(others)
+
+
+def main():
+    rounds = 20
+    print(f'{"players":>8}{"store":>7}{"per object ms":>16}{"batched ms":>12}')
+    for size in (10, 30, 70):
+        for component_store in (False, True):
+            grid = spike_field(size, component_store)
+            start_time = perf_counter()
+            for _ in range(rounds):
+                per_object(grid)
+            looped = (perf_counter() - start_time) / rounds
+            start_time = perf_counter()
+            for _ in range(rounds):
+                grid._resolve_overlaps()
+            batched = (perf_counter() - start_time) / rounds
+            print(f'{size * size:>8}{str(component_store):>7}{looped * 1000:>16.2f}{batched * 1000:>12.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+""" Compares A* and Jump Point Search on the game map and on synthetic open arenas.
+Both must return paths of the same length. Expansions are the nodes taken off the heap, summed over all queries.
+
+Run with ``python -m benchmarks.pathFinding``.
+"""
+from time import perf_counter
+from typing import Dict, List, Tuple
+
+import numpy as np
+from PIL import Image as PILImage
+
+from game.math import a_star, DiscretePoint, PathFindingError
+from game.resources import get_resource_path
+
+
+def load_map(relative_path: str) -> np.ndarray:
+    """ Loads a map image the same way as add_from_image, black pixels are walls.
+
+    :param relative_path: Path of the image relative to the resources folder
+    :return: 2D boolean array indexed [x, y], True where there is no wall
+    """
+    walls = np.asarray(PILImage.open(get_resource_path(relative_path))) == 0
+    return ~walls[::-1].T
+
+
+def open_arena(size: int, pillars: float, seed: int = 0) -> np.ndarray:
+    """ Square map with scattered 3x3 pillars.
+
+    :param size: Width and height of the arena
+    :param pillars: Fraction of the arena covered by pillars
+    :param seed: Seed for the pillar positions
+    :return: 2D boolean array indexed [x, y], True where there is no wall
+    """
+    random_state = np.random.RandomState(seed)
+    passable = np.ones((size, size), dtype=bool)
+    for _ in range(int(size * size * pillars / 9)):
+        x, y = random_state.randint(0, size - 3, 2)
+        passable[x:x + 3, y:y + 3] = False
+    return passable
+
+
+def random_queries(passable: np.ndarray, count: int, seed: int = 0) -> List[Tuple[DiscretePoint, DiscretePoint]]:
+    """
+    :return: Pairs of distinct passable cells
+    """
+    random_state = np.random.RandomState(seed)
+    cells = np.argwhere(passable)
+    queries = []
+    while len(queries) < count:
+        (sx, sy), (tx, ty) = cells[random_state.randint(len(cells), size=2)]
+        if (sx, sy) != (tx, ty):
+            queries.append((DiscretePoint(int(sx), int(sy)), DiscretePoint(int(tx), int(ty))))
+    return queries
+
+
+def run(passable: np.ndarray, queries: List[Tuple[DiscretePoint, DiscretePoint]], jump_points: bool) -> Dict:
+    """
+    :return: Total expansions, total seconds, path lengths (None where unreachable)
+    """
+    expansions = 0
+    lengths = []
+    start_time = perf_counter()
+    for start, target in queries:
+        stats = {}
+        try:
+            lengths.append(len(a_star(start, target, passable, jump_points=jump_points, stats=stats)))
+        except PathFindingError:
+            lengths.append(None)
+        expansions += stats.get('expansions', 0)
+    return {'expansions': expansions, 'seconds': perf_counter() - start_time, 'lengths': lengths}
+
+
+def main():
+    game_map = load_map('map.png')
+    maps = {
+        'map.png': game_map,
+        'map.png tiled 4x4': np.tile(game_map, (4, 4)),
+        'open arena 100': open_arena(100, 0.02),
+        'open arena 300': open_arena(300, 0.02),
+        'pillared arena 300': open_arena(300, 0.15),
+    }
+    print(f'{"map":<20}{"A* exp":>12}{"JPS exp":>12}{"ratio":>8}{"A* ms":>10}{"JPS ms":>10}')
+    for name, passable in maps.items():
+        queries = random_queries(passable, 50)
+        baseline = run(passable, queries, jump_points=False)
+        jump_point = run(passable, queries, jump_points=True)
+        assert baseline['lengths'] == jump_point['lengths'], f'Path lengths differ on {name}'
+        print(f'{name:<20}{baseline["expansions"]:>12}{jump_point["expansions"]:>12}'
+              f'{baseline["expansions"] / max(1, jump_point["expansions"]):>8.1f}'
+              f'{baseline["seconds"] * 1000:>10.1f}{jump_point["seconds"] * 1000:>10.1f}')
+
+
+if __name__ == '__main__':
+    main()
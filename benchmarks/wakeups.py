@@ -0,0 +1,47 @@
+""" Compares ticks of a grid full of parked drones and a few moving ones, with the drones updated every frame and
+with them woken by the grid's WakeupScheduler.
+
+Run with ``python -m benchmarks.wakeups``.
+"""
+from collections import deque
+from time import perf_counter
+
+from game.drone import Drone
+from game.gameGrid import GameGrid
+from game.pose import Pose
+
+
+def drone_field(idle: int, active: int, every_frame: bool) -> GameGrid:
+    """
+    :return: Grid with `idle` drones without a path, and `active` drones going back and forth
+    """
+    grid = GameGrid(100, 100)
+    for i in range(idle):
+        drone = Drone(Pose(i % 100, 2 + i // 100))
+        drone.update_every_frame = every_frame
+        grid.add(drone)
+    for i in range(active):
+        drone = Drone(Pose(i, 0), path=deque([Pose(i, 0), Pose(i, 1)]), wrap=True)
+        drone.update_every_frame = every_frame
+        grid.add(drone)
+    return grid
+
+
+def main():
+    ticks = 100
+    print(f'{"idle":>8}{"active":>8}{"every frame ms":>16}{"woken ms":>10}')
+    for idle in (100, 1000, 5000):
+        for active in (10, 100):
+            times = []
+            for every_frame in (True, False):
+                grid = drone_field(idle, active, every_frame)
+                grid.update()
+                start_time = perf_counter()
+                for _ in range(ticks):
+                    grid.update()
+                times.append((perf_counter() - start_time) / ticks)
+            print(f'{idle:>8}{active:>8}{times[0] * 1000:>16.2f}{times[1] * 1000:>10.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -1 +1,5 @@
-from game.__main__ import main as run_game
+def run_game():
+    """ Opens the game window. Imported lazily so the engine can be used without a display, see game.headless.
+    """
+    from game.__main__ import main
+    main()
@@ -1,20 +1,30 @@
 from abc import ABC
 from collections import deque
-from typing import Optional, Union, List
+from enum import Enum, auto
+from typing import Callable, Optional, Union, List, Tuple
 
 from pyglet import shapes
 from pyglet.shapes import ShapeBase
 from pyglet.sprite import Sprite
 
 from game.camera import Camera
+from game.componentStore import StoredField
 from game.constants import GRID_WIDTH, GRID_HEIGHT
+from game.dStarLite import DStarLite
 from game.gridDrawable import GridDrawable
-from game.gridObject import GridObject
-from game.math import a_star, PathFindingError
+from game.gridObject import GridObject, OverlapEffect
+from game.headless import is_headless
+from game.hierarchicalPathFinding import HierarchicalPath
+from game.math import PathFindingError
 from game.pose import Pose
 
 
 class AttrHealthy(GridDrawable, ABC):
+    overlap_target = True
+    # Kept in the grid's ComponentStore, if it has one
+    _health = StoredField('health')
+    max_health = StoredField('max_health')
+
     def __init__(self, health: int, max_health: Optional[int] = None, draw_health_bar: bool = True, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self._health = health
@@ -23,9 +33,12 @@ class AttrHealthy(GridDrawable, ABC):
             self.max_health = health
         else:
             self.max_health = max_health
+        self._draw_health_bar = draw_health_bar
+        self.health_bar: Optional[shapes.Line] = None
+        if is_headless():
+            return
         self.health_bar = shapes.Line(0, 0, 0, 0, width=5, color=(255, 0, 0))
         self.health_bar.opacity = 150
-        self._draw_health_bar = draw_health_bar
         self.draw_health_bar = draw_health_bar
 
         self.health_bar.x = self.texture_size * self.pose.x
@@ -56,7 +69,8 @@ class AttrHealthy(GridDrawable, ABC):
     @draw_health_bar.setter
     def draw_health_bar(self, value: bool):
         self._draw_health_bar = value
-        self.health_bar.visible = value
+        if self.health_bar is not None:
+            self.health_bar.visible = value
 
     def __update(self, camera: Camera):
         """ Updates the visual properties of this sprite.
@@ -66,26 +80,29 @@ class AttrHealthy(GridDrawable, ABC):
             - Dunder naming is used to avoid name conflicts with subclasses.
             - This method is called automatically when the sprite is drawn.
         """
+        x, y = self.render_position()
         if self.health <= self.max_health:
-            self.health_bar.x = self.texture_size * (self.pose.x - 0.5) \
+            self.health_bar.x = self.texture_size * (x - 0.5) \
                                 - (camera.pose.x - GRID_WIDTH / 2) * self.texture_size
-            self.health_bar.x2 = self.texture_size * (self.pose.x - 0.5) \
+            self.health_bar.x2 = self.texture_size * (x - 0.5) \
                                  + (self.texture_size * (self.health / self.max_health)) \
                                  - (camera.pose.x - GRID_WIDTH / 2) * self.texture_size
         else:  # Centered here looks better
             shift = self.texture_size * (self.health / self.max_health - 1) / 2
-            self.health_bar.x = self.texture_size * (self.pose.x - 0.5) - shift \
+            self.health_bar.x = self.texture_size * (x - 0.5) - shift \
                                 - (camera.pose.x - GRID_WIDTH / 2) * self.texture_size
-            self.health_bar.x2 = self.texture_size * (self.pose.x - 0.5) + self.texture_size + shift \
+            self.health_bar.x2 = self.texture_size * (x - 0.5) + self.texture_size + shift \
                                  - (camera.pose.x - GRID_WIDTH / 2) * self.texture_size
-        self.health_bar.y = self.texture_size * (self.pose.y - 0.5) + self.health_bar._width / 2 \
+        self.health_bar.y = self.texture_size * (y - 0.5) + self.health_bar._width / 2 \
                             - (camera.pose.y - GRID_HEIGHT / 2) * self.texture_size
         self.health_bar.y2 = self.health_bar.y
 
     def get_sprites(self) -> list[Union[Sprite, ShapeBase]]:
-        return super().get_sprites() + [self.health_bar]
+        return super().get_sprites() + ([] if self.health_bar is None else [self.health_bar])
 
     def draw(self, camera: Camera, dt: float):
+        if self.health_bar is None:
+            return
         if self.draw_health_bar:
             self.__update(camera)
         super().draw(camera, dt)
@@ -94,6 +111,8 @@ class AttrHealthy(GridDrawable, ABC):
 
 
 class AttrHarmful(GridObject, ABC):
+    damage = StoredField('damage')
+
     def __init__(self, damage: float, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.damage = damage
@@ -106,15 +125,46 @@ class AttrHarmful(GridObject, ABC):
             if isinstance(other, AttrHealthy):
                 self.attack(other)
 
+    @classmethod
+    def batched_effect(cls) -> Optional[OverlapEffect]:
+        # Subclasses that change how they attack have to be called one by one
+        if cls.overlaps is AttrHarmful.overlaps and cls.attack is AttrHarmful.attack:
+            return OverlapEffect.DAMAGE
+        return None
+
 
 class AttrHealing(GridObject, ABC):
+    healing = StoredField('healing')
+
     def __init__(self, healing: float, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.healing = healing
         self.is_path_following = False
 
     def heal(self, other: AttrHealthy) -> None:
-        other.health += self.healing
+        other.health = min(other.max_health, other.health + self.healing)
+
+    def overlaps(self, others: List['GridObject']) -> None:
+        for other in others:
+            if isinstance(other, AttrHealthy):
+                self.heal(other)
+
+    @classmethod
+    def batched_effect(cls) -> Optional[OverlapEffect]:
+        # Subclasses that change how they heal have to be called one by one
+        if cls.overlaps is AttrHealing.overlaps and cls.heal is AttrHealing.heal:
+            return OverlapEffect.HEALING
+        return None
+
+
+class PathFindingStrategy(Enum):
+    """ How AttrPathFinding objects plan their paths.
+    """
+    A_STAR = auto()  # Full A* search every time
+    FLOW_FIELD = auto()  # Next step read from a flow field shared by every agent with the same target
+    INCREMENTAL = auto()  # D* Lite search kept between updates, only the changes are repaired
+    HIERARCHICAL = auto()  # HPA* over map clusters, tiles are worked out one segment at a time
+    SCHEDULED = auto()  # A* spread over several ticks by the grid's PathFindingScheduler, keeps the old path meanwhile
 
 
 class AttrPathFinding(GridObject, ABC):
@@ -125,6 +175,13 @@ class AttrPathFinding(GridObject, ABC):
         self.is_path_following = False
         self.actively_path_finding = False
         self.active_path_finding_target = None
+        self.active_path_finding_strategy = PathFindingStrategy.A_STAR
+        # Incremental search state for the current target, see PathFindingStrategy.INCREMENTAL
+        self.__planner: Optional[DStarLite] = None
+        self.__planner_target: Optional[GridObject] = None
+        self.__planner_version = 0
+        # Segments still to be refined, see PathFindingStrategy.HIERARCHICAL
+        self.__segments: Optional[HierarchicalPath] = None
 
     def set_path(self, path: deque[Pose], wrap: bool = False):
         """ Sets the path to follow.
@@ -132,6 +189,7 @@ class AttrPathFinding(GridObject, ABC):
         :param path: Path to follow.
         :param wrap: If True, the path will be repeated, otherwise it will be followed once.
         """
+        self.__segments = None
         self.__path = path
         self.__wrap = wrap
         if not self.__wrap and self.__path is not None:
@@ -159,47 +217,156 @@ class AttrPathFinding(GridObject, ABC):
         elif success:
             self.__path.rotate(-1)
 
-        done = len(self.__path) == 0
+        done = len(self.__path) == 0 and not self.__load_next_segment()
         if done:
             self.is_path_following = False
         return not done
 
-    def path_find(self, target: Pose) -> bool:
+    def __load_next_segment(self) -> bool:
+        """ Refines the next segment of a hierarchical path into the path being followed.
+
+        :return: True if there are more tiles to follow, False otherwise.
+        """
+        while self.__segments is not None and self.__segments.has_next_segment():
+            segment = self.__segments.next_segment()
+            if segment is None:  # The grid changed under the path
+                break
+            self.__path.extend(Pose(x, y) for x, y in segment[1:])
+            if self.__path:
+                return True
+        self.__segments = None
+        return False
+
+    def __hierarchical_path(self, target: Pose) -> Optional[Tuple[deque[Pose], HierarchicalPath]]:
+        """ Plans to the target on the grid's hierarchical path finder and refines the first segment.
+
+        :param target: Target to find a path to.
+        :return: The first segment of the path and the segments left, or None if no path was found.
+        """
+        finder = self.grid.get_hierarchical_path_finder(self)
+        try:
+            segments = finder.find_path((int(self.pose.x), int(self.pose.y)), (int(target.x), int(target.y)))
+        except PathFindingError:
+            return None
+        path = deque([self.pose.get_coordinates_as_pose()])
+        while len(path) == 1 and segments.has_next_segment():
+            segment = segments.next_segment()
+            if segment is None:
+                return None
+            path.extend(Pose(x, y) for x, y in segment[1:])
+        return path, segments
+
+    def path_find(self, target: Pose, strategy: PathFindingStrategy = PathFindingStrategy.A_STAR) -> bool:
         """ Finds a path to the target and sets it.
 
         :param target: Target to find a path to.
-        :return: True if a path was found, False otherwise.
+        :param strategy: How to plan the path. Only A_STAR, HIERARCHICAL and SCHEDULED apply to a fixed target.
+        :return: True if a path was found, False otherwise. Always True for SCHEDULED, the path is set once found.
         """
+        if strategy is PathFindingStrategy.SCHEDULED:
+            self.grid.path_scheduler.request(self, target)
+            return True
+        if strategy is PathFindingStrategy.HIERARCHICAL:
+            planned = self.__hierarchical_path(target)
+            if planned is None:
+                return False
+            self.set_path(planned[0])
+            self.__segments = planned[1]
+            return True
         try:
-            path = a_star(self.pose.as_discrete_point(),
-                          target.as_discrete_point(),
-                          self.grid.get_collision_matrix(self))
+            path = self.grid.path_cache.find_path(self, self.pose.as_discrete_point(), target.as_discrete_point())
         except PathFindingError:
             return False
         path = deque([Pose.from_discrete_point(p) for p in path])
         self.set_path(path)
         return True
 
-    def actively_path_find(self, target: GridObject) -> bool:
+    def path_find_nearest(self, query: Union[type, Callable[[GridObject], bool]]) -> Optional[GridObject]:
+        """ Finds a path to the closest object matching a query and sets it, e.g. the nearest HealingPad.
+
+        :param query: Class to look for, subclasses included, or a predicate on grid objects. See GameGrid.find_nearest
+        :return: The object the path leads to, or None if nothing matching is reachable.
+        """
+        found = self.grid.find_nearest(self, query)
+        if found is None:
+            return None
+        self.set_path(found[1])
+        return found[0]
+
+    def actively_path_find(self, target: GridObject,
+                           strategy: PathFindingStrategy = PathFindingStrategy.A_STAR) -> bool:
         """ Finds a path to the target and sets it.
         Keeps updating pathfinding forever.
 
         :param target: Target to find a path to.
+        :param strategy: How to plan the path.
         :return: True if a path was found, False otherwise.
         """
-        try:
-            path = a_star(self.pose.as_discrete_point(),
-                          target.pose.as_discrete_point(),
-                          self.grid.get_collision_matrix(self))
-        except PathFindingError:
-            return False
+        segments = None
+        if strategy is PathFindingStrategy.SCHEDULED:
+            # A search that is still running is left alone, restarting it on every move of the target could starve it
+            if not self.grid.path_scheduler.is_pending(self):
+                self.grid.path_scheduler.request(self, target.pose)
+            self.actively_path_finding = True
+            self.active_path_finding_target = target
+            self.active_path_finding_strategy = strategy
+            return True
+        if strategy is PathFindingStrategy.FLOW_FIELD:
+            step = self.grid.flow_fields.next_step(self, target)
+            if step is None:
+                return False
+            path = deque([self.pose.get_coordinates_as_pose()])
+            if not self.pose.coordinates_equal(step):
+                path.append(Pose.from_discrete_point(step))
+        elif strategy is PathFindingStrategy.INCREMENTAL:
+            path = self.__incremental_path(target)
+            if path is None:
+                return False
+        elif strategy is PathFindingStrategy.HIERARCHICAL:
+            planned = self.__hierarchical_path(target.pose)
+            if planned is None:
+                return False
+            path, segments = planned
+        else:
+            try:
+                path = self.grid.path_cache.find_path(self, self.pose.as_discrete_point(),
+                                                      target.pose.as_discrete_point())
+            except PathFindingError:
+                return False
+            path = deque([Pose.from_discrete_point(p) for p in path])
         self.actively_path_finding = True
         self.active_path_finding_target = target
-        path = deque([Pose.from_discrete_point(p) for p in path])
+        self.active_path_finding_strategy = strategy
         self.set_path(path)
+        self.__segments = segments
         return True
 
+    def __incremental_path(self, target: GridObject) -> Optional[deque[Pose]]:
+        """ Plans to the target with the incremental planner kept for it, creating the planner if needed.
+
+        :param target: Target to find a path to.
+        :return: The path, or None if no path was found.
+        """
+        passable = self.grid.get_collision_matrix(self)
+        start = (int(self.pose.x), int(self.pose.y))
+        goal = (int(target.pose.x), int(target.pose.y))
+        planner = self.__planner
+        if planner is None or self.__planner_target is not target or planner.passable_matrix.shape != passable.shape:
+            planner = DStarLite(passable, start, goal)
+            self.__planner = planner
+            self.__planner_target = target
+        else:
+            planner.move_start(start)
+            changed = self.grid.changed_cells(self, planner.passable_matrix, self.__planner_version)
+            planner.update_cells(passable, changed)
+            planner.move_goal(goal)
+        self.__planner_version = self.grid.version
+        cells = planner.get_path()
+        if cells is None:
+            return None
+        return deque([Pose(x, y) for x, y in cells])
+
     def update(self, dt: float) -> None:
         super().update(dt)
         if self.actively_path_finding:
-            self.actively_path_find(self.active_path_finding_target)
+            self.actively_path_find(self.active_path_finding_target, self.active_path_finding_strategy)
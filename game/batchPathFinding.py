@@ -0,0 +1,41 @@
+from multiprocessing.shared_memory import SharedMemory
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from game.math import _a_star_ids, _jump_point_search_ids
+
+
+def share_matrix(matrix: np.ndarray) -> SharedMemory:
+    """ Copies a collision matrix into a new shared memory block, so worker processes can read it without pickling.
+    The caller owns the block and has to close and unlink it.
+
+    :param matrix: 2D boolean array indexed [x, y]
+    :return: The shared memory block, holding the matrix in C order
+    """
+    shared = SharedMemory(create=True, size=max(1, matrix.size))
+    np.ndarray(matrix.shape, dtype=bool, buffer=shared.buf)[:] = matrix
+    return shared
+
+
+def plan_shared(name: str, shape: Tuple[int, int], queries: Sequence[Tuple[int, int]],
+                jump_points: bool = False) -> List[Optional[List[int]]]:
+    """ Runs path searches on a collision matrix held in shared memory. Runs in a worker process.
+
+    :param name: Name of the shared memory block, see share_matrix
+    :param shape: Shape of the matrix, (width, height)
+    :param queries: (start, target) node ids, ``x * height + y``. Targets must be passable.
+    :param jump_points: Use Jump Point Search instead of plain A*
+    :return: Node ids from start to target inclusive for every query, None where there is no path
+    """
+    shared = SharedMemory(name=name)
+    width, height = shape
+    # The searches index the shared bytes in place, one byte per cell in C order, so nothing is copied per task
+    passable = shared.buf[:width * height]
+    try:
+        search = _jump_point_search_ids if jump_points else _a_star_ids
+        return [search(passable, width, height, start, target) for start, target in queries]
+    finally:
+        # The view has to be released before the block can be closed
+        passable.release()
+        shared.close()
@@ -0,0 +1,90 @@
+from collections import OrderedDict
+from typing import Any, Dict, Hashable
+
+
+class LRUCache:
+    """ Bounded mapping that evicts the least recently used entry when full.
+    Counts hits and misses so the effect of caching can be checked under load.
+    """
+
+    def __init__(self, max_size: int = 128):
+        """
+
+        :param max_size: Maximum number of entries to keep
+        """
+        self.max_size = max_size
+        self._entries: OrderedDict[Hashable, Any] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """ Gets an entry, marking it as recently used.
+
+        :param key: Key to look up
+        :param default: Value to return on a miss
+        :return: The cached value, or default
+        """
+        try:
+            value = self._entries[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """ Adds or replaces an entry, evicting the least recently used entries if the cache is full.
+
+        :param key: Key to store under
+        :param value: Value to store
+        """
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """ Removes an entry without counting a hit or a miss.
+
+        :param key: Key to remove
+        :param default: Value to return if the key is not cached
+        :return: The removed value, or default
+        """
+        return self._entries.pop(key, default)
+
+    def clear(self) -> None:
+        """ Removes all entries. Statistics are kept.
+        """
+        self._entries.clear()
+
+    def reset_stats(self) -> None:
+        """ Resets the hit, miss and eviction counters
+        """
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def stats(self) -> Dict[str, float]:
+        """
+        :return: Hits, misses, evictions, hit rate and current size
+        """
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'size': len(self._entries),
+        }
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __str__(self):
+        return f'LRUCache({", ".join(f"{k}={v:.3g}" for k, v in self.stats().items())})'
@@ -0,0 +1,97 @@
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from game.gameGrid import GameGrid
+from game.gridObject import GridObject
+from game.pose import Pose
+
+
+class _Chunk:
+    """ Cells of a square block of the grid, and how many objects they hold.
+    """
+
+    def __init__(self, size: int):
+        # Object list of every cell, indexed x * size + y relative to the chunk
+        self.cells: List[List[GridObject]] = [[] for _ in range(size * size)]
+        self.count = 0
+
+
+class ChunkedGameGrid(GameGrid):
+    """ Game grid for very large or mostly empty worlds.
+
+    GameGrid allocates a list for every cell up front, which takes gigabytes around 10^7 cells. This grid splits the
+    world into square chunks that are only allocated when an object enters them, and freed once their last object
+    leaves. Empty cells read as empty lists. The occupancy layers stay dense NumPy arrays, a few bytes per cell, so
+    collision matrices and path finding work the same as on GameGrid.
+    """
+
+    def __init__(self, height: int, width: int, chunk_size: int = 32, **kwargs):
+        """
+
+        :param height: Height of the grid
+        :param width: Width of the grid
+        :param chunk_size: Width and height of the chunks
+        :param kwargs: Passed on to GameGrid
+        """
+        self.chunk_size = chunk_size
+        super().__init__(height, width, **kwargs)
+
+    def _create_cells(self) -> Dict[Tuple[int, int], _Chunk]:
+        """
+        :return: No chunks, self.grid maps chunk coordinates to the chunks allocated so far
+        """
+        return {}
+
+    def _occupy(self, element: GridObject, x: int, y: int) -> None:
+        size = self.chunk_size
+        key = (x // size, y // size)
+        chunk = self.grid.get(key)
+        if chunk is None:
+            chunk = self.grid[key] = _Chunk(size)
+        chunk.cells[x % size * size + y % size].append(element)
+        chunk.count += 1
+        self._add_to_layers(element, x, y)
+
+    def _vacate(self, element: GridObject, x: int, y: int) -> None:
+        size = self.chunk_size
+        key = (x // size, y // size)
+        chunk = self.grid.get(key)
+        if chunk is None:
+            raise ValueError(f'{element} is not in an allocated chunk')
+        chunk.cells[x % size * size + y % size].remove(element)
+        chunk.count -= 1
+        if not chunk.count:
+            del self.grid[key]
+        self._remove_from_layers(element, x, y)
+
+    def cell(self, x: int, y: int) -> List[GridObject]:
+        """ Gets the objects at the given position.
+
+        :param x: X position to get objects at
+        :param y: Y position to get objects at
+        :return: List of objects at the given position. A new empty list if the chunk is not allocated.
+        """
+        size = self.chunk_size
+        chunk = self.grid.get((x // size, y // size))
+        if chunk is None:
+            return []
+        return chunk.cells[x % size * size + y % size]
+
+    def cell_at(self, pose: Pose) -> List[GridObject]:
+        return self.cell(pose.x, pose.y)
+
+    def cells_in_rect(self, x: int, y: int, width: int, height: int) -> List[List[List[GridObject]]]:
+        x0, y0 = max(x, 0), max(y, 0)
+        x1, y1 = min(x + width, self.width), min(y + height, self.height)
+        return [[self.cell(cx, cy) for cy in range(y0, y1)] for cx in range(x0, x1)]
+
+    def equals(self, other: GameGrid) -> bool:
+        """ Compares two game grids, of either kind. Only cells holding objects are compared.
+
+        :param other: The other object to compare to
+        """
+        if (self.width, self.height) != (other.width, other.height):
+            return False
+        occupied = np.argwhere((self.counts > 0) | (other.counts > 0)).tolist()
+        return all(self.cell(x, y) == other.cell(x, y) for x, y in occupied)
@@ -0,0 +1,204 @@
+from typing import Dict, List, Optional, Tuple, Type
+
+import numpy as np
+
+from game.pose import Pose
+
+
+class StoredField:
+    """ Attribute that lives in a column of a ComponentStore while its object is attached to one, and in the object
+    itself otherwise. Objects keep the same API either way.
+    """
+
+    def __init__(self, column: str):
+        """
+
+        :param column: Column of the store holding the value, see ComponentStore.COLUMNS
+        """
+        self.column = column
+        self.name = column
+
+    def __set_name__(self, owner: type, name: str):
+        self.name = name
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        store = instance.__dict__.get('_component_store')
+        if store is None:
+            try:
+                return instance.__dict__[self.name]
+            except KeyError:
+                raise AttributeError(self.name) from None
+        return store.columns[self.column].item(instance._component_id)
+
+    def __set__(self, instance, value):
+        store = instance.__dict__.get('_component_store')
+        if store is None:
+            instance.__dict__[self.name] = value
+        else:
+            store.columns[self.column][instance._component_id] = value
+
+
+class StoredCoordinate(StoredField):
+    """ StoredField for a pose coordinate. The column holds floats so fractional coordinates are kept, whole values are
+    read back as ints so they can still index the grid.
+    """
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        store = instance.__dict__.get('_component_store')
+        if store is None:
+            return super().__get__(instance, owner)
+        value = store.columns[self.column].item(instance._component_id)
+        return int(value) if value.is_integer() else value
+
+
+class StoredPose(Pose):
+    """ Pose whose coordinates, rotation and size live in a ComponentStore, at the id of the object it belongs to.
+    An object's Pose is turned into one in place when the object is attached, and back when it is detached, so other
+    references to the pose, e.g. a tracking Camera, keep following the object.
+    """
+    _x = StoredCoordinate('x')
+    _y = StoredCoordinate('y')
+    _theta = StoredField('theta')
+    _w = StoredField('w')
+    _h = StoredField('h')
+
+
+def _copy_update_flags(source: Pose, target: Pose) -> None:
+    target.x_updated = source.x_updated
+    target.y_updated = source.y_updated
+    target.theta_updated = source.theta_updated
+    target.w_updated = source.w_updated
+    target.h_updated = source.h_updated
+
+
+class ComponentStore:
+    """ Struct of arrays holding the health, damage, healing and pose of many objects, one row per object id.
+
+    Attached objects keep their API: fields declared as StoredField, and the fields of their pose, read and write the
+    columns instead of instance attributes. Columns are contiguous NumPy arrays, so systems can work on all objects
+    at once, see GameGrid's batched effects. Columns an object has no use for stay zero, e.g. a drone's health.
+
+    .. note:: This does not save memory. Attached objects keep their __dict__ and their pose, and a row of 72 bytes
+        comes on top. Reading or writing a stored field goes through a descriptor and a NumPy scalar, which is slower
+        than a plain attribute, so simulations that mostly touch single objects run slower with a store.
+    """
+    COLUMNS: Dict[str, type] = {
+        'health': np.float64,
+        'max_health': np.float64,
+        'damage': np.float64,
+        'healing': np.float64,
+        'x': np.float64,
+        'y': np.float64,
+        'theta': np.float64,
+        'w': np.float64,
+        'h': np.float64,
+    }
+
+    def __init__(self, capacity: int = 64):
+        """
+
+        :param capacity: Number of rows to allocate up front, the columns grow as needed
+        """
+        self.columns: Dict[str, np.ndarray] = {name: np.zeros(capacity, dtype=dtype)
+                                               for name, dtype in self.COLUMNS.items()}
+        # Object of every id, None for ids that are free
+        self.entities: List[Optional[object]] = []
+        self._free: List[int] = []
+        # Class -> (attribute name, column) of its stored fields
+        self._fields: Dict[Type, List[Tuple[str, str]]] = {}
+
+    @property
+    def capacity(self) -> int:
+        return len(self.columns['health'])
+
+    def __len__(self) -> int:
+        return len(self.entities) - len(self._free)
+
+    def _stored_fields(self, cls: Type) -> List[Tuple[str, str]]:
+        fields = self._fields.get(cls)
+        if fields is None:
+            seen = {}
+            for klass in reversed(cls.__mro__):
+                for name, value in vars(klass).items():
+                    if isinstance(value, StoredField):
+                        seen[name] = value.column
+            fields = self._fields[cls] = list(seen.items())
+        return fields
+
+    def _allocate(self) -> int:
+        if self._free:
+            return self._free.pop()
+        component_id = len(self.entities)
+        self.entities.append(None)
+        if component_id >= self.capacity:
+            for name, column in self.columns.items():
+                self.columns[name] = np.concatenate([column, np.zeros_like(column)])
+        return component_id
+
+    def _move_in(self, instance, cls: Type, component_id: int) -> None:
+        """ Moves the stored fields of an instance into a row, turning it into an instance of cls first.
+        """
+        values = [(name, instance.__dict__.pop(name))
+                  for name, _ in self._stored_fields(cls) if name in instance.__dict__]
+        instance._component_store = self
+        instance._component_id = component_id
+        if type(instance) is not cls:
+            instance.__class__ = cls
+        for name, value in values:
+            setattr(instance, name, value)
+
+    def _move_out(self, instance, cls: Type) -> None:
+        """ Moves the stored fields of an instance out of its row, turning it into an instance of cls afterwards.
+        """
+        values = [(name, getattr(instance, name)) for name, _ in self._stored_fields(type(instance))]
+        del instance._component_store
+        del instance._component_id
+        if type(instance) is not cls:
+            instance.__class__ = cls
+        for name, value in values:
+            setattr(instance, name, value)
+
+    def attach(self, element) -> int:
+        """ Moves an object's stored fields and pose into the store. The pose object stays the same, it becomes a
+        StoredPose.
+
+        .. note:: A pose already attached with another object is copied, the two objects stop sharing it.
+
+        :param element: Object to attach, e.g. a GridObject
+        :return: The object's id, its row in the columns
+        """
+        component_id = self._allocate()
+        for column in self.columns.values():
+            column[component_id] = 0
+        self.entities[component_id] = element
+        self._move_in(element, type(element), component_id)
+        pose = element.pose
+        if isinstance(pose, StoredPose):
+            pose = Pose(pose.x, pose.y, pose.theta, pose.w, pose.h)
+            _copy_update_flags(element.pose, pose)
+            element.pose = pose
+        self._move_in(pose, StoredPose, component_id)
+        return component_id
+
+    def detach(self, element) -> None:
+        """ Moves an object's stored fields and pose back into the object, and frees its id.
+
+        :param element: Attached object
+        """
+        component_id = element._component_id
+        pose = element.pose
+        if isinstance(pose, StoredPose) and pose._component_store is self and pose._component_id == component_id:
+            self._move_out(pose, Pose)
+        self._move_out(element, type(element))
+        self.entities[component_id] = None
+        self._free.append(component_id)
+
+    def row_bytes(self) -> int:
+        """
+        :return: Bytes taken by one object's row over all columns
+        """
+        return sum(column.itemsize for column in self.columns.values())
@@ -0,0 +1,149 @@
+from collections import deque
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+
+
+class ConnectedComponents:
+    """ Connected-component labelling of a collision matrix, so unreachable targets can be rejected in O(1).
+
+    Cells that become passable join the components around them through a union-find over the labels.
+    Cells that become blocked may split a component, which is not worked out right away: the labels are marked stale
+    and keep over-approximating connectivity. Cells with different components are then still certainly disconnected,
+    only cells sharing a component may turn out to be unreachable. report_unreachable relabels in that case, so the
+    next identical query fails instantly.
+
+    Nodes are integer ids, ``x * height + y``.
+    """
+
+    def __init__(self, passable: np.ndarray):
+        """
+
+        :param passable: 2D boolean array indexed [x, y]. Truthy values are valid paths.
+        """
+        self.width, self.height = passable.shape
+        self.passable_matrix = np.array(passable, dtype=bool)
+        self.passable: List[bool] = self.passable_matrix.ravel().tolist()
+        # Label of every node, -1 for blocked nodes. Labels are resolved to their component with _find
+        self.labels: List[int] = []
+        # Union-find forest over the labels
+        self._parents: List[int] = []
+        # True if cells were blocked since the last relabel, so components may be split
+        self.stale = False
+        # Number of full relabels since creation, useful for profiling
+        self.relabels = 0
+        self.relabel()
+
+    def node(self, x: int, y: int) -> int:
+        """
+        :return: The node id of the cell
+        """
+        return x * self.height + y
+
+    def _neighbours(self, node: int) -> Iterable[int]:
+        x, y = divmod(node, self.height)
+        if x > 0:
+            yield node - self.height
+        if x < self.width - 1:
+            yield node + self.height
+        if y < self.height - 1:
+            yield node + 1
+        if y > 0:
+            yield node - 1
+
+    def relabel(self) -> None:
+        """ Labels every component from scratch with breadth first flood fills. O(width * height).
+        """
+        passable = self.passable
+        labels = [-1] * len(passable)
+        count = 0
+        for seed, free in enumerate(passable):
+            if not free or labels[seed] != -1:
+                continue
+            labels[seed] = count
+            frontier = deque([seed])
+            while frontier:
+                for neighbour in self._neighbours(frontier.popleft()):
+                    if passable[neighbour] and labels[neighbour] == -1:
+                        labels[neighbour] = count
+                        frontier.append(neighbour)
+            count += 1
+        self.labels = labels
+        self._parents = list(range(count))
+        self.stale = False
+        self.relabels += 1
+
+    def _find(self, label: int) -> int:
+        parents = self._parents
+        while parents[label] != label:
+            parents[label] = parents[parents[label]]
+            label = parents[label]
+        return label
+
+    def component(self, x: int, y: int) -> int:
+        """
+        :return: Component of the cell, -1 if it is blocked
+        """
+        label = self.labels[self.node(x, y)]
+        return -1 if label == -1 else self._find(label)
+
+    def connected(self, start: Tuple[int, int], goal: Tuple[int, int]) -> bool:
+        """ Checks if a path may exist. False is always right, True is only certain if the labels are not stale.
+
+        :param start: Cell to start from, does not need to be passable
+        :param goal: Cell to reach
+        :return: False if there is certainly no path
+        """
+        if not (0 <= start[0] < self.width and 0 <= start[1] < self.height
+                and 0 <= goal[0] < self.width and 0 <= goal[1] < self.height):
+            return False
+        goal_component = self.component(*goal)
+        if goal_component == -1:
+            return False
+        if start == goal:
+            return True
+        node = self.node(*start)
+        # The start does not need to be passable, it is in every component next to it
+        starts = [node] if self.passable[node] else self._neighbours(node)
+        return any(self.labels[n] != -1 and self._find(self.labels[n]) == goal_component for n in starts)
+
+    def update(self, passable: np.ndarray, cells: Optional[Iterable[Tuple[int, int]]] = None) -> int:
+        """ Applies a new collision matrix. Opened cells are merged in right away, blocked cells mark labels stale.
+
+        :param passable: 2D boolean array indexed [x, y], with the same shape as the original
+        :param cells: Cells that may have changed, such as GameGrid.dirty_cells. All cells are compared if None.
+        :return: Number of cells that changed
+        """
+        passable = np.asarray(passable, dtype=bool)
+        if cells is None:
+            changed = np.flatnonzero(passable.ravel() != self.passable_matrix.ravel()).tolist()
+        else:
+            changed = [self.node(x, y) for x, y in cells if passable[x, y] != self.passable_matrix[x, y]]
+        if not changed:
+            return 0
+        self.passable_matrix = passable.copy()
+        labels = self.labels
+        for node in changed:
+            if self.passable[node]:
+                self.passable[node] = False
+                labels[node] = -1
+                self.stale = True
+                continue
+            self.passable[node] = True
+            roots = {self._find(labels[n]) for n in self._neighbours(node) if labels[n] != -1}
+            if not roots:
+                labels[node] = len(self._parents)
+                self._parents.append(labels[node])
+                continue
+            root = roots.pop()
+            for other in roots:
+                self._parents[other] = root
+            labels[node] = root
+        return len(changed)
+
+    def report_unreachable(self) -> None:
+        """ Tells the index a search failed between two cells it considered connected.
+        If the labels are stale they are rebuilt, otherwise nothing needs to be done.
+        """
+        if self.stale:
+            self.relabel()
@@ -1,6 +1,8 @@
 GRID_WIDTH = 30
 GRID_HEIGHT = 20
 TEXTURE_SIZE = 32
+# Total tile_size that fits in one grid cell
+TILE_CAPACITY = 5
 
 WINDOW_PIXEL_HEIGHT = int(GRID_HEIGHT * TEXTURE_SIZE)
 WINDOW_PIXEL_WIDTH = int(GRID_WIDTH * TEXTURE_SIZE)
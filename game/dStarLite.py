@@ -0,0 +1,251 @@
+from heapq import heappush, heappop
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+INFINITY = float('inf')
+
+
+class DStarLite:
+    """ Incremental planner based on D* Lite (Koenig & Likhachev).
+
+    The search runs backwards from the goal, so the g-values are distances to the goal and stay valid while the start
+    moves along the path. When cells change occupancy only the vertices whose distances changed are repaired.
+    When the goal moves inside the search tree the tree is re-rooted at the new goal, in the style of Moving Target
+    D* Lite: the subtree that already leads through the new goal is kept as is, and only the rest of the tree is
+    deleted and repaired. Values are stored relative to the original root, only differences between them matter.
+
+    Nodes are integer ids, ``x * height + y``. Moving into a cell costs 1 if it is passable, infinity otherwise.
+    The start cell does not need to be passable.
+    """
+
+    def __init__(self, passable: np.ndarray, start: Tuple[int, int], goal: Tuple[int, int]):
+        """
+
+        :param passable: 2D boolean array indexed [x, y]. Truthy values are valid paths.
+        :param start: Cell to plan from
+        :param goal: Cell to plan to
+        """
+        self.width, self.height = passable.shape
+        self.passable_matrix = np.array(passable, dtype=bool)
+        self.passable: List[bool] = self.passable_matrix.ravel().tolist()
+        self.start = self.node(*start)
+        self.g: List[float] = []
+        self.rhs: List[float] = []
+        # Next node towards the goal on the search tree, -1 for none
+        self.parent: List[int] = []
+        # Lazy deletion priority queue, _keys holds the current key of every node that is in the queue
+        self._queue: List[Tuple[float, float, int]] = []
+        self._keys: Dict[int, Tuple[float, float]] = {}
+        # Number of vertices expanded since creation, useful for profiling
+        self.expansions = 0
+        self.reset(goal)
+
+    def node(self, x: int, y: int) -> int:
+        """
+        :return: The node id of the cell
+        """
+        return x * self.height + y
+
+    def cell(self, node: int) -> Tuple[int, int]:
+        """
+        :return: The cell of the node id
+        """
+        return divmod(node, self.height)
+
+    def _heuristic(self, a: int, b: int) -> int:
+        ax, ay = divmod(a, self.height)
+        bx, by = divmod(b, self.height)
+        return abs(ax - bx) + abs(ay - by)
+
+    def _neighbours(self, node: int) -> Iterable[int]:
+        x, y = divmod(node, self.height)
+        if x > 0:
+            yield node - self.height
+        if x < self.width - 1:
+            yield node + self.height
+        if y < self.height - 1:
+            yield node + 1
+        if y > 0:
+            yield node - 1
+
+    def _calculate_key(self, node: int) -> Tuple[float, float]:
+        m = min(self.g[node], self.rhs[node])
+        return m + self._heuristic(self.start, node) + self.km, m
+
+    def _push(self, node: int) -> None:
+        key = self._calculate_key(node)
+        self._keys[node] = key
+        heappush(self._queue, (key[0], key[1], node))
+
+    def _top(self) -> Optional[Tuple[float, float, int]]:
+        """ Discards stale queue entries and returns the first valid one without removing it.
+        """
+        queue = self._queue
+        while queue:
+            k1, k2, node = queue[0]
+            if self._keys.get(node) == (k1, k2):
+                return queue[0]
+            heappop(queue)
+        return None
+
+    def _update_vertex(self, node: int) -> None:
+        if node != self.goal:
+            best = INFINITY
+            best_neighbour = -1
+            passable = self.passable
+            g = self.g
+            for neighbour in self._neighbours(node):
+                if passable[neighbour] and g[neighbour] + 1 < best:
+                    best = g[neighbour] + 1
+                    best_neighbour = neighbour
+            self.rhs[node] = best
+            self.parent[node] = best_neighbour
+        self._keys.pop(node, None)
+        if self.g[node] != self.rhs[node]:
+            self._push(node)
+
+    def compute_shortest_path(self) -> None:
+        """ Repairs the search until the start's distance to the goal is known.
+        """
+        g = self.g
+        rhs = self.rhs
+        while True:
+            top = self._top()
+            if top is None:
+                return
+            k1, k2, node = top
+            if (k1, k2) >= self._calculate_key(self.start) and rhs[self.start] == g[self.start]:
+                return
+            heappop(self._queue)
+            del self._keys[node]
+            self.expansions += 1
+
+            new_key = self._calculate_key(node)
+            if (k1, k2) < new_key:
+                self._keys[node] = new_key
+                heappush(self._queue, (new_key[0], new_key[1], node))
+            elif g[node] > rhs[node]:
+                g[node] = rhs[node]
+                # Costs are paid on entering a cell, so only a passable node lowers its neighbours
+                if self.passable[node]:
+                    for neighbour in self._neighbours(node):
+                        self._update_vertex(neighbour)
+            else:
+                g[node] = INFINITY
+                self._update_vertex(node)
+                if self.passable[node]:
+                    for neighbour in self._neighbours(node):
+                        self._update_vertex(neighbour)
+
+    def move_start(self, start: Tuple[int, int]) -> None:
+        """ Moves the start, typically because the agent followed its path. No search work is needed.
+
+        :param start: New cell to plan from
+        """
+        node = self.node(*start)
+        if node == self.start:
+            return
+        self.start = node
+        self.km += self._heuristic(self.last, self.start)
+        self.last = self.start
+
+    def move_goal(self, goal: Tuple[int, int]) -> None:
+        """ Moves the goal. The part of the search tree that already leads through the new goal is reused.
+
+        :param goal: New cell to plan to
+        """
+        node = self.node(*goal)
+        if node == self.goal:
+            return
+        if self.rhs[node] == INFINITY:  # Never reached, nothing to reuse
+            self.reset(goal)
+            return
+
+        # Everything hanging off the old goal that doesn't go through the new goal has to be recomputed
+        deleted = [self.goal]
+        seen = {self.goal, node}
+        for current in deleted:
+            for neighbour in self._neighbours(current):
+                if neighbour not in seen and self.parent[neighbour] == current:
+                    seen.add(neighbour)
+                    deleted.append(neighbour)
+        for current in deleted:
+            self.g[current] = INFINITY
+            self.rhs[current] = INFINITY
+            self.parent[current] = -1
+            self._keys.pop(current, None)
+
+        self.goal = node
+        self.parent[node] = -1
+        self._keys.pop(node, None)
+        if self.g[node] != self.rhs[node]:
+            self._push(node)
+        for current in deleted:
+            self._update_vertex(current)
+
+    def reset(self, goal: Tuple[int, int]) -> None:
+        """ Throws away all search state and plans to a new goal from scratch.
+
+        :param goal: New cell to plan to
+        """
+        size = self.width * self.height
+        self.g = [INFINITY] * size
+        self.rhs = [INFINITY] * size
+        self.parent = [-1] * size
+        self._queue = []
+        self._keys = {}
+        self.km = 0
+        self.last = self.start
+        self.goal = self.node(*goal)
+        self.rhs[self.goal] = 0
+        self._push(self.goal)
+
+    def update_cells(self, passable: np.ndarray, cells: Optional[Iterable[Tuple[int, int]]] = None) -> int:
+        """ Applies a new collision matrix. Only cells whose passability changed cause any work.
+
+        :param passable: 2D boolean array indexed [x, y], with the same shape as the original
+        :param cells: Cells that may have changed, such as GameGrid.dirty_cells. All cells are compared if None.
+        :return: Number of cells that changed
+        """
+        passable = np.asarray(passable, dtype=bool)
+        if cells is None:
+            changed = np.flatnonzero(passable.ravel() != self.passable_matrix.ravel()).tolist()
+        else:
+            changed = [self.node(x, y) for x, y in cells if passable[x, y] != self.passable_matrix[x, y]]
+        if not changed:
+            return 0
+        self.passable_matrix = passable.copy()
+        for node in changed:
+            self.passable[node] = not self.passable[node]
+        for node in changed:
+            for neighbour in self._neighbours(node):
+                self._update_vertex(neighbour)
+        return len(changed)
+
+    def get_path(self) -> Optional[List[Tuple[int, int]]]:
+        """ Computes the shortest path from the start to the goal, repairing the search first if needed.
+
+        :return: Cells from start to goal inclusive, or None if the goal can't be reached
+        """
+        self.compute_shortest_path()
+        if self.g[self.start] == INFINITY and self.rhs[self.start] == INFINITY:
+            return None
+        if not self.passable[self.goal]:
+            return None
+        node = self.start
+        path = [self.cell(node)]
+        for _ in range(self.width * self.height):
+            if node == self.goal:
+                return path
+            best = None
+            best_cost = INFINITY
+            for neighbour in self._neighbours(node):
+                if self.passable[neighbour] and self.g[neighbour] + 1 < best_cost:
+                    best = neighbour
+                    best_cost = self.g[neighbour] + 1
+            if best is None:
+                return None
+            node = best
+            path.append(self.cell(node))
+        return None
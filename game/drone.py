@@ -1,12 +1,10 @@
 from collections import deque
 from typing import List
 
-from pyglet import image
-
 from game.attributes import AttrPathFinding, AttrHarmful
 from game.gridDrawable import GridDrawable
 from game.pose import Pose
-from game.resources import get_resource_path
+from game.resources import get_resource_path, load_texture
 
 
 class Drone(AttrPathFinding, AttrHarmful, GridDrawable):
@@ -15,29 +13,54 @@ class Drone(AttrPathFinding, AttrHarmful, GridDrawable):
     _drone_texture_path = get_resource_path('textures/pointer.png')
 
     def __init__(self, pose: Pose, path: deque[Pose] = None, wrap: bool = False):
-        img = image.load(Drone._drone_texture_path).get_region(0, 0, 64, 48)
+        img = load_texture(Drone._drone_texture_path, region=(0, 0, 64, 48))
         super().__init__(pose=pose, img=img, damage=5)
         self.set_path(path, wrap=wrap)
-        self.update_every_frame = True
         self.tile_size = 1
 
     def set_path(self, path: deque[Pose], wrap: bool = False):
         super().set_path(path=path, wrap=wrap)
         self.is_path_following = path is not None and len(path) > 0
+        # Paths can be set from outside of update, e.g. by the PathFindingScheduler
+        if self.is_path_following and self.grid is not None and self not in self.grid.updating:
+            self.grid.wakeups.wake(self)
 
     def can_coexist(self, others: List['GridObject']) -> bool:
         return super().can_coexist(others)
 
-    def overlaps(self, others: List['GridObject']) -> None:
-        super().overlaps(others)
-
     def collision(self, other: 'GridObject') -> None:
         pass
 
     def update(self, dt: float) -> None:
         super().update(dt)
-        if self.is_path_following:
+        # Drones held back by the grid's SimulationLod catch up on the ticks they missed, a step per tick
+        for _ in range(max(round(dt / self.grid.tick_length), 1)):
+            if not self.is_path_following:
+                break
             self.follow_path()
+        self.schedule_update()
+
+    def schedule_update(self) -> None:
+        """ Registers when to update next. A drone with a path, or chasing a target it has not reached, moves every
+        tick. One that has reached its target waits for it to move. A drone whose target left the grid stops chasing
+        it and is idle, like any other drone.
+        """
+        if self.update_every_frame:
+            return
+        if self.actively_path_finding and self.active_path_finding_target not in self.grid.elements:
+            # The target left the grid, watching it would keep it and this drone around forever
+            self.actively_path_finding = False
+            self.active_path_finding_target = None
+            self.set_path(None)
+            self.grid.path_scheduler.cancel(self)
+        if self.is_path_following:
+            self.grid.wakeups.wake_in(self, 1)
+        elif self.actively_path_finding:
+            target = self.active_path_finding_target
+            if self.pose.coordinates_equal(target.pose):
+                self.grid.wakeups.wake_on_move(self, target)
+            else:
+                self.grid.wakeups.wake_in(self, 1)
 
     def equals(self, other: 'GridObject') -> bool:
         return isinstance(other, Drone) and self.path == other.path
@@ -0,0 +1,54 @@
+class FixedTimestep:
+    """ Turns variable frame times into a whole number of fixed length simulation ticks.
+
+    Frame time is added to an accumulator and handed out one tick length at a time, so the simulation advances at the
+    same rate whatever the frame rate. What is left over, as a fraction of a tick, tells the renderer how far to
+    interpolate between the last two ticks. After a long stall at most max_ticks are run at once and the rest of the
+    backlog is dropped, instead of the simulation spiralling into ever longer catch ups.
+    """
+
+    def __init__(self, tick_rate: float, max_ticks: int = 5):
+        """
+
+        :param tick_rate: Simulation ticks per second
+        :param max_ticks: Most ticks to run for a single frame
+        """
+        self.tick_length = 1 / tick_rate
+        self.max_ticks = max_ticks
+        self.accumulator = 0.0
+        # Ticks that were dropped to catch up, useful for profiling
+        self.dropped = 0
+
+    @property
+    def tick_rate(self) -> float:
+        return 1 / self.tick_length
+
+    @tick_rate.setter
+    def tick_rate(self, value: float):
+        self.tick_length = 1 / value
+
+    def advance(self, dt: float) -> int:
+        """ Adds the time of a frame.
+
+        :param dt: Seconds since the last frame
+        :return: Number of ticks to run now
+        """
+        self.accumulator += dt
+        ticks = min(self._whole_ticks(), self.max_ticks)
+        self.accumulator -= ticks * self.tick_length
+        behind = self._whole_ticks()
+        if behind:
+            self.dropped += behind
+            self.accumulator -= behind * self.tick_length
+        return ticks
+
+    def _whole_ticks(self) -> int:
+        # Summed frame times fall a rounding error short of whole ticks, e.g. 60 frames of 1/60 s
+        return int(self.accumulator / self.tick_length + 1e-9)
+
+    @property
+    def alpha(self) -> float:
+        """
+        :return: How far the time since the last tick is into the next one, from 0 to 1
+        """
+        return min(max(self.accumulator / self.tick_length, 0.0), 1.0)
@@ -0,0 +1,189 @@
+from typing import Dict, Hashable, Iterable, Optional, Tuple
+
+import numpy as np
+
+from game.gridObject import GridObject
+from game.math import DiscretePoint
+
+
+def distance_map(passable: np.ndarray, sources: Iterable[Tuple[int, int]]) -> np.ndarray:
+    """ Breadth first distance from the nearest source to every cell, using NumPy wavefront expansion.
+    Every iteration grows the whole frontier by one tile in all four directions at once.
+
+    :param passable: 2D boolean array indexed [x, y]. Truthy values are valid paths.
+    :param sources: Cells to measure distance from. Sources which are not passable are ignored.
+    :return: 2D int array of the same shape, -1 where no source can be reached.
+    """
+    frontier = np.zeros(passable.shape, dtype=bool)
+    for x, y in sources:
+        frontier[x, y] = passable[x, y]
+    return wavefront_distances(passable, frontier)
+
+
+def wavefront_distances(passable: np.ndarray, frontier: np.ndarray) -> np.ndarray:
+    """ Breadth first distance from the nearest starting cell, see distance_map.
+    The frontier may have leading axes to run several independent searches over the same map at once.
+
+    :param passable: 2D boolean array indexed [x, y]. Truthy values are valid paths.
+    :param frontier: Boolean array whose last two axes match passable, marking the starting cells
+    :return: Int array shaped like frontier, -1 where no starting cell can be reached.
+    """
+    distances = np.full(frontier.shape, -1, dtype=np.int32)
+    unvisited = passable & ~frontier
+    distances[frontier] = 0
+
+    distance = 0
+    grown = np.empty_like(frontier)
+    while frontier.any():
+        distance += 1
+        grown[:] = False
+        grown[..., 1:, :] |= frontier[..., :-1, :]
+        grown[..., :-1, :] |= frontier[..., 1:, :]
+        grown[..., :, 1:] |= frontier[..., :, :-1]
+        grown[..., :, :-1] |= frontier[..., :, 1:]
+        frontier = grown & unvisited
+        unvisited &= ~frontier
+        distances[frontier] = distance
+    return distances
+
+
+def descend(distances: np.ndarray, x: int, y: int) -> Optional[DiscretePoint]:
+    """ Gets the neighbouring cell which is closest to the sources of a distance map.
+
+    :param distances: Distance map, see distance_map
+    :param x: X position to step from, does not need to be passable
+    :param y: Y position to step from, does not need to be passable
+    :return: The next cell to move to, or None if no neighbour is closer to a source
+    """
+    width, height = distances.shape
+    own = distances[x, y]
+    best = None
+    best_distance = None
+    for nx, ny in ((x - 1, y), (x + 1, y), (x, y + 1), (x, y - 1)):
+        if nx < 0 or nx >= width or ny < 0 or ny >= height:
+            continue
+        distance = distances[nx, ny]
+        if distance < 0 or (0 <= own <= distance):
+            continue
+        if best_distance is None or distance < best_distance:
+            best = DiscretePoint(nx, ny)
+            best_distance = distance
+    return best
+
+
+class FlowField:
+    """ Distance map towards a single target. Any number of agents can read their next step from it.
+    """
+
+    def __init__(self, passable: np.ndarray, target: Tuple[int, int]):
+        """
+
+        :param passable: 2D boolean array indexed [x, y]. Truthy values are valid paths.
+        :param target: Cell the field flows towards
+        """
+        self.passable = passable
+        self.target = target
+        # Grid version the passable matrix was taken at
+        self.version = 0
+        # The target is seeded even when its cell is full, agents then queue up next to it instead of giving up
+        seeded = passable.copy()
+        seeded[target] = True
+        self.distances = distance_map(seeded, [target])
+        self.width, self.height = passable.shape
+
+    def next_step(self, x: int, y: int) -> Optional[DiscretePoint]:
+        """ Gets the neighbouring cell which is closest to the target. O(1).
+
+        :param x: X position to step from, does not need to be passable
+        :param y: Y position to step from, does not need to be passable
+        :return: The next cell to move to, the target itself if already there, or None if the target can't be reached
+        """
+        if (x, y) == self.target:
+            return DiscretePoint(x, y)
+        return descend(self.distances, x, y)
+
+
+class FlowFieldService:
+    """ Shares one flow field between every agent chasing the same target.
+
+    Fields are keyed by target and collision class, so the cost of pursuit scales with the number of distinct
+    targets instead of the number of agents. A field is rebuilt when its target moves, or on refresh when one of the
+    grid's dirty cells changed the field's collision matrix. Fields nobody asked for since the last refresh are dropped.
+    """
+
+    def __init__(self, grid: 'GameGrid'):
+        """
+
+        :param grid: Grid the fields are built over
+        """
+        self.grid = grid
+        self._fields: Dict[Tuple[GridObject, Hashable], FlowField] = {}
+        # Agent used to build each field's collision matrix, and whether the field was read since the last refresh
+        self._builders: Dict[Tuple[GridObject, Hashable], GridObject] = {}
+        self._used: Dict[Tuple[GridObject, Hashable], bool] = {}
+
+    @staticmethod
+    def collision_key(agent: GridObject) -> Hashable:
+        """ Agents with the same key share flow fields, the same way they share cached collision matrices.
+
+        :param agent: Agent to get the key of
+        :return: Key describing which cells the agent can move through, see GridObject.coexistence_key
+        """
+        return agent.coexistence_key()
+
+    def _build(self, key: Tuple[GridObject, Hashable], agent: GridObject, target: Tuple[int, int]) -> FlowField:
+        field = FlowField(self.grid.get_collision_matrix(agent), target)
+        field.version = self.grid.version
+        self._fields[key] = field
+        self._builders[key] = agent
+        return field
+
+    def get_field(self, agent: GridObject, target: GridObject) -> FlowField:
+        """ Gets the flow field leading agents like `agent` to `target`, building it if needed.
+
+        :param agent: Agent that wants to reach the target
+        :param target: Object to reach
+        :return: The shared flow field
+        """
+        key = (target, self.collision_key(agent))
+        target_cell = (int(target.pose.x), int(target.pose.y))
+        field = self._fields.get(key)
+        if field is None or field.target != target_cell:
+            field = self._build(key, agent, target_cell)
+        self._used[key] = True
+        return field
+
+    def next_step(self, agent: GridObject, target: GridObject) -> Optional[DiscretePoint]:
+        """ Gets the next cell `agent` should move to in order to reach `target`.
+
+        :param agent: Agent that wants to reach the target
+        :param target: Object to reach
+        :return: The next cell to move to, the agent's own cell if it is on the target, or None if unreachable
+        """
+        return self.get_field(agent, target).next_step(int(agent.pose.x), int(agent.pose.y))
+
+    def refresh(self) -> None:
+        """ Drops unused fields and rebuilds fields whose collision matrix changed. To be called once per tick.
+        """
+        for key in list(self._fields):
+            if not self._used.get(key):
+                del self._fields[key]
+                del self._builders[key]
+                self._used.pop(key, None)
+                continue
+            self._used[key] = False
+            field = self._fields[key]
+            if field.version == self.grid.version:
+                continue
+            agent = self._builders[key]
+            if self.grid.changed_cells(agent, field.passable, field.version):
+                self._build(key, agent, field.target)
+            else:
+                field.version = self.grid.version
+
+    def clear(self) -> None:
+        """ Drops all fields
+        """
+        self._fields.clear()
+        self._builders.clear()
+        self._used.clear()
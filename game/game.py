@@ -1,20 +1,24 @@
 from collections import deque
 from time import time, perf_counter
+from typing import Dict, Tuple
 
 from pyglet import window, clock
 from pyglet.window import key
 
 from game.callbackHandler import CallbackHandler
 from game.camera import Camera
-from game.constants import WINDOW_PIXEL_WIDTH, WINDOW_PIXEL_HEIGHT, GRID_HEIGHT, GRID_WIDTH
+from game.constants import WINDOW_PIXEL_WIDTH, WINDOW_PIXEL_HEIGHT
 from game.drone import Drone
+from game.fixedTimestep import FixedTimestep
 from game.gameGrid import GameGrid
-from game.gridObject import add_from_image
+from game.gridDrawable import GridDrawable
+from game.gridObject import add_from_image, GridObject, map_size
 from game.healingPad import HealingPad
 from game.math import a_star, DiscretePoint, timeit
 from game.player import Player
 from game.pose import Pose
 from game.resources import get_resource_path
+from game.simulationLod import SimulationLod
 from game.spike import Spike
 from game.wall import Wall
 
@@ -23,9 +27,16 @@ class Game(window.Window):
     """ Main game class.
     """
 
-    def __init__(self):
+    def __init__(self, tick_rate: float = 2, max_ticks_per_frame: int = 5):
+        """
+
+        :param tick_rate: Simulation ticks per second, independent of the frame rate
+        :param max_ticks_per_frame: Most ticks to catch up on in one frame after a stall
+        """
         super().__init__(width=WINDOW_PIXEL_WIDTH, height=WINDOW_PIXEL_HEIGHT)
-        self.grid = GameGrid(GRID_HEIGHT, GRID_WIDTH)
+        # The world is as big as the map, the window only shows GRID_WIDTH x GRID_HEIGHT tiles of it
+        width, height = map_size(get_resource_path('map.png'))
+        self.grid = GameGrid(height, width)
 
         self.init_walls()
 
@@ -54,17 +65,23 @@ class Game(window.Window):
 
         self.player_camera = Camera(self.player.pose)
         self.player_camera.set_tracking(self.player.pose)
+        self.grid.path_scheduler.camera = self.player_camera
+        self.grid.lod = SimulationLod(self.grid, self.player_camera)
 
         self.prev_frame_time = perf_counter()
-        self.prev_update_time = perf_counter()
         self.fps = 0
+        self.timestep = FixedTimestep(tick_rate, max_ticks_per_frame)
+        # Keys pressed since the last tick, handled all at once by the next one
+        self.input_queue: deque[int] = deque()
+        # Positions of the moving elements before the last tick, drawn interpolated towards their current positions
+        self.previous_positions: Dict[GridObject, Tuple[int, int]] = {}
 
         self.callbackHandler = CallbackHandler()
         self.callbackHandler.add_callback(self.player.is_dead, self.on_player_death, one_time=True)
 
         self.clock = clock.get_default()
-
-        self.set_update_interval()
+        # Runs every frame, the timestep decides how many ticks that makes
+        self.clock.schedule(self.advance)
 
     def init_walls(self):
         add_from_image(self.grid, Wall, get_resource_path('map.png'), random_rotation=True)
@@ -73,7 +90,6 @@ class Game(window.Window):
         self.grid.draw(camera, dt)
 
     # @override_dt_kwarg
-    @timeit
     def on_draw(self, dt: float = None):
         t = perf_counter()
         if dt is None:
@@ -83,11 +99,24 @@ class Game(window.Window):
         # except ZeroDivisionError:
         #     ...
         self.prev_frame_time = t
+        alpha = self.timestep.alpha
+        for element, (x, y) in self.previous_positions.items():
+            element.interpolate(x, y, alpha)
         self.clear()
         self.player_camera.update(dt)
         self.draw(self.player_camera, dt)
 
     def on_key_press(self, symbol, modifiers):
+        if symbol == key.ESCAPE:
+            self.close()
+            return
+        self.input_queue.append(symbol)
+
+    def handle_key(self, symbol: int) -> None:
+        """ Applies a queued key press, called at the start of a tick.
+
+        :param symbol: Key that was pressed
+        """
         if symbol == key.W:
             self.player.move_to_position(self.player.pose + Pose(0, 1))
             self.player.pose.theta = 0
@@ -115,40 +144,42 @@ class Game(window.Window):
         elif symbol == key.SPACE:
             [print() for _ in range(5)]
             print(self.grid)
-        elif symbol == key.ESCAPE:
-            self.close()
-        self.set_update_interval()
+            print(self.player.collision_table)
+            print(self.grid.lod)
 
     def on_player_death(self):
         self.close()
 
-    def set_update_interval(self, interval: float = 0.5):
-        """ Sets the update interval. Updates immediately on call.
+    def advance(self, dt: float) -> None:
+        """ Runs as many fixed length ticks as the time since the last frame adds up to. Scheduled every frame.
 
-        :param interval: time between updates in seconds
+        :param dt: time since the last frame
         """
-        self.clock.unschedule(self.update)
-        # self.update needs to be called here so the game updates on player movement
-        self.update()  # figure out how to pass in a sensible interval
-        self.clock.schedule_interval_soft(self.update, interval)
+        for _ in range(self.timestep.advance(dt)):
+            self.update(self.timestep.tick_length)
 
     @timeit
     def update(self, dt: float = None):
-        """ Update the game state.
+        """ Runs one simulation tick.
 
-        :param dt: time since last update, not currently used
+        :param dt: length of the tick, not currently used
         """
         if dt is None:
-            dt = perf_counter() - self.prev_update_time
-        self.prev_update_time = perf_counter()
+            dt = self.timestep.tick_length
+        # Elements that moved on the previous tick are drawn where they are from now on
+        for element in self.previous_positions:
+            element.interpolate(element.pose.x, element.pose.y, 1)
+        self.grid.moved.clear()
+        while self.input_queue:
+            self.handle_key(self.input_queue.popleft())
 
         # run game updates
         self.grid.update(dt)
+        self.previous_positions = {element: cell for element, cell in self.grid.moved.items()
+                                   if isinstance(element, GridDrawable)}
 
         # check callbacks
         self.callbackHandler.check_callbacks()
-        # draw everything
-        self.on_draw()
         # reset pose update information
         for element in self.grid.elements:
             element.pose.reset_updates()
@@ -1,34 +1,115 @@
-from typing import List
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Hashable, List, Optional, Sequence, Set, Tuple, Type, Union
 
+import numpy as np
 from multipledispatch import dispatch
 from multiprocessing import Process
 from threading import Thread
 
+from game.batchPathFinding import plan_shared, share_matrix
+from game.cache import LRUCache
 from game.camera import Camera
+from game.componentStore import ComponentStore
+from game.connectivity import ConnectedComponents
 from game.drawable import Drawable
-from game.gridObject import GridObject
-from game.math import timeit
+from game.flowField import descend, distance_map, FlowFieldService
+from game.gridObject import add_from_image, GridObject, map_size, OverlapEffect
+from game.hierarchicalPathFinding import HierarchicalPathFinder
+from game.landmarks import LandmarkService
+from game.math import PathFindingError, timeit
+from game.orderedSet import OrderedSet
+from game.pathCache import PathCache
+from game.pathFindingScheduler import PathFindingScheduler
 from game.pose import Pose
+from game.simulationLod import SimulationLod
+from game.spatialIndex import SpatialIndex
+from game.wakeupScheduler import WakeupScheduler
 
 
 class GameGrid(Drawable):
     """ Class manages the grid of the game.
     """
 
-    def __init__(self, height, width):
+    def __init__(self, height, width, dirty_log_size: int = 4096, collision_cache_size: int = 16,
+                 path_cache_bytes: int = 1 << 20, cluster_size: int = 16, batch_workers: Optional[int] = None,
+                 batch_threshold: int = 32, landmark_count: int = 0, bucket_size: int = 8,
+                 component_store: bool = False):
         """
 
         :param height: Height of the grid
         :param width: Width of the grid
+        :param dirty_log_size: How many cell changes to remember for dirty_cells
+        :param collision_cache_size: How many collision matrices to cache
+        :param path_cache_bytes: Memory budget of the path cache
+        :param cluster_size: Cluster size of the hierarchical path finders
+        :param batch_workers: Number of worker processes for plan_paths, defaults to the number of CPUs
+        :param batch_threshold: Smallest batch plan_paths sends to the worker processes
+        :param landmark_count: Landmarks for the ALT heuristic of path searches, 0 to use the Manhattan distance
+        :param bucket_size: Bucket size of the spatial index
+        :param component_store: Keep the health, damage, healing and poses of the elements in a ComponentStore
         """
         super().__init__()
         self.height = height
         self.width = width
-        self.grid: List[List[List[GridObject]]] = [[[] for _ in range(height)] for _ in range(width)]
-        self.elements: List[GridObject] = []
-        self.drawables: List[Drawable] = []
-        self.always_update_list: List[GridObject] = []
-        self.update_list: List[GridObject] = []
+        self.grid = self._create_cells()
+        # Registries keep insertion order, so elements are drawn and updated in the order they were added
+        self.elements: OrderedSet[GridObject] = OrderedSet()
+        self.drawables: OrderedSet[Drawable] = OrderedSet()
+        self.always_update_list: OrderedSet[GridObject] = OrderedSet()
+        # Elements woken for the next tick, and the ones being updated on the current tick, see WakeupScheduler
+        self.update_list: OrderedSet[GridObject] = OrderedSet()
+        self.updating: OrderedSet[GridObject] = OrderedSet()
+        self.wakeups = WakeupScheduler(self)
+        # Updates elements far from a camera less often, None to update everything at full rate
+        self.lod: Optional[SimulationLod] = None
+        # Length of the current tick, see GameGrid.update
+        self.tick_length: float = 1
+        # Element -> cell it moved out of, for every element that moved since whoever reads it last cleared it
+        self.moved: Dict[GridObject, Tuple[int, int]] = {}
+        self.flow_fields = FlowFieldService(self)
+
+        # Occupancy layers, indexed [x, y]. Kept up to date by _occupy and _vacate.
+        # Summed tile_size of the objects in each cell
+        self.tile_sizes = np.zeros((width, height), dtype=np.int32)
+        # Number of objects in each cell
+        self.counts = np.zeros((width, height), dtype=np.int32)
+        # Number of objects of each concrete class in each cell
+        self.class_counts: Dict[Type[GridObject], np.ndarray] = {}
+        # Number of objects with an overlap effect and of overlap targets in each cell, see GridObject.overlap_target
+        self.overlap_sources = np.zeros((width, height), dtype=np.int32)
+        self.overlap_targets = np.zeros((width, height), dtype=np.int32)
+        # Cells holding both, the only cells the overlap pass has to visit
+        self.active_cells: OrderedSet[Tuple[int, int]] = OrderedSet()
+        # Class -> (batched effect, has an overlap effect, is an overlap target), see _resolve_overlaps
+        self._overlap_kinds: Dict[Type[GridObject], Tuple[Optional[OverlapEffect], bool, bool]] = {}
+        # Radius, rectangle and k-nearest queries by class
+        self.spatial_index = SpatialIndex(width, height, bucket_size)
+
+        # Incremented on every change to a cell, never decreases
+        self.version = 0
+        # (version, cell) for the most recent changes, see dirty_cells
+        self._dirty_log: deque[Tuple[int, Tuple[int, int]]] = deque(maxlen=dirty_log_size)
+        # Collision matrices keyed by (coexistence key, version), shared by every element with the same key
+        self.collision_matrix_cache = LRUCache(collision_cache_size)
+        self.path_cache = PathCache(self, path_cache_bytes)
+        # Distance maps to the nearest match of a query, keyed by (query, coexistence key, version)
+        self.nearest_cache = LRUCache(collision_cache_size)
+        self.cluster_size = cluster_size
+        # Coexistence key -> (hierarchical path finder, grid version it was last updated at)
+        self._hierarchical: Dict[Hashable, Tuple[HierarchicalPathFinder, int]] = {}
+        # Coexistence key -> (connected components, grid version they were last updated at)
+        self._components: Dict[Hashable, Tuple[ConnectedComponents, int]] = {}
+        self.batch_workers = batch_workers
+        self.batch_threshold = batch_threshold
+        # Started on the first batch big enough to need it, see plan_paths
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+        self.landmarks: Optional[LandmarkService] = LandmarkService(self, landmark_count) if landmark_count else None
+        # Runs the searches of PathFindingStrategy.SCHEDULED a slice per tick
+        self.path_scheduler = PathFindingScheduler(self)
+        # Struct of arrays for the fields of the elements, elements are attached while on the grid
+        self.components: Optional[ComponentStore] = ComponentStore() if component_store else None
 
     def add(self, element: GridObject):
         """ Tries to add an object to the grid
@@ -39,13 +120,20 @@ class GameGrid(Drawable):
         element.grid = self
         if not element.move_to_position(element.pose):
             raise CouldNotAddToGridException(element, element.pose)
-        self.elements.append(element)
+        self.elements.add(element)
         if issubclass(type(element), Drawable):
             # inspector doesn't realize that element is guaranteed to be a Drawable here
             # noinspection PyTypeChecker
-            self.drawables.append(element)
+            self.drawables.add(element)
         if element.update_every_frame:
-            self.always_update_list.append(element)
+            self.always_update_list.add(element)
+        elif type(element).has_update():
+            # Lets the element schedule its own wakeups
+            self.wakeups.wake(element)
+        if self.lod is not None:
+            self.lod.track(element)
+        if self.components is not None:
+            self.components.attach(element)
 
     def remove(self, element: GridObject) -> bool:
         """ Tries to remove an object from the grid
@@ -55,26 +143,390 @@ class GameGrid(Drawable):
         """
         if element in self.elements:
             self.elements.remove(element)
-            self.grid[element.pose.x][element.pose.y].remove(element)
+            self._vacate(element, element.pose.x, element.pose.y)
+            self.path_scheduler.cancel(element)
             if issubclass(type(element), Drawable):
                 # inspector doesn't realize that element is guaranteed to be a Drawable here
                 # noinspection PyTypeChecker
                 self.drawables.remove(element)
-            try:
-                # element.update_every_frame could have changed since the element was added
-                self.always_update_list.remove(element)
-            except ValueError:
-                ...
+            # element.update_every_frame could have changed since the element was added
+            self.always_update_list.discard(element)
+            self.update_list.discard(element)
+            self.updating.discard(element)
+            self.wakeups.cancel(element)
+            self.wakeups.moved(element)
+            self.moved.pop(element, None)
+            if self.lod is not None:
+                self.lod.forget(element)
+            if self.components is not None:
+                self.components.detach(element)
             return True
         return False
 
-    def get_collision_matrix(self, element: GridObject) -> List[List[bool]]:
+    @classmethod
+    def from_image(cls, image_path: str, element_class: Type[GridObject], random_rotation: bool = False,
+                   **kwargs) -> 'GameGrid':
+        """ Creates a grid the size of a map image, filled with an object per black pixel like add_from_image.
+
+        :param image_path: Path to the map image
+        :param element_class: Class of the objects to add, e.g. Wall
+        :param random_rotation: Randomly rotates the objects in 90 degree increments
+        :param kwargs: Passed on to the constructor
+        :return: The new grid
+        """
+        width, height = map_size(image_path)
+        grid = cls(height, width, **kwargs)
+        add_from_image(grid, element_class, image_path, random_rotation)
+        return grid
+
+    def _create_cells(self) -> List[List[List[GridObject]]]:
+        """ Allocates the cells, overridden by grids that store their cells differently.
+
+        :return: The object list of every cell, indexed [x][y]
+        """
+        return [[[] for _ in range(self.height)] for _ in range(self.width)]
+
+    def _occupy(self, element: GridObject, x: int, y: int) -> None:
+        """ Places an element in a cell and adds it to the occupancy layers. O(1).
+
+        :param element: Element to place
+        :param x: X position of the cell
+        :param y: Y position of the cell
+        """
+        self.grid[x][y].append(element)
+        self._add_to_layers(element, x, y)
+
+    def _vacate(self, element: GridObject, x: int, y: int) -> None:
+        """ Takes an element out of a cell and out of the occupancy layers. O(1).
+
+        :param element: Element to take out
+        :param x: X position of the cell
+        :param y: Y position of the cell
+        :raises ValueError: if the element is not in the cell, the layers are left untouched
+        """
+        self.grid[x][y].remove(element)
+        self._remove_from_layers(element, x, y)
+
+    def _add_to_layers(self, element: GridObject, x: int, y: int) -> None:
+        """ Counts an element that entered a cell in the occupancy layers.
+        """
+        self._mark_dirty(x, y)
+        self.tile_sizes[x, y] += element.tile_size
+        self.counts[x, y] += 1
+        class_counts = self.class_counts.get(type(element))
+        if class_counts is None:
+            class_counts = self.class_counts[type(element)] = np.zeros((self.width, self.height), dtype=np.int32)
+        class_counts[x, y] += 1
+        self._count_overlaps(element, x, y, 1)
+        self.spatial_index.add(element, x, y)
+        self.wakeups.cell_changed(x, y)
+        if self.lod is not None:
+            self.lod.entered(element, x, y)
+
+    def _remove_from_layers(self, element: GridObject, x: int, y: int) -> None:
+        """ Takes an element that left a cell out of the occupancy layers.
+        """
+        self._mark_dirty(x, y)
+        self.tile_sizes[x, y] -= element.tile_size
+        self.counts[x, y] -= 1
+        self.class_counts[type(element)][x, y] -= 1
+        self._count_overlaps(element, x, y, -1)
+        self.spatial_index.remove(element, x, y)
+        self.wakeups.cell_changed(x, y)
+
+    def _moved(self, element: GridObject, x: int, y: int) -> None:
+        """ Called by GridObject.move_to_position when an element moves out of a cell, before it enters the next.
+        """
+        self.moved.setdefault(element, (x, y))
+        self.wakeups.moved(element)
+
+    def _count_overlaps(self, element: GridObject, x: int, y: int, change: int) -> None:
+        """ Keeps the overlap layers and active_cells up to date as an element enters or leaves a cell.
+        """
+        source = type(element).has_overlap_effect()
+        if not source and not element.overlap_target:
+            return
+        if source:
+            self.overlap_sources[x, y] += change
+        if element.overlap_target:
+            self.overlap_targets[x, y] += change
+        if self.overlap_sources[x, y] and self.overlap_targets[x, y]:
+            self.active_cells.add((x, y))
+        else:
+            self.active_cells.discard((x, y))
+
+    def _mark_dirty(self, x: int, y: int) -> None:
+        self.version += 1
+        self._dirty_log.append((self.version, (x, y)))
+
+    def dirty_cells(self, since_version: int) -> Optional[Set[Tuple[int, int]]]:
+        """ Gets the cells that changed after a version.
+
+        :param since_version: Version to compare against, as read from self.version
+        :return: Set of (x, y) cells, or None if the changes are too old to be remembered
+        """
+        if since_version >= self.version:
+            return set()
+        if not self._dirty_log or self._dirty_log[0][0] > since_version + 1:
+            return None
+        cells = set()
+        for version, cell in reversed(self._dirty_log):
+            if version <= since_version:
+                break
+            cells.add(cell)
+        return cells
+
+    def get_class_counts(self, element_class: Type[GridObject]) -> np.ndarray:
+        """ Gets the number of objects of a class, including subclasses, in every cell.
+
+        :param element_class: Class to count
+        :return: 2D int array indexed [x, y]
+        """
+        total = np.zeros((self.width, self.height), dtype=np.int32)
+        for cls, counts in self.class_counts.items():
+            if issubclass(cls, element_class):
+                total += counts
+        return total
+
+    def get_class_mask(self, element_class: Type[GridObject]) -> np.ndarray:
+        """ Gets which cells hold at least one object of a class, including subclasses. E.g. a wall mask.
+
+        :param element_class: Class to look for
+        :return: 2D boolean array indexed [x, y]
+        """
+        return self.get_class_counts(element_class) > 0
+
+    def get_collision_matrix(self, element: GridObject) -> np.ndarray:
         """ Returns a 2D array of booleans indicating if a position can be occupied for the element or not.
+        Computed with one vectorized comparison over the occupancy layers.
+
+        Matrices are cached per coexistence key and grid version, so elements planning between the same two grid
+        changes share one matrix. The returned array is read only.
 
         :param element: The element to check for
-        :return: A 2D array of booleans
+        :return: A 2D boolean array indexed [x, y]
+        """
+        key = (element.coexistence_key(), self.version)
+        matrix = self.collision_matrix_cache.get(key)
+        if matrix is None:
+            matrix = element.can_coexist_matrix(self)
+            matrix.flags.writeable = False
+            self.collision_matrix_cache.put(key, matrix)
+        return matrix
+
+    def changed_cells(self, element: GridObject, matrix: np.ndarray, since_version: int) -> List[Tuple[int, int]]:
+        """ Finds the cells where an old collision matrix no longer agrees with the grid.
+        Only the dirty cells are checked when they are still remembered.
+
+        :param element: The element the matrix was made for
+        :param matrix: Collision matrix made at since_version
+        :param since_version: Version the matrix was made at
+        :return: (x, y) cells whose collision value changed
+        """
+        dirty = self.dirty_cells(since_version)
+        if dirty is not None and not dirty:
+            return []
+        current = self.get_collision_matrix(element)
+        if dirty is None or len(dirty) * 4 > current.size:
+            return [(int(x), int(y)) for x, y in np.argwhere(current != matrix)]
+        return [(x, y) for x, y in dirty if current[x, y] != matrix[x, y]]
+
+    def get_hierarchical_path_finder(self, element: GridObject) -> HierarchicalPathFinder:
+        """ Gets the hierarchical path finder shared by every element with the same coexistence key.
+        It is built on first use, and afterwards only the clusters around changed cells are rebuilt.
+
+        :param element: The element that wants to plan
+        :return: A path finder that is up to date with the grid
         """
-        return [[element.can_coexist(self.get(x, y)) for y in range(self.height)] for x in range(self.width)]
+        key = element.coexistence_key()
+        entry = self._hierarchical.get(key)
+        if entry is None:
+            finder = HierarchicalPathFinder(self.get_collision_matrix(element), self.cluster_size)
+        else:
+            finder, version = entry
+            if version != self.version:
+                changed = self.changed_cells(element, finder.passable_matrix, version)
+                finder.update(self.get_collision_matrix(element), changed)
+        self._hierarchical[key] = (finder, self.version)
+        return finder
+
+    def get_connected_components(self, element: GridObject) -> ConnectedComponents:
+        """ Gets the connectivity index shared by every element with the same coexistence key.
+        It is labelled on first use and afterwards only updated with the cells that changed.
+
+        :param element: The element that wants to plan
+        :return: Connected components that are up to date with the grid
+        """
+        key = element.coexistence_key()
+        entry = self._components.get(key)
+        if entry is None:
+            components = ConnectedComponents(self.get_collision_matrix(element))
+        else:
+            components, version = entry
+            if version != self.version:
+                changed = self.changed_cells(element, components.passable_matrix, version)
+                components.update(self.get_collision_matrix(element), changed)
+        self._components[key] = (components, self.version)
+        return components
+
+    def _nearest_distances(self, element: GridObject, query: Union[Type[GridObject], Callable[[GridObject], bool]],
+                           exclude: Optional[GridObject] = None) -> np.ndarray:
+        """ Breadth first distances from every match of a query at once, for elements like `element`.
+        Cells holding a match are always seeded, even if the element could not enter them.
+        """
+        if isinstance(query, type):
+            # The class layers give the cells without looking at every element
+            sources = [(int(x), int(y)) for x, y in np.argwhere(self.get_class_mask(query))]
+            if exclude is not None and isinstance(exclude, query) \
+                    and self.get_class_counts(query)[exclude.pose.x, exclude.pose.y] == 1:
+                sources.remove((exclude.pose.x, exclude.pose.y))
+        else:
+            sources = list({(other.pose.x, other.pose.y) for other in self.elements
+                            if other is not exclude and query(other)})
+        passable = self.get_collision_matrix(element).copy()
+        for cell in sources:
+            passable[cell] = True
+        return distance_map(passable, sources)
+
+    def find_nearest(self, element: GridObject, query: Union[Type[GridObject], Callable[[GridObject], bool]],
+                     start: Optional[Pose] = None) -> Optional[Tuple[GridObject, deque[Pose]]]:
+        """ Finds the closest reachable object matching a query, and the path to it, in a single search.
+
+        One multi-source breadth first search from every match gives the distance to the nearest one from every cell.
+        It is cached per query, collision class and grid version, so any number of elements looking for the same
+        thing between two grid changes share it and only walk down to their nearest match.
+        Predicates are cached by identity, pass the same function every time to benefit from the cache.
+
+        :param element: Element that will follow the path, it is never its own match
+        :param query: Class to look for, subclasses included, or a predicate on grid objects
+        :param start: Position to search from, the element's position if None
+        :return: The nearest match and the path to it as for AttrPathFinding.set_path, or None if none is reachable
+        """
+        start = element.pose if start is None else start
+        x, y = int(start.x), int(start.y)
+        matches = query if not isinstance(query, type) else (lambda other: isinstance(other, query))
+        if matches(element):
+            # The shared map would lead the element to itself
+            distances = self._nearest_distances(element, query, exclude=element)
+        else:
+            key = (query, element.coexistence_key(), self.version)
+            distances = self.nearest_cache.get(key)
+            if distances is None:
+                distances = self._nearest_distances(element, query)
+                self.nearest_cache.put(key, distances)
+
+        path = deque([Pose(x, y)])
+        while distances[x, y] != 0:
+            step = descend(distances, x, y)
+            if step is None:
+                return None
+            x, y = step.x, step.y
+            path.append(Pose(x, y))
+        for other in self.cell(x, y):
+            if other is not element and matches(other):
+                return other, path
+        return None
+
+    def plan_paths(self, requests: Sequence[Tuple[Pose, Pose, GridObject]],
+                   jump_points: bool = False) -> List[Optional[deque[Pose]]]:
+        """ Finds paths for many queries at once, e.g. for a wave of drones that just spawned.
+
+        Queries are grouped by collision class. Batches of at least batch_threshold queries are fanned out over a
+        pool of worker processes, which read the collision matrices from shared memory instead of getting a pickled
+        copy each. Smaller batches are planned here through the path cache, where process overhead would dominate.
+
+        :param requests: (start, goal, element) queries, the element decides the collision class
+        :param jump_points: Use Jump Point Search, see a_star
+        :return: A path per query in the same order, as for AttrPathFinding.set_path, or None where there is no path
+        """
+        results: List[Optional[deque[Pose]]] = [None] * len(requests)
+        if len(requests) < self.batch_threshold:
+            for i, (start, goal, element) in enumerate(requests):
+                try:
+                    path = self.path_cache.find_path(element, start.as_discrete_point(), goal.as_discrete_point())
+                except PathFindingError:
+                    continue
+                results[i] = deque(Pose.from_discrete_point(point) for point in path)
+            return results
+
+        groups: Dict[Hashable, Tuple[GridObject, List[int]]] = {}
+        for i, (_, _, element) in enumerate(requests):
+            groups.setdefault(element.coexistence_key(), (element, []))[1].append(i)
+        if self._process_pool is None:
+            self._process_pool = ProcessPoolExecutor(self.batch_workers)
+        workers = self.batch_workers or os.cpu_count() or 1
+
+        blocks = []
+        futures = []
+        try:
+            for element, indices in groups.values():
+                matrix = self.get_collision_matrix(element)
+                components = self.get_connected_components(element)
+                queries = []
+                for i in indices:
+                    start, goal, _ = requests[i]
+                    sx, sy, gx, gy = int(start.x), int(start.y), int(goal.x), int(goal.y)
+                    if components.connected((sx, sy), (gx, gy)) and matrix[gx, gy]:
+                        queries.append((i, sx * self.height + sy, gx * self.height + gy))
+                if not queries:
+                    continue
+                shared = share_matrix(matrix)
+                blocks.append(shared)
+                chunk_size = -(-len(queries) // workers)
+                for chunk_start in range(0, len(queries), chunk_size):
+                    chunk = queries[chunk_start:chunk_start + chunk_size]
+                    future = self._process_pool.submit(plan_shared, shared.name, matrix.shape,
+                                                       [(start, goal) for _, start, goal in chunk], jump_points)
+                    futures.append((future, [i for i, _, _ in chunk]))
+            for future, indices in futures:
+                for i, path in zip(indices, future.result()):
+                    if path is not None:
+                        results[i] = deque(Pose(*divmod(node, self.height)) for node in path)
+        finally:
+            for shared in blocks:
+                shared.close()
+                shared.unlink()
+        return results
+
+    def close(self) -> None:
+        """ Shuts down the worker processes started by plan_paths and the landmark thread, if any.
+        """
+        if self._process_pool is not None:
+            self._process_pool.shutdown()
+            self._process_pool = None
+        if self.landmarks is not None:
+            self.landmarks.close()
+
+    def cell(self, x: int, y: int) -> List[GridObject]:
+        """ Gets the objects at the given position. Same as get(x, y) without the cost of dispatching on the argument
+        types, for hot paths.
+
+        :param x: X position to get objects at
+        :param y: Y position to get objects at
+        :return: List of objects at the given position, the grid's own list
+        """
+        return self.grid[x][y]
+
+    def cell_at(self, pose: Pose) -> List[GridObject]:
+        """ Gets the objects at the given position. Same as get(pose) without the cost of dispatching on the argument
+        types, for hot paths.
+
+        :param pose: Position to get objects at
+        :return: List of objects at the given position, the grid's own list
+        """
+        return self.grid[pose.x][pose.y]
+
+    def cells_in_rect(self, x: int, y: int, width: int, height: int) -> List[List[List[GridObject]]]:
+        """ Gets the cells of a rectangle at once, clipped to the grid. E.g. the cells a camera can see.
+
+        :param x: X position of the bottom left cell
+        :param y: Y position of the bottom left cell
+        :param width: Width of the rectangle
+        :param height: Height of the rectangle
+        :return: The cells indexed [x - max(x, 0)][y - max(y, 0)]. The cells are the grid's own lists.
+        """
+        x0, y0 = max(x, 0), max(y, 0)
+        return [column[y0:max(y + height, y0)] for column in self.grid[x0:max(x + width, x0)]]
 
     @dispatch(Pose)
     def get(self, pose: Pose) -> List[GridObject]:
@@ -83,7 +535,7 @@ class GameGrid(Drawable):
         :param pose: Position to get objects at
         :return: List of objects at the given position
         """
-        return self.grid[pose.x][pose.y]
+        return self.cell_at(pose)
 
     @dispatch(int, int)
     def get(self, x: int, y: int) -> List[GridObject]:
@@ -93,7 +545,7 @@ class GameGrid(Drawable):
         :param y: Y position to get objects at
         :return: List of objects at the given position
         """
-        return self.grid[x][y]
+        return self.cell(x, y)
 
     def equals(self, other: 'GameGrid') -> bool:
         """ Compares two game grids.
@@ -104,16 +556,107 @@ class GameGrid(Drawable):
         """
         return self.grid == other.grid
 
+    def _resolve_overlaps(self) -> None:
+        """ Runs the overlaps of a tick, only on cells where they can have an effect instead of for every element.
+
+        Batched effects, see GridObject.batched_effect, are summed per cell and applied to the health of every target
+        at once with NumPy: damage first, then healing clamped to max_health. With a component store the values are
+        read from and written to its columns directly. Other overlaps are called one by one afterwards.
+        """
+        kinds = self._overlap_kinds
+        damage_sources: List[GridObject] = []
+        healing_sources: List[GridObject] = []
+        targets: List[GridObject] = []
+        # Index of the cell of every damage source, healing source and target among the active cells
+        damage_cells: List[int] = []
+        healing_cells: List[int] = []
+        target_cells: List[int] = []
+        calls: List[Tuple[GridObject, List[GridObject]]] = []
+        cell = self.cell
+        index = 0
+        for x, y in self.active_cells:
+            others = cell(x, y)
+            for element in others:
+                kind = kinds.get(type(element))
+                if kind is None:
+                    cls = type(element)
+                    kind = kinds[cls] = (cls.batched_effect(), cls.has_overlap_effect(), cls.overlap_target)
+                effect, has_effect, target = kind
+                if effect is OverlapEffect.DAMAGE:
+                    damage_sources.append(element)
+                    damage_cells.append(index)
+                elif effect is OverlapEffect.HEALING:
+                    healing_sources.append(element)
+                    healing_cells.append(index)
+                elif has_effect:
+                    calls.append((element, others))
+                if target:
+                    targets.append(element)
+                    target_cells.append(index)
+            index += 1
+
+        if targets and (damage_sources or healing_sources):
+            store = self.components
+            if store is None:
+                damage_values = [source.damage for source in damage_sources]
+                healing_values = [source.healing for source in healing_sources]
+                health = np.fromiter((target.health for target in targets), dtype=np.float64, count=len(targets))
+            else:
+                columns = store.columns
+                damage_values = columns['damage'][[source._component_id for source in damage_sources]]
+                healing_values = columns['healing'][[source._component_id for source in healing_sources]]
+                target_ids = np.array([target._component_id for target in targets], dtype=np.intp)
+                health = columns['health'][target_ids]
+            cells = np.array(target_cells, dtype=np.intp)
+            damage = np.bincount(damage_cells, weights=damage_values, minlength=index)[cells]
+            healing = np.bincount(healing_cells, weights=healing_values, minlength=index)[cells]
+            new_health = health - damage + healing
+            # Only healed targets are clamped, so max_health is only read for them
+            healed = np.flatnonzero(healing > 0)
+            if len(healed):
+                if store is None:
+                    max_health = np.array([targets[i].max_health for i in healed.tolist()], dtype=np.float64)
+                else:
+                    max_health = columns['max_health'][target_ids[healed]]
+                new_health[healed] = np.minimum(new_health[healed], max_health)
+            changed = np.flatnonzero(new_health != health)
+            if store is None:
+                # Going through the health setter keeps the health_updated flags right
+                for i, value in zip(changed.tolist(), new_health[changed].tolist()):
+                    targets[i].health = value
+            else:
+                columns['health'][target_ids[changed]] = new_health[changed]
+                for i in changed.tolist():
+                    targets[i].health_updated = True
+
+        for element, others in calls:
+            element.overlaps(others)
+
     def draw(self, camera: Camera, dt: float):
         for element in self.drawables:
             element.draw(camera, dt)
 
     def update(self, dt: float = 1):
-        for element in self.always_update_list + self.update_list:
-            element.update(dt)
-        self.update_list = []
-        for element in self.elements:
-            element.overlaps(self.get(element.pose))
+        self.flow_fields.refresh()
+        self.path_scheduler.run()
+        self.tick_length = dt
+        lod = self.lod
+        if lod is None:
+            for element in self.always_update_list:
+                element.update(dt)
+        else:
+            lod.begin_tick()
+            for element in self.always_update_list:
+                element.update(lod.run(element, dt))
+        # Elements woken while these update are put in the other set, for the next tick
+        self.wakeups.advance()
+        self.update_list, self.updating = self.updating, self.update_list
+        for element in self.updating:
+            element.update(dt if lod is None else lod.run(element, dt))
+        self.updating.clear()
+        if lod is not None:
+            lod.end_tick()
+        self._resolve_overlaps()
 
         # # This is not the correct way to do this, also the pyglet objects cannot be pickled
         # # Would be nice to get working in the future
@@ -138,7 +681,7 @@ class GameGrid(Drawable):
         s = ''
         for y in reversed(range(self.height)):
             for x in range(self.width):
-                s += f'{len(self.grid[x][y]) if self.grid[x][y] else "."}'
+                s += f'{self.counts[x, y] or "."}'
             s += '\n'
         return s
 
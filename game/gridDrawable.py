@@ -1,5 +1,5 @@
 from abc import ABC
-from typing import Union
+from typing import Optional, Tuple, Union
 
 from pyglet import image, sprite
 from pyglet.shapes import ShapeBase
@@ -21,15 +21,41 @@ class GridDrawable(GridObject, Drawable, ABC):
         """
 
         :param pose: Starting pose of the object
-        :param img: Pyglet image to use for the sprite texture
+        :param img: Pyglet image to use for the sprite texture, None for no sprite, e.g. in headless mode
         :param rotation_center: Center of rotation for the sprite, must be set before initialization
         :param texture_size: size to display the texture at
         """
         super().__init__(pose)
         self.texture_size = texture_size
-        img.anchor_x = int(img.width * rotation_center[0])
-        img.anchor_y = int(img.height * rotation_center[1])
-        self._sprite: sprite.Sprite = sprite.Sprite(img, self.pose.x, self.pose.y)
+        self._sprite: Optional[sprite.Sprite] = None
+        if img is not None:
+            img.anchor_x = int(img.width * rotation_center[0])
+            img.anchor_y = int(img.height * rotation_center[1])
+            self._sprite = sprite.Sprite(img, self.pose.x, self.pose.y)
+        # Position at the previous tick and how far to draw towards the current one, see interpolate
+        self._previous_position: Optional[Tuple[float, float]] = None
+        self._alpha = 1.0
+
+    def interpolate(self, previous_x: float, previous_y: float, alpha: float) -> None:
+        """ Draws the object part of the way from where it was at the previous simulation tick to where it is now,
+        so movement looks smooth when frames are drawn between ticks.
+
+        :param previous_x: X position at the previous tick
+        :param previous_y: Y position at the previous tick
+        :param alpha: How far to draw towards the current position, from 0 to 1
+        """
+        self._previous_position = (previous_x, previous_y)
+        self._alpha = alpha
+
+    def render_position(self) -> Tuple[float, float]:
+        """
+        :return: Position to draw the object at, see interpolate
+        """
+        if self._previous_position is None:
+            return self.pose.x, self.pose.y
+        previous_x, previous_y = self._previous_position
+        return previous_x + (self.pose.x - previous_x) * self._alpha, \
+            previous_y + (self.pose.y - previous_y) * self._alpha
 
     def __update(self, camera: Camera):
         """ Updates the visual properties of this sprite.
@@ -42,13 +68,16 @@ class GridDrawable(GridObject, Drawable, ABC):
         """
         self._sprite.scale_x = self.texture_size * self.pose.w / self._sprite.image.width
         self._sprite.scale_y = self.texture_size * self.pose.h / self._sprite.image.height
-        self._sprite.x = self.texture_size * self.pose.x - (camera.pose.x - GRID_WIDTH / 2) * self.texture_size
-        self._sprite.y = self.texture_size * self.pose.y - (camera.pose.y - GRID_HEIGHT / 2) * self.texture_size
+        x, y = self.render_position()
+        self._sprite.x = self.texture_size * x - (camera.pose.x - GRID_WIDTH / 2) * self.texture_size
+        self._sprite.y = self.texture_size * y - (camera.pose.y - GRID_HEIGHT / 2) * self.texture_size
         self._sprite.rotation = self.pose.theta
 
     def get_sprites(self) -> list[Union[Sprite, ShapeBase]]:
-        return [self._sprite]
+        return [] if self._sprite is None else [self._sprite]
 
     def draw(self, camera: Camera, dt: float):
+        if self._sprite is None:
+            return
         self.__update(camera)
         self._sprite.draw()
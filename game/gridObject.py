@@ -1,16 +1,99 @@
 from abc import ABC, abstractmethod
+from dis import get_instructions
+from enum import Enum, auto
 from random import randint
-from typing import List, Type
+from typing import Callable, Dict, Hashable, List, Optional, Tuple, Type
 
 import numpy as np
 from PIL import Image as PILImage
 
+from game.constants import TILE_CAPACITY
 from game.pose import Pose
 
+# Instructions of a function body that only returns a constant, like `...` or `pass`
+_NO_OP_INSTRUCTIONS = {'RESUME', 'NOP', 'LOAD_CONST', 'RETURN_VALUE', 'RETURN_CONST'}
+
+
+def is_no_op(function: Callable) -> bool:
+    """ Checks if a function does nothing, from its bytecode. A docstring does not count.
+
+    :param function: Function to check
+    :return: True if calling the function can't have any effect
+    """
+    return all(instruction.opname in _NO_OP_INSTRUCTIONS for instruction in get_instructions(function))
+
+
+class OverlapEffect(Enum):
+    """ Overlap effects the grid applies to a whole tick at once instead of calling overlaps, see batched_effect.
+    """
+    DAMAGE = auto()  # Takes `damage` off the health of every overlap target in the cell
+    HEALING = auto()  # Adds `healing` to the health of every overlap target in the cell, up to their max_health
+
+
+class CollisionTable:
+    """ Dispatch table of the collision handlers that do something, per pair of classes.
+
+    For a mover of class A entering a cell with an object of class B, the table holds whether A.collision and
+    B.collision have to be called. Pairs are filled in on first use from has_collision_effect, so moves between inert
+    objects, like walls and players, cost a dictionary lookup and no calls.
+    """
+
+    def __init__(self):
+        # (mover class, other class) -> (call mover.collision, call other.collision)
+        self.pairs: Dict[Tuple[Type['GridObject'], Type['GridObject']], Tuple[bool, bool]] = {}
+        self.calls = 0
+        self.skipped = 0
+
+    def handlers(self, mover_class: Type['GridObject'], other_class: Type['GridObject']) -> Tuple[bool, bool]:
+        """
+        :return: Whether the mover's and the other object's collision handlers have to be called
+        """
+        pair = self.pairs.get((mover_class, other_class))
+        if pair is None:
+            pair = self.pairs[mover_class, other_class] = (mover_class.has_collision_effect(),
+                                                           other_class.has_collision_effect())
+        return pair
+
+    def collide(self, mover: 'GridObject', other: 'GridObject') -> None:
+        """ Runs mover.collision(other) and other.collision(mover), skipping the handlers that do nothing.
+        """
+        pair = self.pairs.get((type(mover), type(other)))
+        if pair is None:
+            pair = self.handlers(type(mover), type(other))
+        mover_effect, other_effect = pair
+        if mover_effect:
+            mover.collision(other)
+        if other_effect:
+            other.collision(mover)
+        calls = mover_effect + other_effect
+        self.calls += calls
+        self.skipped += 2 - calls
+
+    def reset_stats(self) -> None:
+        """ Resets the call counters
+        """
+        self.calls = 0
+        self.skipped = 0
+
+    def stats(self) -> Dict[str, int]:
+        """
+        :return: Handler calls made and skipped, and the number of class pairs seen
+        """
+        return {'calls': self.calls, 'skipped': self.skipped, 'pairs': len(self.pairs)}
+
+    def __str__(self):
+        return f'CollisionTable({", ".join(f"{k}={v}" for k, v in self.stats().items())})'
+
 
 class GridObject(ABC):
     """ Abstract class for things which can be placed on the game grid
     """
+    # Whether the overlaps of other objects can affect this object. The grid only runs overlaps on cells holding both
+    # an object with an overlap effect and an overlap target, see has_overlap_effect. Targets of batched effects need
+    # health and max_health, see batched_effect
+    overlap_target = False
+    # Shared by every grid, see CollisionTable
+    collision_table = CollisionTable()
 
     def __init__(self, pose: Pose = Pose()):
         super().__init__()
@@ -54,25 +137,29 @@ class GridObject(ABC):
             return False
 
         # Perform collision simulations between this object and all other objects at the given position
-        for other in self.grid.get(pose):
-            self.collision(other)
-            other.collision(self)
+        others = self.grid.cell_at(pose)
+        if others:
+            collide = self.collision_table.collide
+            for other in others:
+                collide(self, other)
 
         # Check if the object can coexist with other objects at the given position
-        if not self.can_coexist(self.grid.get(pose)):
+        if not self.can_coexist(others):
             return False
 
         # Remove from old position.
         # Try except could be avoided with a check to self.grid.objects,
         # but this is more efficient since it only checks the grid once and will rarely fail
         try:
-            self.grid.get(self.pose).remove(self)
+            self.grid._vacate(self, self.pose.x, self.pose.y)
         except ValueError:
             ...  # Object was not in the grid, happens on first adding to grid
+        else:
+            self.grid._moved(self, self.pose.x, self.pose.y)
 
         # Update pose and add to new position
         self.pose.set_to(pose)
-        self.grid.get(self.pose).append(self)
+        self.grid._occupy(self, self.pose.x, self.pose.y)
         return True
 
     @abstractmethod
@@ -83,11 +170,76 @@ class GridObject(ABC):
         :return: bool, true if this object can coexist with the other object
         """
         total_size = self.tile_size + sum([other.tile_size for other in others])
-        return total_size <= 5
+        return total_size <= TILE_CAPACITY
+
+    def can_coexist_matrix(self, grid: 'GameGrid') -> np.ndarray:
+        """ Vectorized can_coexist over every cell of the grid, computed from the grid's occupancy layers.
+        Classes which override can_coexist with different rules need to override this to match.
+
+        :param grid: Grid to check against
+        :return: 2D boolean array indexed [x, y], true where this object can coexist with the cell's objects
+        """
+        return self.tile_size + grid.tile_sizes <= TILE_CAPACITY
+
+    def coexistence_key(self) -> Hashable:
+        """ Objects with equal keys always get the same collision matrix, which lets them share cached matrices.
+
+        :return: Key made of the vectorized coexistence rule and the tile size
+        """
+        return type(self).can_coexist_matrix, self.tile_size
+
+    @classmethod
+    def has_overlap_effect(cls) -> bool:
+        """ Whether overlaps does anything for objects of this class. Worked out once per class from the bytecode of
+        overlaps, so the grid can skip objects whose overlaps is empty without calling it.
+
+        :return: False if the class's overlaps is a no-op
+        """
+        effect = cls.__dict__.get('_overlap_effect')
+        if effect is None:
+            effect = not is_no_op(cls.overlaps)
+            cls._overlap_effect = effect
+        return effect
+
+    @classmethod
+    def has_update(cls) -> bool:
+        """ Whether update does anything for objects of this class, worked out once per class like
+        has_overlap_effect. The grid wakes objects that are not updated every frame once when they are added if it
+        does, see WakeupScheduler.
+
+        :return: False if the class's update is a no-op
+        """
+        effect = cls.__dict__.get('_update_effect')
+        if effect is None:
+            effect = not is_no_op(cls.update)
+            cls._update_effect = effect
+        return effect
+
+    @classmethod
+    def batched_effect(cls) -> Optional[OverlapEffect]:
+        """ Lets the grid apply this class's overlap effect to every cell at once with NumPy, instead of calling
+        overlaps on every object. Only for classes whose overlaps does exactly what the effect describes.
+
+        :return: The effect of overlaps, None if overlaps has to be called
+        """
+        return None
+
+    @classmethod
+    def has_collision_effect(cls) -> bool:
+        """ Whether collision does anything for objects of this class, worked out like has_overlap_effect.
+
+        :return: False if the class's collision is a no-op
+        """
+        effect = cls.__dict__.get('_collision_effect')
+        if effect is None:
+            effect = not is_no_op(cls.collision)
+            cls._collision_effect = effect
+        return effect
 
     @abstractmethod
     def overlaps(self, others: List['GridObject']) -> None:
-        """ Handle overlapping with other objects on the grid every frame
+        """ Handle overlapping with other objects on the grid every frame.
+        Only called on cells that hold an overlap target, see overlap_target.
 
         :param others: Objects this object overlaps with, including self
         :return: None
@@ -109,7 +261,8 @@ class GridObject(ABC):
 
     @abstractmethod
     def update(self, dt: float) -> None:
-        """ Handle updates, called every frame if class variable update_every_frame is True
+        """ Handle updates, called every frame if update_every_frame is True, otherwise when woken by the grid's
+        WakeupScheduler
 
         :param dt: Time since last update
         :return: None
@@ -138,9 +291,16 @@ def add_from_image(grid: 'GameGrid', element_class: Type[GridObject],
     :return: None
     """
     bool_array = np.asarray(PILImage.open(image_path)) == 0
-    for row_num, row in enumerate(reversed(bool_array)):
-        for col_num, element in enumerate(row):
-            if element:
-                grid.add(element_class(
-                    Pose(col_num, row_num, 90 * randint(0, 3) * random_rotation)
-                ))
+    for row_num, col_num in np.argwhere(bool_array[::-1]).tolist():
+        grid.add(element_class(
+            Pose(col_num, row_num, 90 * randint(0, 3) * random_rotation)
+        ))
+
+
+def map_size(image_path: str) -> Tuple[int, int]:
+    """ Gets the size of the grid a map image describes, one cell per pixel
+
+    :param image_path: Path to image
+    :return: (width, height) of the map
+    """
+    return PILImage.open(image_path).size
@@ -0,0 +1,24 @@
+""" Switch for running the engine without a display, see game.simulation.
+
+Pyglet opens a hidden shadow window as soon as its OpenGL module is imported, which fails on machines without a
+display. enable_headless turns that off, so it has to be called before anything imports pyglet.gl, e.g. sprites or
+shapes. Objects created while headless get no textures, sprites or shapes and draw nothing.
+"""
+import pyglet
+
+_headless = False
+
+
+def enable_headless() -> None:
+    """ Switches to headless mode. To be called before any other game module is imported.
+    """
+    global _headless
+    pyglet.options['shadow_window'] = False
+    _headless = True
+
+
+def is_headless() -> bool:
+    """
+    :return: True if objects should be created without graphics
+    """
+    return _headless
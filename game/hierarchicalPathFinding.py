@@ -0,0 +1,432 @@
+from collections import deque
+from heapq import heappush, heappop
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from game.flowField import wavefront_distances
+from game.math import DiscretePoint, PathFindingError
+
+_Cell = Tuple[int, int]
+
+
+class HierarchicalPath:
+    """ A path planned on the abstract graph, refined into tile paths one segment at a time.
+    """
+
+    def __init__(self, finder: 'HierarchicalPathFinder', waypoints: List[int]):
+        """
+
+        :param finder: Finder that planned the path
+        :param waypoints: Node ids of the abstract path, from start to goal inclusive
+        """
+        self.finder = finder
+        self.waypoints = waypoints
+        self._next = 1
+
+    def has_next_segment(self) -> bool:
+        """
+        :return: True if there are segments left to refine
+        """
+        return self._next < len(self.waypoints)
+
+    def next_segment(self) -> Optional[List[_Cell]]:
+        """ Refines the next part of the path into tiles.
+
+        :return: Cells from the end of the previous segment to the next waypoint inclusive,
+            or None if there is nothing left or the grid changed so the segment can't be walked anymore
+        """
+        if not self.has_next_segment():
+            return None
+        start = self.waypoints[self._next - 1]
+        end = self.waypoints[self._next]
+        self._next += 1
+        return self.finder.refine(start, end)
+
+    def remaining_waypoints(self) -> List[_Cell]:
+        """
+        :return: Cells of the waypoints that were not reached yet
+        """
+        return [self.finder.cell(node) for node in self.waypoints[self._next:]]
+
+
+class HierarchicalPathFinder:
+    """ Hierarchical path-finding (HPA*, Botea et al.) over a collision matrix.
+
+    The map is split into square clusters. Entrances are the maximal runs of passable cell pairs across each border
+    between two clusters, and each one adds one or two transitions (pairs of abstract nodes, one on each side).
+    Costs between the abstract nodes of a cluster are computed the first time a search needs them and cached.
+    A query searches the abstract graph and refines the result into tiles lazily, one segment at a time.
+    When cells change only the borders and clusters containing them are rebuilt.
+
+    Nodes are integer ids, ``x * height + y``.
+    """
+
+    def __init__(self, passable: np.ndarray, cluster_size: int = 16, long_entrance: int = 6):
+        """
+
+        :param passable: 2D boolean array indexed [x, y]. Truthy values are valid paths.
+        :param cluster_size: Width and height of a cluster in tiles
+        :param long_entrance: Entrances at least this long get a transition at both ends instead of one in the middle
+        """
+        self.width, self.height = passable.shape
+        self.cluster_size = cluster_size
+        self.long_entrance = long_entrance
+        self.clusters_x = -(-self.width // cluster_size)
+        self.clusters_y = -(-self.height // cluster_size)
+        self.passable_matrix = np.array(passable, dtype=bool)
+        self.passable: List[bool] = self.passable_matrix.ravel().tolist()
+
+        # (cluster, neighbouring cluster with a larger index) -> transitions as (node in first, node in second)
+        self._transitions: Dict[Tuple[int, int], List[Tuple[int, int]]] = {}
+        # node -> nodes in neighbouring clusters it has a transition to
+        self._inter: Dict[int, Set[int]] = {}
+        # cluster -> abstract nodes in the cluster
+        self._cluster_nodes: Dict[int, Set[int]] = {}
+        # cluster -> node -> {node: distance} inside the cluster, filled in lazily
+        self._intra: Dict[int, Dict[int, Dict[int, int]]] = {}
+        # Number of abstract nodes expanded since creation, useful for profiling
+        self.expansions = 0
+
+        for cluster in range(self.clusters_x * self.clusters_y):
+            for border in self._cluster_borders(cluster):
+                if border not in self._transitions:
+                    self._build_border(*border)
+
+    def node(self, x: int, y: int) -> int:
+        """
+        :return: The node id of the cell
+        """
+        return x * self.height + y
+
+    def cell(self, node: int) -> _Cell:
+        """
+        :return: The cell of the node id
+        """
+        return divmod(node, self.height)
+
+    def cluster_of(self, node: int) -> int:
+        """
+        :return: Index of the cluster the node is in
+        """
+        x, y = divmod(node, self.height)
+        return (x // self.cluster_size) * self.clusters_y + y // self.cluster_size
+
+    def _cluster_bounds(self, cluster: int) -> Tuple[int, int, int, int]:
+        """
+        :return: x_min, x_max, y_min, y_max of the cluster, max exclusive
+        """
+        cx, cy = divmod(cluster, self.clusters_y)
+        x_min, y_min = cx * self.cluster_size, cy * self.cluster_size
+        return x_min, min(self.width, x_min + self.cluster_size), y_min, min(self.height, y_min + self.cluster_size)
+
+    def _cluster_borders(self, cluster: int) -> List[Tuple[int, int]]:
+        cx, cy = divmod(cluster, self.clusters_y)
+        borders = []
+        if cx > 0:
+            borders.append((cluster - self.clusters_y, cluster))
+        if cx < self.clusters_x - 1:
+            borders.append((cluster, cluster + self.clusters_y))
+        if cy > 0:
+            borders.append((cluster - 1, cluster))
+        if cy < self.clusters_y - 1:
+            borders.append((cluster, cluster + 1))
+        return borders
+
+    def _border_pairs(self, first: int, second: int) -> List[Tuple[int, int]]:
+        """
+        :return: Pairs of facing cells along the border, as node ids (cell in first, cell in second)
+        """
+        x_min, x_max, y_min, y_max = self._cluster_bounds(first)
+        # With a single row of clusters the right neighbour is first + 1 as well, so test for it first
+        if second == first + self.clusters_y:  # second is to the right
+            return [(self.node(x_max - 1, y), self.node(x_max, y)) for y in range(y_min, y_max)]
+        return [(self.node(x, y_max - 1), self.node(x, y_max)) for x in range(x_min, x_max)]
+
+    def _build_border(self, first: int, second: int) -> None:
+        """ Finds the entrances along a border and replaces its transitions.
+        """
+        for a, b in self._transitions.pop((first, second), []):
+            self._inter[a].discard(b)
+            self._inter[b].discard(a)
+
+        transitions = []
+        run: List[Tuple[int, int]] = []
+        for a, b in self._border_pairs(first, second) + [(-1, -1)]:
+            if a >= 0 and self.passable[a] and self.passable[b]:
+                run.append((a, b))
+                continue
+            if len(run) >= self.long_entrance:
+                transitions += [run[0], run[-1]]
+            elif run:
+                transitions.append(run[len(run) // 2])
+            run = []
+        self._transitions[(first, second)] = transitions
+        for a, b in transitions:
+            self._inter.setdefault(a, set()).add(b)
+            self._inter.setdefault(b, set()).add(a)
+
+    def _rebuild_cluster_nodes(self, cluster: int) -> None:
+        nodes = set()
+        for first, second in self._cluster_borders(cluster):
+            for a, b in self._transitions[(first, second)]:
+                nodes.add(a if first == cluster else b)
+        self._cluster_nodes[cluster] = nodes
+        self._intra.pop(cluster, None)
+
+    def _nodes_in(self, cluster: int) -> Set[int]:
+        if cluster not in self._cluster_nodes:
+            self._rebuild_cluster_nodes(cluster)
+        return self._cluster_nodes[cluster]
+
+    def _local_search(self, source: int, targets: Optional[Set[int]] = None,
+                      goal: Optional[int] = None) -> Tuple[Dict[int, int], Dict[int, int]]:
+        """ Breadth first search that stays inside the source's cluster.
+
+        :param source: Node to start from, does not need to be passable
+        :param targets: Nodes to find distances to, the search stops once all are found
+        :param goal: Node to stop at
+        :return: Distances and parents of the visited nodes
+        """
+        x_min, x_max, y_min, y_max = self._cluster_bounds(self.cluster_of(source))
+        height = self.height
+        passable = self.passable
+        distances = {source: 0}
+        parents = {source: -1}
+        remaining = len(targets - {source}) if targets is not None else -1
+        frontier = deque([source])
+        while frontier and remaining != 0:
+            current = frontier.popleft()
+            if current == goal:
+                break
+            x, y = divmod(current, height)
+            for neighbour, nx, ny in ((current - height, x - 1, y), (current + height, x + 1, y),
+                                      (current + 1, x, y + 1), (current - 1, x, y - 1)):
+                if nx < x_min or nx >= x_max or ny < y_min or ny >= y_max:
+                    continue
+                if neighbour in distances or not passable[neighbour]:
+                    continue
+                distances[neighbour] = distances[current] + 1
+                parents[neighbour] = current
+                frontier.append(neighbour)
+                if targets is not None and neighbour in targets:
+                    remaining -= 1
+        return distances, parents
+
+    def _intra_edges(self, node: int) -> Dict[int, int]:
+        """ Distances from an abstract node to the other abstract nodes of its cluster.
+        The first time a cluster is needed the distances between all of its nodes are computed at once.
+        """
+        cluster = self.cluster_of(node)
+        edges = self._intra.get(cluster)
+        if edges is None:
+            edges = self._intra[cluster] = self._cluster_edges(cluster)
+        return edges[node]
+
+    def _cluster_edges(self, cluster: int) -> Dict[int, Dict[int, int]]:
+        """ Distances between every pair of abstract nodes in a cluster, with one batched wavefront per cluster.
+        """
+        nodes = sorted(self._nodes_in(cluster))
+        x_min, x_max, y_min, y_max = self._cluster_bounds(cluster)
+        local = self.passable_matrix[x_min:x_max, y_min:y_max]
+        frontier = np.zeros((len(nodes),) + local.shape, dtype=bool)
+        cells = [(x - x_min, y - y_min) for x, y in map(self.cell, nodes)]
+        for i, (x, y) in enumerate(cells):
+            frontier[i, x, y] = True
+        xs, ys = zip(*cells) if cells else ((), ())
+        table = wavefront_distances(local, frontier)[:, list(xs), list(ys)].tolist()
+        return {node: {other: distance for other, distance in zip(nodes, row) if other != node and distance >= 0}
+                for node, row in zip(nodes, table)}
+
+    def precompute(self) -> None:
+        """ Computes the intra-cluster costs of every cluster up front instead of on first use.
+        """
+        for cluster in range(self.clusters_x * self.clusters_y):
+            if cluster not in self._intra:
+                self._intra[cluster] = self._cluster_edges(cluster)
+
+    def update(self, passable: np.ndarray, cells: Optional[Iterable[_Cell]] = None) -> int:
+        """ Applies a new collision matrix, rebuilding only the borders and clusters that contain changed cells.
+
+        :param passable: 2D boolean array indexed [x, y], with the same shape as the original
+        :param cells: Cells that may have changed, such as GameGrid.dirty_cells. All cells are compared if None.
+        :return: Number of cells that changed
+        """
+        passable = np.asarray(passable, dtype=bool)
+        if cells is None:
+            changed = [tuple(cell) for cell in np.argwhere(passable != self.passable_matrix).tolist()]
+        else:
+            changed = [(x, y) for x, y in cells if passable[x, y] != self.passable_matrix[x, y]]
+        if not changed:
+            return 0
+        self.passable_matrix = passable.copy()
+
+        clusters = set()
+        borders = set()
+        for x, y in changed:
+            node = self.node(x, y)
+            self.passable[node] = bool(passable[x, y])
+            cluster = self.cluster_of(node)
+            clusters.add(cluster)
+            x_min, x_max, y_min, y_max = self._cluster_bounds(cluster)
+            # Only cells on the edge of a cluster can change its entrances
+            if x in (x_min, x_max - 1) or y in (y_min, y_max - 1):
+                borders.update(self._cluster_borders(cluster))
+        for border in borders:
+            self._build_border(*border)
+            clusters.update(border)
+        for cluster in clusters:
+            self._rebuild_cluster_nodes(cluster)
+        return len(changed)
+
+    def find_path(self, start: _Cell, goal: _Cell) -> HierarchicalPath:
+        """ Plans a path on the abstract graph. Tiles are only worked out as segments are requested.
+
+        :param start: Cell to start from, does not need to be passable
+        :param goal: Cell to reach
+        :raises PathFindingError: if there is no path
+        :return: The planned path
+        """
+        start_node = self.node(*start)
+        goal_node = self.node(*goal)
+        if not self.passable[goal_node]:
+            raise PathFindingError(DiscretePoint(*start), DiscretePoint(*goal), self.passable_matrix)
+        if start_node == goal_node:
+            return HierarchicalPath(self, [start_node])
+
+        start_cluster = self.cluster_of(start_node)
+        goal_cluster = self.cluster_of(goal_node)
+        if start_cluster == goal_cluster:
+            distances, _ = self._local_search(start_node, goal=goal_node)
+            if goal_node in distances:
+                return HierarchicalPath(self, [start_node, goal_node])
+
+        # Temporarily connect the start and goal to the abstract nodes of their clusters
+        start_nodes = self._nodes_in(start_cluster)
+        distances, _ = self._local_search(start_node, start_nodes)
+        start_edges = {node: distances[node] for node in start_nodes if node in distances}
+        goal_nodes = self._nodes_in(goal_cluster)
+        distances, _ = self._local_search(goal_node, goal_nodes)
+        goal_edges = {node: distances[node] for node in goal_nodes if node in distances}
+        via = {} if self.passable[start_node] else self._steps_out(start_node, goal_node, start_edges)
+
+        waypoints = self._abstract_search(start_node, goal_node, start_edges, goal_edges)
+        if waypoints is None:
+            raise PathFindingError(DiscretePoint(*start), DiscretePoint(*goal), self.passable_matrix)
+        if waypoints[1] in via:
+            waypoints.insert(1, via[waypoints[1]])
+        return HierarchicalPath(self, waypoints)
+
+    def _steps_out(self, start: int, goal: int, start_edges: Dict[int, int]) -> Dict[int, int]:
+        """ Connects an impassable start to the clusters next to it. No entrance crosses the border there, but the
+        first step can still go to a passable neighbour on the other side.
+
+        :param start: Impassable start node
+        :param goal: Goal node
+        :param start_edges: Start edges to add the edges through the neighbours to
+        :return: Node reached through a neighbour -> the neighbour, to insert as a waypoint
+        """
+        via = {}
+        x, y = self.cell(start)
+        cluster = self.cluster_of(start)
+        for nx, ny in ((x - 1, y), (x + 1, y), (x, y - 1), (x, y + 1)):
+            if not (0 <= nx < self.width and 0 <= ny < self.height):
+                continue
+            neighbour = self.node(nx, ny)
+            if not self.passable[neighbour] or self.cluster_of(neighbour) == cluster:
+                continue
+            targets = set(self._nodes_in(self.cluster_of(neighbour)))
+            if self.cluster_of(goal) == self.cluster_of(neighbour):
+                targets.add(goal)
+            distances, _ = self._local_search(neighbour, targets)
+            for node in targets:
+                if node in distances and distances[node] + 1 < start_edges.get(node, distances[node] + 2):
+                    start_edges[node] = distances[node] + 1
+                    via[node] = neighbour
+        return via
+
+    def _abstract_search(self, start: int, goal: int, start_edges: Dict[int, int],
+                         goal_edges: Dict[int, int]) -> Optional[List[int]]:
+        """ A* over the abstract graph plus the temporary start and goal edges.
+        """
+        goal_x, goal_y = divmod(goal, self.height)
+
+        def heuristic(node: int) -> int:
+            x, y = divmod(node, self.height)
+            return abs(x - goal_x) + abs(y - goal_y)
+
+        g_cost = {start: 0}
+        parents = {start: -1}
+        closed = set()
+        # Ties on f are broken towards the goal, on open maps most nodes share the same f
+        frontier = [(heuristic(start), heuristic(start), start)]
+        while frontier:
+            _, _, current = heappop(frontier)
+            if current in closed:
+                continue
+            if current == goal:
+                path = [current]
+                while parents[current] != -1:
+                    current = parents[current]
+                    path.append(current)
+                path.reverse()
+                return path
+            closed.add(current)
+            self.expansions += 1
+
+            if current == start:
+                # The start can be an entrance itself, start_edges then stand in for its intra edges
+                edges = list(start_edges.items())
+            else:
+                edges = list(self._intra_edges(current).items())
+                if current in goal_edges:
+                    edges.append((goal, goal_edges[current]))
+            edges += [(other, 1) for other in self._inter.get(current, ())]
+            for neighbour, cost in edges:
+                g = g_cost[current] + cost
+                if neighbour in closed or g >= g_cost.get(neighbour, g + 1):
+                    continue
+                g_cost[neighbour] = g
+                parents[neighbour] = current
+                h = heuristic(neighbour)
+                heappush(frontier, (g + h, h, neighbour))
+        return None
+
+    def refine(self, start: int, end: int) -> Optional[List[_Cell]]:
+        """ Works out the tiles between two consecutive waypoints of an abstract path.
+
+        :param start: Node to start from
+        :param end: Node to reach, either in the same cluster or right across a border
+        :return: Cells from start to end inclusive, or None if they are no longer connected
+        """
+        if self.cluster_of(start) != self.cluster_of(end):
+            # Right across a border, through a transition or the first step off an impassable start
+            (x, y), (end_x, end_y) = self.cell(start), self.cell(end)
+            if abs(x - end_x) + abs(y - end_y) == 1 and self.passable[end]:
+                return [self.cell(start), self.cell(end)]
+            return None
+        _, parents = self._local_search(start, goal=end)
+        if end not in parents:
+            return None
+        path = [end]
+        while parents[path[-1]] != -1:
+            path.append(parents[path[-1]])
+        path.reverse()
+        return [self.cell(node) for node in path]
+
+    def find_full_path(self, start: _Cell, goal: _Cell) -> List[_Cell]:
+        """ Plans a path and refines every segment at once.
+
+        :param start: Cell to start from
+        :param goal: Cell to reach
+        :raises PathFindingError: if there is no path
+        :return: Cells from start to goal inclusive
+        """
+        path = self.find_path(start, goal)
+        cells = [start]
+        while path.has_next_segment():
+            segment = path.next_segment()
+            if segment is None:
+                raise PathFindingError(DiscretePoint(*start), DiscretePoint(*goal), self.passable_matrix)
+            cells += segment[1:]
+        return cells
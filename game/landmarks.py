@@ -0,0 +1,170 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+
+from game.flowField import distance_map
+from game.gridObject import GridObject
+
+
+class LandmarkTable:
+    """ Exact distances from a few landmark cells to every cell, for the ALT heuristic (A*, Landmarks, Triangle
+    inequality, Goldberg & Harrison).
+
+    For any landmark L, |d(L, target) - d(L, node)| is a lower bound on d(node, target) that accounts for walls,
+    so A* expands far less of twisty maps than with the Manhattan distance while still finding the shortest path.
+    Landmarks are picked by farthest point selection: every new landmark is the cell farthest from the ones picked so
+    far, cells no landmark can reach first.
+    """
+
+    def __init__(self, passable: np.ndarray, count: int = 8):
+        """
+
+        :param passable: 2D boolean array indexed [x, y]. Truthy values are valid paths.
+        :param count: Number of landmarks to pick
+        """
+        self.width, self.height = passable.shape
+        self.passable_matrix = np.array(passable, dtype=bool)
+        # Grid version the passable matrix was taken at
+        self.version = 0
+        self.landmarks: List[Tuple[int, int]] = []
+        maps = []
+        free = np.argwhere(self.passable_matrix)
+        if len(free):
+            # Farthest from nothing in particular is as good as anywhere, start from the first free cell
+            nearest = distance_map(self.passable_matrix, [tuple(free[0])]).astype(np.int64)
+            for _ in range(count):
+                # Unreachable cells count as infinitely far, so every component gets a landmark before any gets two
+                candidates = np.where(nearest < 0, np.iinfo(np.int64).max, nearest)
+                candidates[~self.passable_matrix] = -1
+                landmark = np.unravel_index(np.argmax(candidates), candidates.shape)
+                if candidates[landmark] <= 0 and maps:
+                    break
+                distances = distance_map(self.passable_matrix, [landmark])
+                maps.append(distances)
+                self.landmarks.append((int(landmark[0]), int(landmark[1])))
+                nearest = np.where((nearest < 0) | ((distances >= 0) & (distances < nearest)), distances, nearest)
+        # One flat list per landmark indexed by node id, ``x * height + y``. -1 where the landmark can't be reached
+        self.distances: List[List[int]] = [distances.ravel().tolist() for distances in maps]
+
+    def heuristic(self, target: Tuple[int, int]) -> Callable[[int], int]:
+        """ Builds the ALT heuristic towards a target, for a_star.
+
+        :param target: Cell to reach
+        :return: Function giving a lower bound on the distance from a node id to the target
+        """
+        height = self.height
+        target_x, target_y = target
+        target_node = target_x * height + target_y
+        pairs = [(distances, distances[target_node]) for distances in self.distances if distances[target_node] >= 0]
+
+        def landmark_heuristic(node: int) -> int:
+            x, y = divmod(node, height)
+            best = abs(x - target_x) + abs(y - target_y)
+            for distances, to_target in pairs:
+                to_node = distances[node]
+                if to_node >= 0:
+                    bound = to_node - to_target if to_node > to_target else to_target - to_node
+                    if bound > best:
+                        best = bound
+            return best
+
+        return landmark_heuristic
+
+
+class LandmarkService:
+    """ Keeps a landmark table per collision class and rebuilds it in a background thread when it goes stale.
+
+    A table built before walls were added only underestimates distances more, so it stays usable. Once any cell opened
+    up since the table was built its bounds may overestimate, and searches fall back to the Manhattan distance until
+    the replacement table is ready.
+    """
+
+    def __init__(self, grid: 'GameGrid', count: int = 8):
+        """
+
+        :param grid: Grid the tables are built over
+        :param count: Number of landmarks per table
+        """
+        self.grid = grid
+        self.count = count
+        self._tables: Dict[Hashable, LandmarkTable] = {}
+        # Tables being built, with the grid version they are built at
+        self._pending: Dict[Hashable, Tuple[Future, int]] = {}
+        # collision class -> (grid version, if the table was still admissible at that version)
+        self._checked: Dict[Hashable, Tuple[int, bool]] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.builds = 0
+
+    def _submit(self, key: Hashable, element: GridObject) -> None:
+        if key in self._pending:
+            return
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='landmarks')
+        # Collision matrices are read only, the worker can use this one while the grid moves on
+        matrix = self.grid.get_collision_matrix(element)
+        self._pending[key] = (self._executor.submit(LandmarkTable, matrix, self.count), self.grid.version)
+
+    def _collect(self, key: Hashable) -> None:
+        """ Takes over a finished background build.
+        """
+        pending = self._pending.get(key)
+        if pending is None or not pending[0].done():
+            return
+        del self._pending[key]
+        future, version = pending
+        table = future.result()
+        table.version = version
+        self._tables[key] = table
+        self._checked.pop(key, None)
+        self.builds += 1
+
+    def _admissible(self, key: Hashable, element: GridObject, table: LandmarkTable) -> bool:
+        """ Checks that no cell opened up since the table was built, in which case its bounds still hold.
+        """
+        checked = self._checked.get(key)
+        if checked is not None and (checked[0] == self.grid.version or not checked[1]):
+            return checked[1]
+        current = self.grid.get_collision_matrix(element)
+        changed = self.grid.changed_cells(element, table.passable_matrix, table.version)
+        admissible = not any(current[cell] for cell in changed)
+        self._checked[key] = (self.grid.version, admissible)
+        return admissible
+
+    def get_table(self, element: GridObject) -> Optional[LandmarkTable]:
+        """ Gets the landmark table for an element's collision class, starting a rebuild if needed.
+
+        :param element: Element that wants to plan
+        :return: A table whose bounds hold on the current grid, or None while there is none
+        """
+        key = element.coexistence_key()
+        self._collect(key)
+        table = self._tables.get(key)
+        if table is None or not self._admissible(key, element, table):
+            self._submit(key, element)
+            return None
+        return table
+
+    def heuristic(self, element: GridObject, target: Tuple[int, int]) -> Optional[Callable[[int], int]]:
+        """ Gets the ALT heuristic for a search, see a_star.
+
+        :param element: Element that wants to plan
+        :param target: Cell to reach
+        :return: The heuristic, or None to use the Manhattan distance while the table is being built
+        """
+        table = self.get_table(element)
+        return None if table is None else table.heuristic(target)
+
+    def wait(self) -> None:
+        """ Blocks until every pending table is built, e.g. while a level loads.
+        """
+        for key, (future, _) in list(self._pending.items()):
+            future.result()
+            self._collect(key)
+
+    def close(self) -> None:
+        """ Stops the background thread.
+        """
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
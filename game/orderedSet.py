@@ -0,0 +1,91 @@
+from typing import Dict, Generic, Hashable, Iterable, Iterator, List, TypeVar
+
+T = TypeVar('T', bound=Hashable)
+
+# Marks the slot of a removed item until the slots are compacted
+_REMOVED = object()
+
+
+class OrderedSet(Generic[T]):
+    """ Insertion ordered set with O(1) add, remove and membership checks.
+
+    Items live in slots of a list, with a dict from item to slot. Removing an item leaves a tombstone in its slot,
+    so iteration stays stable while items are added or removed: removed items are skipped, and added items are
+    visited at the end like with a list. Tombstones are compacted away once they make up half of the slots and no
+    iteration is running.
+    """
+
+    def __init__(self, items: Iterable[T] = ()):
+        """
+
+        :param items: Items to start with, in order
+        """
+        self._slots: List[T] = []
+        self._index: Dict[T, int] = {}
+        self._iterating = 0
+        for item in items:
+            self.add(item)
+
+    def add(self, item: T) -> None:
+        """ Adds an item at the end, if it is not in the set already.
+
+        :param item: Item to add
+        """
+        if item not in self._index:
+            self._index[item] = len(self._slots)
+            self._slots.append(item)
+
+    def remove(self, item: T) -> None:
+        """ Removes an item.
+
+        :param item: Item to remove
+        :raises KeyError: if the item is not in the set
+        """
+        self._slots[self._index.pop(item)] = _REMOVED
+        self._compact()
+
+    def discard(self, item: T) -> None:
+        """ Removes an item if it is in the set.
+
+        :param item: Item to remove
+        """
+        if item in self._index:
+            self.remove(item)
+
+    def clear(self) -> None:
+        """ Removes every item. Running iterations stop.
+        """
+        self._index.clear()
+        if self._iterating:
+            self._slots[:] = [_REMOVED] * len(self._slots)
+        else:
+            self._slots.clear()
+
+    def _compact(self) -> None:
+        if self._iterating or len(self._index) * 2 >= len(self._slots):
+            return
+        self._slots = [item for item in self._slots if item is not _REMOVED]
+        self._index = {item: slot for slot, item in enumerate(self._slots)}
+
+    def __contains__(self, item: T) -> bool:
+        return item in self._index
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __iter__(self) -> Iterator[T]:
+        self._iterating += 1
+        try:
+            slot = 0
+            # Re-read the length every time so items added while iterating are visited too
+            while slot < len(self._slots):
+                item = self._slots[slot]
+                if item is not _REMOVED:
+                    yield item
+                slot += 1
+        finally:
+            self._iterating -= 1
+            self._compact()
+
+    def __str__(self):
+        return f'OrderedSet([{", ".join(str(item) for item in self)}])'
@@ -0,0 +1,139 @@
+from collections import OrderedDict, deque
+from typing import Dict, Hashable, Set, Tuple
+
+import numpy as np
+
+from game.gridObject import GridObject
+from game.math import a_star, DiscretePoint, PathFindingError
+
+# Rough memory cost of a cached path, used for the memory budget
+_ENTRY_BYTES = 200
+_CELL_BYTES = 64
+
+_Cell = Tuple[int, int]
+_Key = Tuple[_Cell, _Cell, Hashable]
+
+
+class PathCache:
+    """ Bounded memoization layer in front of a_star.
+
+    Paths are keyed by start, goal and collision class (GridObject.coexistence_key). Every entry is only valid for
+    the grid version it was last checked at: before a lookup the cache asks the grid which cells changed since then,
+    and drops only the entries whose paths cross a cell that changed for their collision class. Least recently used
+    entries are evicted once the estimated memory use goes over budget.
+    """
+
+    def __init__(self, grid: 'GameGrid', max_bytes: int = 1 << 20):
+        """
+
+        :param grid: Grid to plan on
+        :param max_bytes: Memory budget for cached paths, in bytes
+        """
+        self.grid = grid
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self._paths: OrderedDict[_Key, Tuple[_Cell, ...]] = OrderedDict()
+        # (collision class, cell) -> keys of the cached paths that cross the cell
+        self._crossing: Dict[Tuple[Hashable, _Cell], Set[_Key]] = {}
+        # collision class -> (collision matrix, grid version) the cached paths were last checked against
+        self._checked: Dict[Hashable, Tuple[np.ndarray, int]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _entry_bytes(path: Tuple[_Cell, ...]) -> int:
+        return _ENTRY_BYTES + _CELL_BYTES * len(path)
+
+    def _remove(self, key: _Key) -> None:
+        path = self._paths.pop(key)
+        self.bytes -= self._entry_bytes(path)
+        collision_key = key[2]
+        for cell in path:
+            crossing = self._crossing.get((collision_key, cell))
+            if crossing is not None:
+                crossing.discard(key)
+                if not crossing:
+                    del self._crossing[(collision_key, cell)]
+
+    def _check(self, element: GridObject, collision_key: Hashable) -> None:
+        """ Drops the paths of a collision class that cross a cell which changed since they were last checked.
+        """
+        checked = self._checked.get(collision_key)
+        if checked is not None and checked[1] == self.grid.version:
+            return
+        if checked is not None:
+            for cell in self.grid.changed_cells(element, *checked):
+                for key in list(self._crossing.get((collision_key, cell), ())):
+                    self._remove(key)
+                    self.invalidations += 1
+        self._checked[collision_key] = (self.grid.get_collision_matrix(element), self.grid.version)
+
+    def find_path(self, element: GridObject, start: DiscretePoint, target: DiscretePoint) -> deque[DiscretePoint]:
+        """ Finds a path for an element, reusing a cached one when it is still valid.
+
+        :param element: Element that will follow the path, decides the collision class
+        :param start: Position to start from
+        :param target: Position to reach
+        :raises PathFindingError: if no path exists, failures are not cached but targets in another connected
+            component are rejected without searching
+        :return: A new deque of points, safe for the caller to modify
+        """
+        collision_key = element.coexistence_key()
+        self._check(element, collision_key)
+        key = ((start.x, start.y), (target.x, target.y), collision_key)
+        path = self._paths.get(key)
+        if path is not None:
+            self._paths.move_to_end(key)
+            self.hits += 1
+            return deque(DiscretePoint(x, y) for x, y in path)
+
+        self.misses += 1
+        matrix = self.grid.get_collision_matrix(element)
+        components = self.grid.get_connected_components(element)
+        if not components.connected((start.x, start.y), (target.x, target.y)):
+            raise PathFindingError(start, target, matrix)
+        heuristic = None
+        if self.grid.landmarks is not None:
+            heuristic = self.grid.landmarks.heuristic(element, (target.x, target.y))
+        try:
+            points = a_star(start, target, matrix, heuristic=heuristic)
+        except PathFindingError:
+            components.report_unreachable()
+            raise
+        path = tuple((point.x, point.y) for point in points)
+        self._paths[key] = path
+        self.bytes += self._entry_bytes(path)
+        for cell in path:
+            self._crossing.setdefault((collision_key, cell), set()).add(key)
+        while self.bytes > self.max_bytes and self._paths:
+            self._remove(next(iter(self._paths)))
+            self.evictions += 1
+        return points
+
+    def clear(self) -> None:
+        """ Drops every cached path. Statistics are kept.
+        """
+        self._paths.clear()
+        self._crossing.clear()
+        self._checked.clear()
+        self.bytes = 0
+
+    def stats(self) -> Dict[str, float]:
+        """
+        :return: Hits, misses, invalidations, evictions, hit rate, number of paths and estimated bytes
+        """
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'invalidations': self.invalidations,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'paths': len(self._paths),
+            'bytes': self.bytes,
+        }
+
+    def __len__(self) -> int:
+        return len(self._paths)
@@ -0,0 +1,145 @@
+from collections import deque
+from time import perf_counter
+from typing import Dict, Generator, List, Optional
+
+from game.camera import Camera
+from game.gridObject import GridObject
+from game.math import a_star_steps
+from game.pose import Pose
+
+
+class _Job:
+    """ A queued path request and its search, once started.
+    """
+
+    def __init__(self, agent: GridObject, target: Pose, order: int):
+        self.agent = agent
+        self.target = target
+        # Requests with the same priority are served first come, first served
+        self.order = order
+        self.start: Optional[int] = None
+        self.steps: Optional[Generator[None, None, Optional[List[int]]]] = None
+
+
+class PathFindingScheduler:
+    """ Spreads path searches over several ticks so a burst of replanning can't stall a frame.
+
+    Requests are queued and searched as resumable A* generators. Every tick the searches advance by at most a fixed
+    number of node expansions, and optionally for at most a fixed time, starting with the agents closest to the camera.
+    An agent keeps following its old path until its new one is finished, the new path is then handed over with
+    set_path.
+    """
+
+    def __init__(self, grid: 'GameGrid', expansion_budget: int = 2000, time_budget: Optional[float] = None):
+        """
+
+        :param grid: Grid to plan on
+        :param expansion_budget: Most node expansions to run per tick, over all searches
+        :param time_budget: Most seconds to spend searching per tick, None for no limit
+        """
+        self.grid = grid
+        self.expansion_budget = expansion_budget
+        self.time_budget = time_budget
+        # Agents closer to the camera are planned first, None to plan in request order
+        self.camera: Optional[Camera] = None
+        self._jobs: Dict[GridObject, _Job] = {}
+        self._requests = 0
+        self.expansions = 0
+        self.completed = 0
+
+    def request(self, agent: GridObject, target: Pose) -> None:
+        """ Queues a search for a path from the agent's position to the target. Replaces any pending request of the
+        agent, a search that was already running for a different target is thrown away.
+
+        :param agent: Agent that will follow the path, must be an AttrPathFinding
+        :param target: Position to reach
+        """
+        job = self._jobs.get(agent)
+        if job is not None and job.target.coordinates_equal(target):
+            return
+        self._jobs[agent] = _Job(agent, target.get_coordinates_as_pose(), self._requests)
+        self._requests += 1
+
+    def cancel(self, agent: GridObject) -> None:
+        """ Drops the pending request of an agent, if any.
+
+        :param agent: Agent whose request to drop
+        """
+        self._jobs.pop(agent, None)
+
+    def is_pending(self, agent: GridObject) -> bool:
+        """
+        :return: True if the agent has a request that is not finished yet
+        """
+        return agent in self._jobs
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+    def _priority(self, job: _Job) -> tuple:
+        if self.camera is None:
+            return job.order,
+        pose = job.agent.pose
+        return abs(pose.x - self.camera.pose.x) + abs(pose.y - self.camera.pose.y), job.order
+
+    def _begin(self, job: _Job) -> bool:
+        """ Starts the search of a job on the current collision matrix.
+
+        :return: False if the request can't succeed and was dropped
+        """
+        grid = self.grid
+        x, y = int(job.agent.pose.x), int(job.agent.pose.y)
+        tx, ty = int(job.target.x), int(job.target.y)
+        if not grid.get_connected_components(job.agent).connected((x, y), (tx, ty)):
+            return False
+        matrix = grid.get_collision_matrix(job.agent)
+        heuristic = None if grid.landmarks is None else grid.landmarks.heuristic(job.agent, (tx, ty))
+        job.start = x * grid.height + y
+        job.steps = a_star_steps(matrix.ravel().tolist(), grid.width, grid.height, job.start, tx * grid.height + ty,
+                                 heuristic=heuristic)
+        return True
+
+    def _finish(self, job: _Job, path: Optional[List[int]]) -> None:
+        """ Hands a finished path over to its agent. The agent may have moved on while the search ran, so the path is
+        picked up from the agent's current cell.
+        """
+        self.completed += 1
+        if path is None:
+            self.grid.get_connected_components(job.agent).report_unreachable()
+            return
+        height = self.grid.height
+        current = int(job.agent.pose.x) * height + int(job.agent.pose.y)
+        if current not in path:
+            self.request(job.agent, job.target)
+            return
+        path = path[path.index(current):]
+        job.agent.set_path(deque(Pose(*divmod(node, height)) for node in path))
+
+    def run(self) -> int:
+        """ Advances the queued searches within the budgets. To be called once per tick.
+
+        :return: Number of node expansions run
+        """
+        budget = self.expansion_budget
+        deadline = None if self.time_budget is None else perf_counter() + self.time_budget
+        for job in sorted(self._jobs.values(), key=self._priority):
+            if budget <= 0 or (deadline is not None and perf_counter() >= deadline):
+                break
+            if job.steps is None and not self._begin(job):
+                del self._jobs[job.agent]
+                self.completed += 1
+                continue
+            steps = job.steps
+            try:
+                while budget > 0:
+                    next(steps)
+                    budget -= 1
+                    # Checking the clock is slower than an expansion, only do it every so often
+                    if deadline is not None and budget % 64 == 0 and perf_counter() >= deadline:
+                        break
+            except StopIteration as finished:
+                del self._jobs[job.agent]
+                self._finish(job, finished.value)
+        expansions = self.expansion_budget - budget
+        self.expansions += expansions
+        return expansions
@@ -1,20 +1,17 @@
 from typing import List
 
-from pyglet import image
-
 from game.attributes import AttrHealthy
 from game.gridObject import GridObject
 from game.pose import Pose
-from game.resources import get_resource_path
+from game.resources import get_resource_path, load_texture
 
 
 class Player(AttrHealthy):
     _player_texture_path = get_resource_path('textures/pointer.png')
 
     def __init__(self, pose: Pose = Pose()):
-        super().__init__(100, pose=pose, img=image.load(Player._player_texture_path))
+        super().__init__(100, pose=pose, img=load_texture(Player._player_texture_path))
         self.tile_size = 2
-        self.update_every_frame = True
 
     def __str__(self):
         return f'Player(pose={self.pose}, health={self.health})'
@@ -1,6 +1,10 @@
 from pathlib import Path
+from typing import Optional, Tuple
+
+from pyglet import image
 
 import game
+from game.headless import is_headless
 
 
 def get_resource_path(relative_path: str) -> str:
@@ -11,3 +15,16 @@ def get_resource_path(relative_path: str) -> str:
     """
     # Resources are in the same directory as the game package in the resources folder
     return Path(game.__file__).parent.parent.joinpath('resources').joinpath(relative_path).as_posix()
+
+
+def load_texture(path: str, region: Optional[Tuple[int, int, int, int]] = None) -> Optional[image.AbstractImage]:
+    """ Loads a texture for a sprite, or nothing in headless mode
+
+    :param path: Absolute path of the image, see get_resource_path
+    :param region: (x, y, width, height) of the part of the image to use, the whole image if None
+    :return: The pyglet image, None if headless
+    """
+    if is_headless():
+        return None
+    texture = image.load(path)
+    return texture if region is None else texture.get_region(*region)
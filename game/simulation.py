@@ -0,0 +1,124 @@
+""" Runs the game engine without a window, for soak tests, benchmarks and batch simulations on machines without a
+display.
+
+Run with ``python -m game.simulation``, see main for the options. Programs that use Simulation themselves have to
+call game.headless.enable_headless first, see Simulation.
+"""
+from game.headless import enable_headless
+
+if __name__ == '__main__':
+    # Only when run as a script, importing the module must not turn off the graphics of the program importing it.
+    # Has to happen before the game modules below import pyglet's graphics
+    enable_headless()
+
+from argparse import ArgumentParser
+from time import perf_counter
+from typing import Optional
+
+import numpy as np
+
+from game.attributes import PathFindingStrategy
+from game.camera import Camera
+from game.drone import Drone
+from game.gameGrid import GameGrid
+from game.player import Player
+from game.pose import Pose
+from game.resources import get_resource_path
+from game.simulationLod import SimulationLod
+from game.wall import Wall
+
+
+class Simulation:
+    """ Steps a game grid as fast as possible, with nothing drawn.
+
+    Importing this module does not switch to headless mode. Without a display, call game.headless.enable_headless
+    before importing this or any other game module, so objects are created without textures or sprites and pyglet
+    does not try to open a window.
+    """
+
+    def __init__(self, grid: GameGrid):
+        """
+
+        :param grid: Grid to simulate
+        """
+        self.grid = grid
+        self.ticks = 0
+        self.seconds = 0.0
+
+    @classmethod
+    def chase(cls, map_path: str = get_resource_path('map.png'), drones: int = 20, seed: int = 0,
+              strategy: PathFindingStrategy = PathFindingStrategy.FLOW_FIELD, lod: bool = False,
+              **kwargs) -> 'Simulation':
+        """ A player on a map, chased by drones placed on random free cells.
+
+        :param map_path: Map image, see GameGrid.from_image
+        :param drones: Number of drones
+        :param seed: Seed for the drone positions
+        :param strategy: How the drones plan their paths
+        :param lod: Update drones far from a camera on the player less often, see SimulationLod
+        :param kwargs: Passed on to GameGrid
+        :return: The simulation
+        """
+        grid = GameGrid.from_image(map_path, Wall, **kwargs)
+        free = np.argwhere(grid.counts == 0)
+        random_state = np.random.RandomState(seed)
+        cells = free[random_state.choice(len(free), size=min(drones + 1, len(free)), replace=False)].tolist()
+        player = Player(Pose(*cells[0]))
+        grid.add(player)
+        if lod:
+            grid.lod = SimulationLod(grid, Camera(player.pose))
+        for x, y in cells[1:]:
+            drone = Drone(Pose(x, y))
+            grid.add(drone)
+            drone.actively_path_find(player, strategy)
+        return cls(grid)
+
+    def step(self, dt: float = 0.5) -> None:
+        """ Runs one tick of the game.
+
+        :param dt: Simulated time of the tick, in seconds
+        """
+        self.grid.update(dt)
+        self.ticks += 1
+
+    def run(self, ticks: int, dt: float = 0.5, seconds: Optional[float] = None) -> float:
+        """ Runs ticks back to back.
+
+        :param ticks: Most ticks to run
+        :param dt: Simulated time of every tick, in seconds
+        :param seconds: Stops early once this much wall time passed, None for no limit
+        :return: Ticks per second of wall time
+        """
+        start_time = perf_counter()
+        ran = 0
+        while ran < ticks and (seconds is None or perf_counter() - start_time < seconds):
+            self.step(dt)
+            ran += 1
+        elapsed = perf_counter() - start_time
+        self.seconds += elapsed
+        return ran / elapsed if elapsed else float('inf')
+
+
+def main():
+    parser = ArgumentParser(description='Runs the game without a window and reports ticks per second.')
+    parser.add_argument('--ticks', type=int, default=1000, help='number of ticks to run')
+    parser.add_argument('--drones', type=int, default=20, help='number of drones chasing the player')
+    parser.add_argument('--map', default='map.png', help='map image, relative to the resources folder')
+    parser.add_argument('--strategy', default='FLOW_FIELD', choices=[strategy.name for strategy in PathFindingStrategy],
+                        help='path finding strategy of the drones')
+    parser.add_argument('--seed', type=int, default=0, help='seed for the drone positions')
+    parser.add_argument('--lod', action='store_true', help='update drones far from the player less often')
+    args = parser.parse_args()
+
+    simulation = Simulation.chase(get_resource_path(args.map), args.drones, args.seed,
+                                  PathFindingStrategy[args.strategy], args.lod)
+    rate = simulation.run(args.ticks)
+    print(f'{simulation.ticks} ticks in {simulation.seconds:.2f} s, {rate:.0f} ticks/s '
+          f'({len(simulation.grid.elements)} elements on a {simulation.grid.width}x{simulation.grid.height} grid)')
+    if simulation.grid.lod is not None:
+        print(simulation.grid.lod)
+    simulation.grid.close()
+
+
+if __name__ == '__main__':
+    main()
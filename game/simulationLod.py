@@ -0,0 +1,188 @@
+from enum import Enum
+from typing import Dict, Tuple
+
+from game.camera import Camera
+from game.constants import GRID_WIDTH, GRID_HEIGHT
+from game.gridObject import GridObject
+
+
+class LodTier(Enum):
+    """ How often elements are simulated, by their distance to the camera.
+    """
+    VIEW = 0  # On screen, updated every tick
+    NEAR = 1  # Just off screen, updated every near_interval ticks
+    FAR = 2  # Everything else, updated every far_interval ticks
+
+
+class SimulationLod:
+    """ Simulation level of detail, elements far from the camera are updated less often.
+
+    Applies to the timer wakeups of the grid's WakeupScheduler: an element that asks to be woken in fewer ticks than
+    the interval of its tier is woken after the interval instead, and its next update gets the time of all the ticks
+    it was held back for as dt. Event wakeups and elements updated every frame are not held back.
+
+    Tiers are kept up to date incrementally. An element's tier is worked out again when it enters a cell and when it
+    is updated, and when the camera moves to another cell only the elements around its old and new view are looked at,
+    through the grid's spatial index. Elements moving closer to the camera get their wakeups brought forward.
+    """
+
+    def __init__(self, grid: 'GameGrid', camera: Camera, view_width: int = GRID_WIDTH,
+                 view_height: int = GRID_HEIGHT, near_distance: int = 16, near_interval: int = 4,
+                 far_interval: int = 16):
+        """
+
+        :param grid: Grid to simulate
+        :param camera: Camera whose view is simulated at full rate
+        :param view_width: Width of the view, in tiles
+        :param view_height: Height of the view, in tiles
+        :param near_distance: How far outside of the view elements are still near, in tiles
+        :param near_interval: Ticks between the updates of near elements
+        :param far_interval: Ticks between the updates of far elements
+        """
+        self.grid = grid
+        self.camera = camera
+        self.view_width = view_width
+        self.view_height = view_height
+        self.near_distance = near_distance
+        self.intervals: Dict[LodTier, int] = {LodTier.VIEW: 1, LodTier.NEAR: near_interval, LodTier.FAR: far_interval}
+        self.tiers: Dict[GridObject, LodTier] = {}
+        # Element -> (tick it was scheduled at, ticks it asked for), for elements whose timers are held back
+        self._scheduled: Dict[GridObject, Tuple[int, int]] = {}
+        self._camera_cell = self._cell_of_camera()
+        # Elements updated in every tier, on the last tick and over all ticks
+        self.last_tick: Dict[LodTier, int] = dict.fromkeys(LodTier, 0)
+        self.totals: Dict[LodTier, int] = dict.fromkeys(LodTier, 0)
+        self.ticks = 0
+        for element in grid.elements:
+            self.track(element)
+
+    def _cell_of_camera(self) -> Tuple[int, int]:
+        return round(self.camera.pose.x), round(self.camera.pose.y)
+
+    def tier_at(self, x: int, y: int) -> LodTier:
+        """
+        :return: Tier of a cell for the current camera position
+        """
+        camera_x, camera_y = self._camera_cell
+        distance = max(abs(x - camera_x) - self.view_width // 2, abs(y - camera_y) - self.view_height // 2)
+        if distance <= 0:
+            return LodTier.VIEW
+        if distance <= self.near_distance:
+            return LodTier.NEAR
+        return LodTier.FAR
+
+    def track(self, element: GridObject) -> None:
+        """ Starts keeping the tier of an element, if the element has an update. Called by the grid on add.
+        """
+        if element.update_every_frame or type(element).has_update():
+            self.tiers[element] = self.tier_at(element.pose.x, element.pose.y)
+
+    def forget(self, element: GridObject) -> None:
+        """ Stops keeping the tier of an element. Called by the grid on remove.
+        """
+        self.tiers.pop(element, None)
+        self._scheduled.pop(element, None)
+
+    def entered(self, element: GridObject, x: int, y: int) -> None:
+        """ Updates the tier of an element that entered a cell.
+        """
+        if element in self.tiers:
+            self._retier(element, self.tier_at(x, y))
+
+    def _retier(self, element: GridObject, tier: LodTier) -> None:
+        if tier is self.tiers[element]:
+            return
+        self.tiers[element] = tier
+        timers = self.grid.wakeups.timers
+        if element not in self._scheduled or element not in timers:
+            return
+        # Bring held back wakeups forward to the interval of the new tier
+        scheduled_at, ticks = self._scheduled[element]
+        due = scheduled_at + max(ticks, self.intervals[tier])
+        if due < timers.due_tick(element):
+            timers.schedule(element, due - timers.now)
+
+    def begin_tick(self) -> None:
+        """ Starts counting the updates of a tick, and follows the camera. Called by the grid at the start of every
+        tick.
+        """
+        self.last_tick = dict.fromkeys(LodTier, 0)
+        self._follow_camera()
+
+    def _follow_camera(self) -> None:
+        """ Updates the tiers of the elements around the camera's old and new view if the camera moved to another
+        cell.
+        """
+        cell = self._cell_of_camera()
+        if cell == self._camera_cell:
+            return
+        old_x, old_y = self._camera_cell
+        self._camera_cell = cell
+        reach_x = self.view_width // 2 + self.near_distance + 1
+        reach_y = self.view_height // 2 + self.near_distance + 1
+        index = self.grid.spatial_index
+        for x, y in ((old_x, old_y), cell):
+            for element in index.in_rect(GridObject, x - reach_x, y - reach_y, 2 * reach_x + 1, 2 * reach_y + 1):
+                if element in self.tiers:
+                    self._retier(element, self.tier_at(element.pose.x, element.pose.y))
+
+    def hold_back(self, element: GridObject, ticks: int) -> int:
+        """ Stretches a timer wakeup to the interval of the element's tier. Called by the WakeupScheduler.
+
+        :param element: Element asking to be woken
+        :param ticks: Ticks it asked for
+        :return: Ticks to wake it in
+        """
+        tier = self.tiers.get(element)
+        if tier is None:
+            return ticks
+        self._scheduled[element] = (self.grid.wakeups.timers.now, ticks)
+        return max(ticks, self.intervals[tier])
+
+    def run(self, element: GridObject, dt: float) -> float:
+        """ Counts an update of an element in its tier. Called by the grid right before the update.
+
+        :param element: Element about to be updated
+        :param dt: Length of a tick
+        :return: dt for the update, covering the ticks the element was held back for
+        """
+        if element not in self.tiers:
+            return dt
+        tier = self.tier_at(element.pose.x, element.pose.y)
+        self.tiers[element] = tier
+        self.last_tick[tier] += 1
+        scheduled = self._scheduled.pop(element, None)
+        if scheduled is None:
+            return dt
+        scheduled_at, ticks = scheduled
+        return dt * max(self.grid.wakeups.timers.now - scheduled_at - ticks + 1, 1)
+
+    def end_tick(self) -> None:
+        """ Adds the counts of the tick that just ran to the totals. Called by the grid at the end of every tick.
+        """
+        for tier, count in self.last_tick.items():
+            self.totals[tier] += count
+        self.ticks += 1
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        :return: Per tier, the elements in it and how many of them were updated on the last tick and per tick
+        """
+        members = dict.fromkeys(LodTier, 0)
+        for tier in self.tiers.values():
+            members[tier] += 1
+        return {tier.name: {'elements': members[tier],
+                            'updated last tick': self.last_tick[tier],
+                            'updated per tick': self.totals[tier] / self.ticks if self.ticks else 0.0}
+                for tier in LodTier}
+
+    def reset_stats(self) -> None:
+        self.totals = dict.fromkeys(LodTier, 0)
+        self.ticks = 0
+
+    def __str__(self):
+        lines = [f'{"tier":<6}{"elements":>10}{"last tick":>11}{"per tick":>10}']
+        for name, stats in self.stats().items():
+            lines.append(f'{name:<6}{stats["elements"]:>10}{stats["updated last tick"]:>11}'
+                         f'{stats["updated per tick"]:>10.2f}')
+        return '\n'.join(lines)
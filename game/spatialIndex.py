@@ -0,0 +1,157 @@
+from typing import Dict, Iterable, List, Tuple, Type
+
+from game.gridObject import GridObject
+
+Bucket = Dict[GridObject, None]
+
+
+class SpatialIndex:
+    """ Uniform grid of buckets per class, for radius, rectangle and k-nearest queries filtered by class.
+
+    Every concrete class has its own buckets of bucket_size x bucket_size cells, holding the objects of that class in
+    them. A query only looks at the buckets of the classes it asks for that overlap the query area, so looking for
+    AttrHealthy objects around a drone never touches walls, nor anything far away. Kept up to date by the grid as
+    objects enter and leave cells.
+    """
+
+    def __init__(self, width: int, height: int, bucket_size: int = 8):
+        """
+
+        :param width: Width of the grid
+        :param height: Height of the grid
+        :param bucket_size: Width and height of the buckets, in cells
+        """
+        self.width = width
+        self.height = height
+        self.bucket_size = bucket_size
+        # Concrete class -> bucket coordinates -> objects, insertion ordered
+        self._buckets: Dict[Type[GridObject], Dict[Tuple[int, int], Bucket]] = {}
+        # Query class -> buckets of the concrete classes it matches. Reset when a new class is indexed
+        self._matches: Dict[Type[GridObject], List[Dict[Tuple[int, int], Bucket]]] = {}
+
+    def add(self, element: GridObject, x: int, y: int) -> None:
+        """ Indexes an element that entered a cell.
+        """
+        buckets = self._buckets.get(type(element))
+        if buckets is None:
+            buckets = self._buckets[type(element)] = {}
+            self._matches.clear()
+        key = (x // self.bucket_size, y // self.bucket_size)
+        bucket = buckets.get(key)
+        if bucket is None:
+            bucket = buckets[key] = {}
+        bucket[element] = None
+
+    def remove(self, element: GridObject, x: int, y: int) -> None:
+        """ Takes out an element that left a cell.
+        """
+        buckets = self._buckets[type(element)]
+        key = (x // self.bucket_size, y // self.bucket_size)
+        bucket = buckets[key]
+        del bucket[element]
+        if not bucket:
+            del buckets[key]
+
+    def _class_buckets(self, element_class: Type[GridObject]) -> List[Dict[Tuple[int, int], Bucket]]:
+        matches = self._matches.get(element_class)
+        if matches is None:
+            matches = self._matches[element_class] = [buckets for cls, buckets in self._buckets.items()
+                                                      if issubclass(cls, element_class)]
+        return matches
+
+    def _buckets_in(self, element_class: Type[GridObject], bx0: int, by0: int, bx1: int, by1: int) -> Iterable[Bucket]:
+        """ Buckets of a class within an inclusive range of bucket coordinates.
+        """
+        area = (bx1 - bx0 + 1) * (by1 - by0 + 1)
+        for buckets in self._class_buckets(element_class):
+            if area > len(buckets):
+                # Fewer buckets exist than the range covers, go through the ones that do
+                for (bx, by), bucket in buckets.items():
+                    if bx0 <= bx <= bx1 and by0 <= by <= by1:
+                        yield bucket
+                continue
+            for bx in range(bx0, bx1 + 1):
+                for by in range(by0, by1 + 1):
+                    bucket = buckets.get((bx, by))
+                    if bucket is not None:
+                        yield bucket
+
+    def in_rect(self, element_class: Type[GridObject], x: int, y: int, width: int, height: int) -> List[GridObject]:
+        """ Finds the objects of a class, including subclasses, in a rectangle.
+
+        :param element_class: Class to look for
+        :param x: X position of the bottom left cell
+        :param y: Y position of the bottom left cell
+        :param width: Width of the rectangle
+        :param height: Height of the rectangle
+        :return: The objects in the rectangle
+        """
+        x1, y1 = x + width - 1, y + height - 1
+        size = self.bucket_size
+        return [element
+                for bucket in self._buckets_in(element_class, x // size, y // size, x1 // size, y1 // size)
+                for element in bucket
+                if x <= element.pose.x <= x1 and y <= element.pose.y <= y1]
+
+    def in_radius(self, element_class: Type[GridObject], x: int, y: int, radius: float) -> List[GridObject]:
+        """ Finds the objects of a class, including subclasses, within a euclidean distance of a cell.
+
+        :param element_class: Class to look for
+        :param x: X position of the center
+        :param y: Y position of the center
+        :param radius: Largest distance, in tiles
+        :return: The objects within the radius
+        """
+        reach = int(radius)
+        limit = radius * radius
+        return [element for element in self.in_rect(element_class, x - reach, y - reach, 2 * reach + 1, 2 * reach + 1)
+                if (element.pose.x - x) ** 2 + (element.pose.y - y) ** 2 <= limit]
+
+    def nearest(self, element_class: Type[GridObject], x: int, y: int, k: int = 1) -> List[GridObject]:
+        """ Finds the objects of a class, including subclasses, closest to a cell by euclidean distance.
+
+        Rings of buckets are searched outwards from the cell's bucket. Everything in ring r + 1 is more than
+        r * bucket_size away, so the search stops once k objects at most that far are known.
+
+        :param element_class: Class to look for
+        :param x: X position to search from
+        :param y: Y position to search from
+        :param k: Number of objects to find
+        :return: Up to k objects, closest first
+        """
+        size = self.bucket_size
+        bx, by = x // size, y // size
+        total = sum(len(buckets) for buckets in self._class_buckets(element_class))
+        max_ring = max(self.width, self.height) // size + 1
+        found: List[Tuple[int, int, GridObject]] = []
+        seen = 0
+        ring = 0
+        while ring <= max_ring and seen < total:
+            if (2 * ring + 1) ** 2 >= total:
+                # The rings are now larger than the number of buckets, look at every bucket at once
+                found = []
+                buckets = self._buckets_in(element_class, bx - max_ring, by - max_ring, bx + max_ring, by + max_ring)
+                ring = max_ring
+            elif ring == 0:
+                buckets = self._buckets_in(element_class, bx, by, bx, by)
+            else:
+                buckets = self._ring(element_class, bx, by, ring)
+            for bucket in buckets:
+                seen += 1
+                for element in bucket:
+                    found.append(((element.pose.x - x) ** 2 + (element.pose.y - y) ** 2, len(found), element))
+            if len(found) >= k:
+                found.sort(key=lambda item: item[:2])
+                if found[k - 1][0] <= (ring * size) ** 2:
+                    break
+            ring += 1
+        found.sort(key=lambda item: item[:2])
+        return [element for _, _, element in found[:k]]
+
+    def _ring(self, element_class: Type[GridObject], bx: int, by: int, ring: int) -> Iterable[Bucket]:
+        """ Buckets at exactly `ring` buckets from (bx, by) in the max norm.
+        """
+        yield from self._buckets_in(element_class, bx - ring, by - ring, bx + ring, by - ring)
+        yield from self._buckets_in(element_class, bx - ring, by + ring, bx + ring, by + ring)
+        yield from self._buckets_in(element_class, bx - ring, by - ring + 1, bx - ring, by + ring - 1)
+        yield from self._buckets_in(element_class, bx + ring, by - ring + 1, bx + ring, by + ring - 1)
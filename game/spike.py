@@ -1,11 +1,11 @@
 from typing import List
 
-from pyglet import image
+import numpy as np
 
 from game.attributes import AttrHealthy, AttrHarmful
 from game.gridDrawable import GridDrawable
 from game.pose import Pose
-from game.resources import get_resource_path
+from game.resources import get_resource_path, load_texture
 
 
 class Spike(AttrHarmful, GridDrawable):
@@ -14,14 +14,14 @@ class Spike(AttrHarmful, GridDrawable):
     def __init__(self, damage: float, pose: Pose):
         pose.h = 0.35
         pose.w = 0.75
-        super().__init__(damage=damage, pose=pose, img=image.load(Spike._spike_texture_path))
+        super().__init__(damage=damage, pose=pose, img=load_texture(Spike._spike_texture_path))
         self.tile_size = 0
 
     def can_coexist(self, others: List['GridObject']) -> bool:
         return True
 
-    def overlaps(self, others: List['GridObject']) -> None:
-        super().overlaps(others)
+    def can_coexist_matrix(self, grid: 'GameGrid') -> np.ndarray:
+        return np.ones((grid.width, grid.height), dtype=bool)
 
     def collision(self, other: 'GridObject') -> None:
         pass
@@ -0,0 +1,106 @@
+from typing import Dict, Hashable, List, Tuple
+
+Bucket = Dict[Hashable, None]
+
+
+class TimerWheel:
+    """ Hierarchical timer wheel, schedules items a whole number of ticks ahead with O(1) scheduling and cancelling.
+
+    Level 0 has a slot for each of the next `slots` ticks. Every level above covers `slots` times the span of the one
+    below, with one slot per block of ticks. When a tick starts a new block of a level, the items in that block's slot
+    are moved down to the levels below, so an item is handled once per level at most. Items further ahead than the
+    top level covers wait in an overflow list until they fit. Every item has at most one timer.
+    """
+
+    def __init__(self, slots: int = 64, levels: int = 3):
+        """
+
+        :param slots: Slots per level, a power of two
+        :param levels: Number of levels, the wheel covers slots ** levels ticks without using the overflow list
+        """
+        if slots < 2 or slots & (slots - 1):
+            raise ValueError(f'slots must be a power of two, got {slots}')
+        self.bits = slots.bit_length() - 1
+        self.mask = slots - 1
+        self.levels = levels
+        self.now = 0
+        self._wheels: List[List[Bucket]] = [[{} for _ in range(slots)] for _ in range(levels)]
+        self._overflow: Bucket = {}
+        # Item -> (tick it is due at, bucket it is in)
+        self._timers: Dict[Hashable, Tuple[int, Bucket]] = {}
+
+    def schedule(self, item: Hashable, delay: int) -> None:
+        """ Schedules an item, replacing its timer if it has one.
+
+        :param item: Item to schedule
+        :param delay: Ticks from now, at least 1
+        """
+        self.cancel(item)
+        self._insert(item, self.now + max(delay, 1))
+
+    def cancel(self, item: Hashable) -> bool:
+        """ Cancels an item's timer.
+
+        :param item: Item to cancel
+        :return: True if the item had a timer, False otherwise
+        """
+        timer = self._timers.pop(item, None)
+        if timer is None:
+            return False
+        del timer[1][item]
+        return True
+
+    def due_tick(self, item: Hashable) -> int:
+        """
+        :param item: Scheduled item
+        :return: Tick the item is due at
+        :raises KeyError: if the item has no timer
+        """
+        return self._timers[item][0]
+
+    def _insert(self, item: Hashable, tick: int) -> None:
+        for level in range(self.levels):
+            shift = self.bits * level
+            if (tick >> shift) - (self.now >> shift) <= self.mask:
+                bucket = self._wheels[level][(tick >> shift) & self.mask]
+                break
+        else:
+            bucket = self._overflow
+        bucket[item] = None
+        self._timers[item] = (tick, bucket)
+
+    def advance(self) -> List[Hashable]:
+        """ Moves on to the next tick.
+
+        :return: The items due at the new tick, in the order they were scheduled. Their timers are removed.
+        """
+        self.now += 1
+        now = self.now
+        if not now & ((1 << (self.bits * self.levels)) - 1):
+            self._cascade(self._overflow)
+        for level in range(self.levels - 1, 0, -1):
+            shift = self.bits * level
+            if not now & ((1 << shift) - 1):
+                self._cascade(self._wheels[level][(now >> shift) & self.mask])
+        bucket = self._wheels[0][now & self.mask]
+        if not bucket:
+            return []
+        due = list(bucket)
+        bucket.clear()
+        for item in due:
+            del self._timers[item]
+        return due
+
+    def _cascade(self, bucket: Bucket) -> None:
+        """ Moves the items of a bucket down to the levels their ticks are now close enough for.
+        """
+        items = list(bucket)
+        bucket.clear()
+        for item in items:
+            self._insert(item, self._timers[item][0])
+
+    def __contains__(self, item: Hashable) -> bool:
+        return item in self._timers
+
+    def __len__(self) -> int:
+        return len(self._timers)
@@ -0,0 +1,122 @@
+from typing import Dict, List, Tuple
+
+from game.gridObject import GridObject
+from game.timerWheel import TimerWheel
+
+Cell = Tuple[int, int]
+
+
+class WakeupScheduler:
+    """ Decides which elements of a grid that are not updated every frame get updated on a tick.
+
+    Elements ask to be woken in a number of ticks, when the contents of a cell change, or when another element moves
+    or leaves the grid. Woken elements are put in the grid's update_list, and updated the next time GameGrid.update
+    gets to them, which is the next tick for elements woken while it runs them. Wakeups are one shot: once an element
+    is woken its other wakeups are dropped, its update registers the ones it needs next. An element without wakeups
+    is idle and costs nothing per tick, so the cost of a tick follows the number of active elements rather than the
+    number of elements.
+    """
+
+    def __init__(self, grid: 'GameGrid', slots: int = 64, levels: int = 3):
+        """
+
+        :param grid: Grid whose elements are woken
+        :param slots: Slots per level of the timer wheel
+        :param levels: Levels of the timer wheel
+        """
+        self.grid = grid
+        self.timers = TimerWheel(slots, levels)
+        # Element -> elements to wake when it moves or leaves the grid
+        self._on_move: Dict[GridObject, Dict[GridObject, None]] = {}
+        # Cell -> elements to wake when an element enters or leaves it
+        self._on_cell: Dict[Cell, Dict[GridObject, None]] = {}
+        # Element -> the elements and cells it watches, to drop its registrations when woken
+        self._watching: Dict[GridObject, List[Tuple[Dict, object]]] = {}
+        # Number of wakeups that fired, useful for profiling
+        self.woken = 0
+
+    def wake(self, element: GridObject) -> None:
+        """ Puts an element in the grid's update_list right away. Elements updated every frame are left alone.
+
+        :param element: Element to wake
+        """
+        self.cancel(element)
+        if element in self.grid.always_update_list:
+            return
+        self.grid.update_list.add(element)
+        self.woken += 1
+
+    def wake_in(self, element: GridObject, ticks: int) -> None:
+        """ Wakes an element in a number of ticks, replacing its earlier timer. Can be held back further by the
+        grid's SimulationLod.
+
+        :param element: Element to wake
+        :param ticks: Ticks from now, 1 for the next tick
+        """
+        if self.grid.lod is not None:
+            ticks = self.grid.lod.hold_back(element, ticks)
+        self.timers.schedule(element, ticks)
+
+    def wake_on_move(self, element: GridObject, target: GridObject) -> None:
+        """ Wakes an element once the target moves to another cell or leaves the grid.
+
+        :param element: Element to wake
+        :param target: Element to watch
+        """
+        self._watch(element, self._on_move, target)
+
+    def wake_on_cell_change(self, element: GridObject, x: int, y: int) -> None:
+        """ Wakes an element once an element enters or leaves a cell.
+
+        :param element: Element to wake
+        :param x: X position of the cell to watch
+        :param y: Y position of the cell to watch
+        """
+        self._watch(element, self._on_cell, (x, y))
+
+    def _watch(self, element: GridObject, watchers: Dict, key: object) -> None:
+        watching = watchers.get(key)
+        if watching is None:
+            watching = watchers[key] = {}
+        if element not in watching:
+            watching[element] = None
+            self._watching.setdefault(element, []).append((watchers, key))
+
+    def cancel(self, element: GridObject) -> None:
+        """ Drops every wakeup of an element.
+
+        :param element: Element to cancel the wakeups of
+        """
+        self.timers.cancel(element)
+        for watchers, key in self._watching.pop(element, ()):
+            watching = watchers[key]
+            del watching[element]
+            if not watching:
+                del watchers[key]
+
+    def moved(self, element: GridObject) -> None:
+        """ Wakes the elements watching an element, called by the grid when it moves or leaves.
+        """
+        if element in self._on_move:
+            for watcher in list(self._on_move[element]):
+                self.wake(watcher)
+
+    def cell_changed(self, x: int, y: int) -> None:
+        """ Wakes the elements watching a cell, called by the grid when an element enters or leaves it.
+        """
+        if (x, y) in self._on_cell:
+            for watcher in list(self._on_cell[(x, y)]):
+                self.wake(watcher)
+
+    def advance(self) -> None:
+        """ Moves the timers on by a tick and wakes the elements that are due.
+        """
+        for element in self.timers.advance():
+            self.wake(element)
+
+    def is_idle(self, element: GridObject) -> bool:
+        """
+        :param element: Element to check
+        :return: True if the element has no wakeups and is not about to be updated
+        """
+        return element not in self.timers and element not in self._watching and element not in self.grid.update_list
@@ -1,18 +1,18 @@
 from typing import List
 
-from pyglet import image
+import numpy as np
 
 from game.gridDrawable import GridDrawable
 from game.gridObject import GridObject
 from game.pose import Pose
-from game.resources import get_resource_path
+from game.resources import get_resource_path, load_texture
 
 
 class Wall(GridDrawable):
     _wall_texture_path = get_resource_path('textures/wall.png')
 
     def __init__(self, pose: Pose = Pose()):
-        super().__init__(pose, image.load(Wall._wall_texture_path))
+        super().__init__(pose, load_texture(Wall._wall_texture_path))
 
     def equals(self, other):
         return isinstance(other, Wall) and \
@@ -23,6 +23,9 @@ class Wall(GridDrawable):
         # Return false if anything in others
         return not others
 
+    def can_coexist_matrix(self, grid: 'GameGrid') -> np.ndarray:
+        return grid.counts == 0
+
     def collision(self, other: 'GridObject') -> None:
         ...
 
@@ -0,0 +1,61 @@
+""" Helpers shared by the tests
+"""
+from typing import List
+
+from game.gridObject import GridObject
+from game.math import a_star, DiscretePoint, PathFindingError
+from game.pose import Pose
+
+
+class Block(GridObject):
+    """ Minimal grid object without any graphics
+    """
+
+    def __init__(self, pose: Pose, tile_size: int = 1):
+        super().__init__(pose)
+        self.tile_size = tile_size
+
+    def can_coexist(self, others: List['GridObject']) -> bool:
+        return super().can_coexist(others)
+
+    def overlaps(self, others: List['GridObject']) -> None:
+        ...
+
+    def collision(self, other: 'GridObject') -> None:
+        ...
+
+    def update(self, dt: float) -> None:
+        ...
+
+    def equals(self, other: 'GridObject') -> bool:
+        return isinstance(other, Block) and self.tile_size == other.tile_size
+
+
+class Sleeper(Block):
+    """ Counts its updates, and sleeps for a fixed number of ticks after each one
+    """
+
+    def __init__(self, pose: Pose, sleep: int = 0):
+        super().__init__(pose)
+        self.sleep = sleep
+        self.updates = 0
+
+    def update(self, dt: float) -> None:
+        self.updates += 1
+        if self.sleep:
+            self.grid.wakeups.wake_in(self, self.sleep)
+
+
+def a_star_length(passable, start, goal):
+    try:
+        return len(a_star(DiscretePoint(*start), DiscretePoint(*goal), passable.tolist()))
+    except PathFindingError:
+        return None
+
+
+def assert_valid_path(path, start, goal, passable):
+    assert path[0] == start
+    assert path[-1] == goal
+    for (ax, ay), (bx, by) in zip(path, path[1:]):
+        assert abs(ax - bx) + abs(ay - by) == 1
+        assert passable[bx, by]
@@ -0,0 +1,52 @@
+import numpy as np
+
+from game.gameGrid import GameGrid
+from game.math import a_star, DiscretePoint, PathFindingError
+from game.pose import Pose
+from testing.helpers import Block
+
+
+def make_grid(batch_threshold):
+    grid = GameGrid(12, 16, batch_workers=2, batch_threshold=batch_threshold)
+    for y in range(10):
+        grid.add(Block(Pose(8, y), tile_size=5))
+    return grid
+
+
+def expected_length(grid, element, start, goal):
+    try:
+        return len(a_star(start.as_discrete_point(), goal.as_discrete_point(), grid.get_collision_matrix(element)))
+    except PathFindingError:
+        return None
+
+
+def check_batch(grid):
+    agent = Block(Pose(0, 0))
+    random_state = np.random.RandomState(0)
+    requests = [(Pose(*random_state.randint(0, 8, 2)), Pose(*random_state.randint(0, 12, 2)), agent)
+                for _ in range(40)]
+    requests.append((Pose(0, 0), Pose(8, 0), agent))  # Wall
+    requests.append((Pose(0, 0), Pose(20, 0), agent))  # Out of bounds
+    paths = grid.plan_paths(requests)
+    assert len(paths) == len(requests)
+    for (start, goal, element), path in zip(requests, paths):
+        length = expected_length(grid, element, start, goal) if goal.x < grid.width else None
+        assert (None if path is None else len(path)) == length
+        if path is not None:
+            assert path[0].coordinates_equal(start)
+            assert path[-1].coordinates_equal(goal)
+
+
+def test_plan_paths_synchronous():
+    grid = make_grid(batch_threshold=1000)
+    check_batch(grid)
+    assert grid._process_pool is None
+
+
+def test_plan_paths_process_pool():
+    grid = make_grid(batch_threshold=1)
+    try:
+        check_batch(grid)
+        assert grid._process_pool is not None
+    finally:
+        grid.close()
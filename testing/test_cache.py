@@ -0,0 +1,21 @@
+from game.cache import LRUCache
+
+
+def test_lru_cache_hits_and_misses():
+    cache = LRUCache(max_size=2)
+    assert cache.get('a') is None
+    cache.put('a', 1)
+    assert cache.get('a') == 1
+    assert cache.hits == 1 and cache.misses == 1
+    assert cache.stats()['hit_rate'] == 0.5
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(max_size=2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    cache.get('a')
+    cache.put('c', 3)
+    assert 'a' in cache and 'c' in cache
+    assert 'b' not in cache
+    assert cache.evictions == 1
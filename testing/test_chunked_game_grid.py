@@ -0,0 +1,57 @@
+import random
+
+import numpy as np
+
+from game.chunkedGameGrid import ChunkedGameGrid
+from game.gameGrid import GameGrid
+from game.pose import Pose
+from game.resources import get_resource_path
+from game.wall import Wall
+from testing.helpers import Block
+
+
+def test_chunked_grid_matches_dense_grid():
+    rng = random.Random(0)
+    dense = GameGrid(37, 45)
+    chunked = ChunkedGameGrid(37, 45, chunk_size=8)
+    pairs = []
+    for _ in range(200):
+        x, y = rng.randrange(45), rng.randrange(37)
+        a, b = Block(Pose(x, y)), Block(Pose(x, y))
+        if a.can_coexist(dense.get(x, y)):
+            dense.add(a)
+            chunked.add(b)
+            pairs.append((a, b))
+    for _ in range(500):
+        a, b = rng.choice(pairs)
+        x, y = a.pose.x + rng.choice((-1, 1)), a.pose.y + rng.choice((-1, 1))
+        assert a.move_to_position(Pose(x, y)) == b.move_to_position(Pose(x, y))
+    for x in range(45):
+        for y in range(37):
+            assert [element.pose.coordinates_equal(Pose(x, y)) for element in chunked.get(x, y)] == \
+                   [True] * len(dense.get(x, y))
+    assert np.array_equal(dense.get_collision_matrix(pairs[0][0]), chunked.get_collision_matrix(pairs[0][1]))
+    assert str(dense) == str(chunked)
+
+
+def test_chunks_allocated_lazily_and_freed():
+    grid = ChunkedGameGrid(4000, 2500, chunk_size=32)
+    assert len(grid.grid) == 0 and grid.get(1234, 3210) == []
+    block = Block(Pose(100, 100))
+    grid.add(block)
+    assert list(grid.grid) == [(3, 3)]
+    assert block.move_to_position(Pose(96, 100))
+    assert list(grid.grid) == [(3, 3)]
+    assert block.move_to_position(Pose(95, 100))
+    assert list(grid.grid) == [(2, 3)]
+    assert grid.cells_in_rect(94, 99, 3, 3)[1][1] == [block]
+    grid.remove(block)
+    assert len(grid.grid) == 0
+
+
+def test_grid_from_map():
+    grid = ChunkedGameGrid.from_image(get_resource_path('map.png'), Wall, chunk_size=8)
+    assert (grid.width, grid.height) == (30, 20)
+    dense = GameGrid.from_image(get_resource_path('map.png'), Wall)
+    assert np.array_equal(grid.counts, dense.counts)
+    assert str(grid) == str(dense)
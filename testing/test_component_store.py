@@ -0,0 +1,87 @@
+from game.componentStore import ComponentStore, StoredPose
+from game.drone import Drone
+from game.gameGrid import GameGrid
+from game.healingPad import HealingPad
+from game.player import Player
+from game.pose import Pose
+from game.spike import Spike
+
+
+def test_attached_objects_keep_their_api():
+    store = ComponentStore(capacity=2)
+    player = Player(Pose(3, 4, 90))
+    player.health = 80
+    component_id = store.attach(player)
+    assert isinstance(player.pose, StoredPose)
+    assert player.health == 80 and player.max_health == 100
+    assert (player.pose.x, player.pose.y, player.pose.theta) == (3, 4, 90)
+
+    player.health_updated = False
+    player.health -= 5
+    assert player.health_updated
+    assert store.columns['health'][component_id] == 75
+    player.pose.set_to(Pose(5, 6))
+    assert player.pose.x_updated
+    assert store.columns['x'][component_id] == 5 and store.columns['theta'][component_id] == 0
+
+    store.detach(player)
+    assert type(player.pose) is Pose and player.pose.coordinates_equal(Pose(5, 6))
+    assert player.health == 75 and '_health' in player.__dict__
+    assert len(store) == 0
+
+
+def test_store_grows_and_reuses_ids():
+    store = ComponentStore(capacity=2)
+    spikes = [Spike(damage=damage, pose=Pose(damage, 0)) for damage in range(5)]
+    ids = [store.attach(spike) for spike in spikes]
+    assert ids == list(range(5)) and store.capacity >= 5
+    assert store.columns['damage'][:5].tolist() == [0, 1, 2, 3, 4]
+    assert spikes[2].pose.h == 0.35
+    store.detach(spikes[1])
+    assert store.attach(Drone(Pose(1, 1))) == 1
+    assert store.columns['damage'][1] == 5 and store.columns['health'][1] == 0
+    assert store.row_bytes() == 72
+
+
+def test_attached_poses_keep_identity_and_fractions():
+    store = ComponentStore()
+    player = Player(Pose(3, 4))
+    pose = player.pose
+    store.attach(player)
+    assert player.pose is pose and isinstance(pose, StoredPose)
+    pose.set_to(Pose(2.5, 4.75))
+    assert (pose.x, pose.y) == (2.5, 4.75)
+    pose.set_to(Pose(7, 1))
+    assert type(pose.x) is int and (pose.x, pose.y) == (7, 1)
+    store.detach(player)
+    assert player.pose is pose and type(pose) is Pose
+    assert (pose.x, pose.y) == (7, 1) and '_component_store' not in pose.__dict__
+
+
+def test_shared_pose_is_copied():
+    store = ComponentStore()
+    shared = Pose(1, 1)
+    spikes = [Spike(damage=1, pose=shared), Spike(damage=2, pose=shared)]
+    for spike in spikes:
+        store.attach(spike)
+    assert spikes[0].pose is shared and spikes[1].pose is not shared
+    spikes[1].pose.set_to(Pose(2, 2))
+    assert shared.coordinates_equal(Pose(1, 1))
+    for spike in spikes:
+        store.detach(spike)
+    assert type(shared) is Pose and type(spikes[1].pose) is Pose
+
+
+def test_grid_with_component_store():
+    grid = GameGrid(5, 5, component_store=True)
+    player = Player(Pose(1, 1))
+    grid.add(player)
+    grid.add(Spike(damage=3, pose=Pose(1, 1)))
+    grid.add(HealingPad(healing=1, pose=Pose(1, 1)))
+    grid.update()
+    assert player.health == 98
+    assert player.move_to_position(Pose(2, 1))
+    assert grid.get(2, 1) == [player] and grid.spatial_index.in_radius(Player, 2, 1, 0) == [player]
+    assert len(grid.components) == 3
+    grid.remove(player)
+    assert len(grid.components) == 2 and player.health == 98
@@ -0,0 +1,87 @@
+import random
+
+import numpy as np
+import pytest
+
+import game.math
+from game.connectivity import ConnectedComponents
+from game.gameGrid import GameGrid
+from game.math import bool_matrix_to_string, DiscretePoint, PathFindingError
+from game.pose import Pose
+from testing.helpers import a_star_length, Block
+
+
+def test_components_match_search():
+    rng = random.Random(0)
+    for seed in range(40):
+        passable = np.random.RandomState(seed).rand(12, 9) > 0.4
+        components = ConnectedComponents(passable)
+        for _ in range(10):
+            start = (rng.randrange(12), rng.randrange(9))
+            goal = (rng.randrange(12), rng.randrange(9))
+            reachable = passable[goal] and a_star_length(passable, start, goal) is not None
+            assert components.connected(start, goal) == reachable
+
+
+def test_components_never_reject_reachable_after_updates():
+    rng = random.Random(1)
+    for seed in range(30):
+        passable = np.random.RandomState(seed).rand(10, 10) > 0.4
+        components = ConnectedComponents(passable)
+        for _ in range(10):
+            passable = passable.copy()
+            for _ in range(4):
+                passable[rng.randrange(10), rng.randrange(10)] ^= True
+            components.update(passable)
+            start = (rng.randrange(10), rng.randrange(10))
+            goal = (rng.randrange(10), rng.randrange(10))
+            reachable = passable[goal] and a_star_length(passable, start, goal) is not None
+            if reachable:
+                assert components.connected(start, goal)
+            elif not components.stale:
+                assert not components.connected(start, goal)
+            if not reachable and components.connected(start, goal):
+                components.report_unreachable()
+                assert not components.connected(start, goal)
+
+
+def test_opening_a_wall_merges_components():
+    passable = np.ones((5, 5), dtype=bool)
+    passable[2, :] = False
+    components = ConnectedComponents(passable)
+    assert not components.connected((0, 0), (4, 4))
+    passable = passable.copy()
+    passable[2, 3] = True
+    components.update(passable, [(2, 3)])
+    assert components.connected((0, 0), (4, 4))
+    assert components.relabels == 1
+
+
+def test_grid_rejects_walled_off_target_without_search():
+    grid = GameGrid(40, 40)
+    for x, y in [(30, 29), (30, 31), (29, 30), (31, 30)]:
+        grid.add(Block(Pose(x, y), tile_size=5))
+    agent = Block(Pose(0, 0))
+    grid.add(agent)
+    with pytest.raises(PathFindingError):
+        grid.path_cache.find_path(agent, DiscretePoint(0, 0), DiscretePoint(30, 30))
+    assert not grid.get_connected_components(agent).connected((0, 0), (30, 30))
+
+
+def test_path_finding_error_message_is_lazy(monkeypatch):
+    dumped = []
+    monkeypatch.setattr(game.math, 'bool_matrix_to_string', lambda matrix: dumped.append(matrix) or 'map')
+    passable = np.ones((2000, 2000), dtype=bool)
+    error = PathFindingError(DiscretePoint(0, 0), DiscretePoint(1, 1), passable)
+    assert not dumped
+    assert str(error).endswith('on map:\nmap')
+    assert len(dumped) == 1 and dumped[0] is passable
+    monkeypatch.undo()
+    small = [[True, False], [True, True]]
+    assert str(PathFindingError(DiscretePoint(0, 0), DiscretePoint(1, 1), small)) == \
+           f'No path found from Point(0, 0) to Point(1, 1) on map:\n{bool_matrix_to_string(small)}'
+    assert error.target == DiscretePoint(1, 1)
+
+
+def test_bool_matrix_to_string():
+    assert bool_matrix_to_string([[True, False], [True, True], [False, True]]) == 'x,,\n,,x\n'
@@ -0,0 +1,69 @@
+import random
+
+import numpy as np
+
+from game.dStarLite import DStarLite
+from testing.helpers import a_star_length, assert_valid_path
+
+
+def test_d_star_lite_matches_a_star():
+    rng = random.Random(0)
+    for seed in range(50):
+        passable = np.random.RandomState(seed).rand(12, 9) > 0.3
+        start = (rng.randrange(12), rng.randrange(9))
+        goal = (rng.randrange(12), rng.randrange(9))
+        path = DStarLite(passable, start, goal).get_path()
+        if path is not None:
+            assert_valid_path(path, start, goal, passable)
+        assert (None if path is None else len(path)) == a_star_length(passable, start, goal)
+
+
+def test_d_star_lite_replans_after_changes():
+    """ Moves the start, the goal and the walls around and checks every replan against a fresh A* search
+    """
+    rng = random.Random(1)
+    for seed in range(30):
+        passable = np.random.RandomState(seed).rand(10, 10) > 0.3
+        start = (rng.randrange(10), rng.randrange(10))
+        goal = (rng.randrange(10), rng.randrange(10))
+        planner = DStarLite(passable, start, goal)
+        for _ in range(15):
+            path = planner.get_path()
+            if path is not None:
+                assert_valid_path(path, start, goal, passable)
+            assert (None if path is None else len(path)) == a_star_length(passable, start, goal)
+
+            action = rng.random()
+            if action < 0.3 and path is not None and len(path) > 1:
+                start = path[1]
+                planner.move_start(start)
+            elif action < 0.6:
+                x, y = goal
+                goal = rng.choice([(x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)])
+                goal = (min(9, max(0, goal[0])), min(9, max(0, goal[1])))
+                planner.move_goal(goal)
+            else:
+                passable = passable.copy()
+                for _ in range(3):
+                    passable[rng.randrange(10), rng.randrange(10)] ^= True
+                planner.update_cells(passable)
+
+
+def test_d_star_lite_start_move_is_free():
+    passable = np.ones((20, 20), dtype=bool)
+    planner = DStarLite(passable, (0, 0), (19, 19))
+    path = planner.get_path()
+    expansions = planner.expansions
+    planner.move_start(path[1])
+    assert planner.get_path() == path[1:]
+    assert planner.expansions == expansions
+
+
+def test_d_star_lite_unreachable():
+    passable = np.ones((5, 5), dtype=bool)
+    passable[2, :] = False
+    planner = DStarLite(passable, (0, 0), (4, 4))
+    assert planner.get_path() is None
+    passable[2, 2] = True
+    planner.update_cells(passable)
+    assert len(planner.get_path()) == 9
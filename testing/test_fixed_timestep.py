@@ -0,0 +1,29 @@
+from pytest import approx
+
+from game.fixedTimestep import FixedTimestep
+from game.pose import Pose
+from game.wall import Wall
+
+
+def test_ticks_follow_time_not_frames():
+    timestep = FixedTimestep(tick_rate=10)
+    ticks = sum(timestep.advance(1 / 60) for _ in range(120))
+    assert ticks == 20
+    ticks = sum(timestep.advance(1 / 7) for _ in range(14))
+    assert ticks == 20
+
+
+def test_alpha_and_catch_up_cap():
+    timestep = FixedTimestep(tick_rate=4, max_ticks=3)
+    assert timestep.advance(0.375) == 1
+    assert timestep.alpha == approx(0.5)
+    assert timestep.advance(10) == 3
+    assert timestep.dropped == 37
+    assert 0 <= timestep.alpha < 1
+
+
+def test_render_position_interpolates():
+    wall = Wall(Pose(4, 2))
+    assert wall.render_position() == (4, 2)
+    wall.interpolate(2, 2, 0.25)
+    assert wall.render_position() == (2.5, 2)
@@ -0,0 +1,76 @@
+import numpy as np
+
+from game.flowField import distance_map, FlowField
+from game.gameGrid import GameGrid
+from game.math import DiscretePoint
+from game.pose import Pose
+from testing.helpers import Block
+
+
+def test_distance_map_open():
+    passable = np.ones((5, 4), dtype=bool)
+    distances = distance_map(passable, [(0, 0)])
+    for x in range(5):
+        for y in range(4):
+            assert distances[x, y] == x + y
+
+
+def test_distance_map_walls():
+    passable = np.ones((5, 5), dtype=bool)
+    passable[2, :4] = False
+    distances = distance_map(passable, [(0, 0)])
+    assert distances[2, 0] == -1
+    # Up the left side, across the top, back down
+    assert distances[4, 0] == 4 + 4 + 4
+
+
+def test_distance_map_multiple_sources():
+    passable = np.ones((9, 1), dtype=bool)
+    distances = distance_map(passable, [(0, 0), (8, 0)])
+    assert list(distances[:, 0]) == [0, 1, 2, 3, 4, 3, 2, 1, 0]
+
+
+def test_distance_map_unreachable():
+    passable = np.ones((5, 5), dtype=bool)
+    passable[2, :] = False
+    distances = distance_map(passable, [(0, 0)])
+    assert (distances[3:, :] == -1).all()
+
+
+def test_flow_field_follows_to_target():
+    passable = np.ones((6, 6), dtype=bool)
+    passable[3, 1:] = False
+    field = FlowField(passable, (5, 5))
+    x, y = 0, 5
+    steps = 0
+    while (x, y) != (5, 5):
+        step = field.next_step(x, y)
+        assert abs(step.x - x) + abs(step.y - y) == 1
+        assert passable[step.x, step.y]
+        x, y = step.x, step.y
+        steps += 1
+    assert steps == field.distances[0, 5]
+    assert field.next_step(5, 5) == DiscretePoint(5, 5)
+
+
+def test_flow_field_unreachable():
+    passable = np.ones((5, 5), dtype=bool)
+    passable[2, :] = False
+    field = FlowField(passable, (4, 4))
+    assert field.next_step(0, 0) is None
+
+
+class OtherBlock(Block):
+    """ Different class with the same coexistence rule as Block
+    """
+
+
+def test_flow_fields_shared_by_coexistence_key():
+    grid = GameGrid(6, 6)
+    target, a, b = Block(Pose(5, 5)), Block(Pose(0, 0)), OtherBlock(Pose(0, 5))
+    for element in (target, a, b):
+        grid.add(element)
+    assert a.coexistence_key() == b.coexistence_key()
+    grid.flow_fields.next_step(a, target)
+    grid.flow_fields.next_step(b, target)
+    assert len(grid.flow_fields._fields) == 1
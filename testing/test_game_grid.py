@@ -0,0 +1,213 @@
+from typing import List
+
+import numpy as np
+
+from game.drone import Drone
+from game.gameGrid import GameGrid
+from game.gridObject import GridObject, OverlapEffect
+from game.healingPad import HealingPad
+from game.player import Player
+from game.pose import Pose
+from game.spike import Spike
+from game.wall import Wall
+from testing.helpers import Block
+
+
+def test_occupancy_layers_follow_moves():
+    grid = GameGrid(4, 5)
+    a = Block(Pose(1, 1), tile_size=2)
+    b = Block(Pose(1, 1), tile_size=1)
+    grid.add(a)
+    grid.add(b)
+    assert grid.tile_sizes[1, 1] == 3
+    assert grid.counts[1, 1] == 2
+
+    assert a.move_to_position(Pose(2, 1))
+    assert grid.tile_sizes[1, 1] == 1 and grid.tile_sizes[2, 1] == 2
+    assert grid.class_counts[Block][2, 1] == 1
+
+    grid.remove(b)
+    assert grid.tile_sizes[1, 1] == 0
+    assert grid.counts.sum() == 1
+    assert grid.get_class_mask(GridObject).sum() == 1
+
+
+def test_collision_matrix_matches_can_coexist():
+    grid = GameGrid(6, 6)
+    grid.add(Wall(Pose(0, 0)))
+    grid.add(Wall(Pose(5, 5)))
+    grid.add(Player(Pose(1, 1)))
+    grid.add(Player(Pose(1, 1)))
+    grid.add(Spike(damage=1, pose=Pose(2, 2)))
+    grid.add(HealingPad(healing=1, pose=Pose(3, 3)))
+    grid.add(Drone(Pose(3, 3)))
+    for element in [Wall(Pose(4, 4)), Player(Pose(4, 4)), Drone(Pose(4, 4)),
+                    Spike(damage=1, pose=Pose(4, 4)), HealingPad(healing=1, pose=Pose(4, 4))]:
+        matrix = grid.get_collision_matrix(element)
+        assert isinstance(matrix, np.ndarray)
+        expected = [[element.can_coexist(grid.get(x, y)) for y in range(grid.height)] for x in range(grid.width)]
+        assert matrix.tolist() == expected
+
+
+def test_version_and_dirty_cells():
+    grid = GameGrid(4, 4)
+    block = Block(Pose(0, 0))
+    grid.add(block)
+    version = grid.version
+    assert grid.dirty_cells(version) == set()
+    block.move_to_position(Pose(1, 0))
+    assert grid.version > version
+    assert grid.dirty_cells(version) == {(0, 0), (1, 0)}
+
+
+def test_dirty_cells_forgotten():
+    grid = GameGrid(4, 4, dirty_log_size=2)
+    block = Block(Pose(0, 0))
+    grid.add(block)
+    version = grid.version
+    block.move_to_position(Pose(1, 0))
+    block.move_to_position(Pose(2, 0))
+    assert grid.dirty_cells(version) is None
+
+
+def test_collision_matrix_cache():
+    grid = GameGrid(4, 4)
+    a = Block(Pose(0, 0), tile_size=2)
+    b = Block(Pose(1, 1), tile_size=2)
+    grid.add(a)
+    grid.add(b)
+    grid.collision_matrix_cache.reset_stats()
+    assert grid.get_collision_matrix(a) is grid.get_collision_matrix(b)
+    assert grid.collision_matrix_cache.hits == 1
+    b.move_to_position(Pose(1, 2))
+    grid.get_collision_matrix(a)
+    assert grid.collision_matrix_cache.misses == 2
+
+
+def test_changed_cells():
+    grid = GameGrid(4, 4)
+    wall = Block(Pose(1, 1), tile_size=5)
+    grid.add(wall)
+    probe = Block(Pose(0, 0))
+    grid.add(probe)
+    matrix, version = grid.get_collision_matrix(probe), grid.version
+    probe.move_to_position(Pose(0, 1))
+    assert grid.changed_cells(probe, matrix, version) == []
+    wall.move_to_position(Pose(2, 1))
+    assert sorted(grid.changed_cells(probe, matrix, version)) == [(1, 1), (2, 1)]
+
+
+def test_cell_accessors():
+    grid = GameGrid(4, 5)
+    a = Block(Pose(1, 2))
+    b = Block(Pose(4, 3))
+    grid.add(a)
+    grid.add(b)
+    assert grid.cell(1, 2) is grid.get(1, 2) and grid.cell(1, 2) == [a]
+    assert grid.cell_at(Pose(4, 3)) is grid.get(Pose(4, 3))
+
+    cells = grid.cells_in_rect(-1, 1, 4, 10)
+    assert len(cells) == 3 and all(len(column) == 3 for column in cells)
+    assert cells[1][1] == [a]
+    assert grid.cells_in_rect(3, 0, 5, 4)[1][3] == [b]
+    assert grid.cells_in_rect(6, 0, 2, 2) == []
+
+
+def test_overlap_effects_derived_per_class():
+    assert Spike.has_overlap_effect() and Drone.has_overlap_effect() and HealingPad.has_overlap_effect()
+    assert not Wall.has_overlap_effect() and not Player.has_overlap_effect() and not Block.has_overlap_effect()
+
+
+def test_overlaps_only_run_on_active_cells():
+    grid = GameGrid(5, 5)
+    player = Player(Pose(1, 1))
+    grid.add(player)
+    grid.add(Spike(damage=3, pose=Pose(1, 1)))
+    grid.add(Spike(damage=3, pose=Pose(3, 3)))
+    for x in range(5):
+        grid.add(Wall(Pose(x, 4)))
+    assert list(grid.active_cells) == [(1, 1)]
+
+    grid.update()
+    assert player.health == 97
+    assert player.move_to_position(Pose(2, 1))
+    assert len(grid.active_cells) == 0
+    grid.update()
+    assert player.health == 97
+
+    assert player.move_to_position(Pose(3, 3))
+    grid.update()
+    assert player.health == 94
+    grid.remove(player)
+    assert len(grid.active_cells) == 0 and grid.overlap_sources.sum() == 2
+
+
+class Bumper(Block):
+    """ Block that counts its collisions
+    """
+
+    def __init__(self, pose: Pose):
+        super().__init__(pose, tile_size=0)
+        self.bumps = 0
+
+    def collision(self, other: 'GridObject') -> None:
+        self.bumps += 1
+
+
+def test_collision_table_skips_no_op_handlers():
+    table = GridObject.collision_table
+    assert table.handlers(Wall, Player) == (False, False)
+    assert table.handlers(Bumper, Block) == (True, False)
+
+    grid = GameGrid(3, 3)
+    bumper = Bumper(Pose(1, 1))
+    grid.add(bumper)
+    grid.add(Spike(damage=1, pose=Pose(1, 1)))
+    grid.add(Block(Pose(0, 1)))
+    bumper.bumps = 0
+    table.reset_stats()
+    mover = grid.get(0, 1)[0]
+    assert mover.move_to_position(Pose(1, 1))
+    assert bumper.bumps == 1
+    assert table.stats()['calls'] == 1 and table.stats()['skipped'] == 3
+    assert bumper.move_to_position(Pose(0, 0))
+    assert bumper.bumps == 1
+
+
+class Thorns(Block):
+    """ Block with its own overlap effect, which can't be batched
+    """
+
+    def overlaps(self, others: List['GridObject']) -> None:
+        for other in others:
+            if isinstance(other, Player):
+                other.health -= 1
+
+
+def test_batched_damage_and_healing():
+    assert Spike.batched_effect() is OverlapEffect.DAMAGE and Drone.batched_effect() is OverlapEffect.DAMAGE
+    assert HealingPad.batched_effect() is OverlapEffect.HEALING
+    assert Thorns.batched_effect() is None and Player.batched_effect() is None
+
+    grid = GameGrid(6, 6)
+    hurt, healed, capped, untouched = Player(Pose(0, 0)), Player(Pose(1, 0)), Player(Pose(2, 0)), Player(Pose(3, 0))
+    for player in (hurt, healed, capped, untouched):
+        grid.add(player)
+    healed.health = 50
+    capped.health = 99
+    grid.add(Spike(damage=3, pose=Pose(0, 0)))
+    grid.add(Spike(damage=4, pose=Pose(0, 0)))
+    grid.add(Thorns(Pose(0, 0), tile_size=0))
+    grid.add(HealingPad(healing=10, pose=Pose(1, 0)))
+    grid.add(Spike(damage=5, pose=Pose(1, 0)))
+    grid.add(HealingPad(healing=10, pose=Pose(2, 0)))
+    for player in (hurt, healed, capped, untouched):
+        player.health_updated = False
+
+    grid.update()
+    assert (hurt.health, healed.health, capped.health, untouched.health) == (92, 55, 100, 100)
+    assert hurt.health_updated and healed.health_updated and capped.health_updated
+    assert not untouched.health_updated
+    capped.health_updated = False
+    grid.update()
+    assert capped.health == 100 and not capped.health_updated
@@ -0,0 +1,113 @@
+import random
+
+import numpy as np
+import pytest
+
+from game.gameGrid import GameGrid
+from game.hierarchicalPathFinding import HierarchicalPathFinder
+from game.math import PathFindingError
+from game.pose import Pose
+from testing.helpers import a_star_length, assert_valid_path, Block
+
+
+@pytest.mark.parametrize('width, height', [(23, 17), (17, 4), (30, 5)])
+def test_hierarchical_reachability_matches_a_star(width, height):
+    # Includes maps at most one cluster tall, and plenty of starts and goals on entrances
+    rng = random.Random(width * height)
+    for seed in range(100):
+        passable = np.random.RandomState(seed).rand(width, height) > 0.3
+        finder = HierarchicalPathFinder(passable, cluster_size=5)
+        for _ in range(10):
+            start = (rng.randrange(width), rng.randrange(height))
+            goal = (rng.randrange(width), rng.randrange(height))
+            optimal = a_star_length(passable, start, goal)
+            try:
+                path = finder.find_full_path(start, goal)
+            except PathFindingError:
+                path = None
+            assert (path is None) == (optimal is None), (seed, start, goal)
+            if path is not None:
+                assert_valid_path(path, start, goal, passable)
+                assert len(path) >= optimal
+
+
+def test_hierarchical_start_on_entrance():
+    passable = np.ones((8, 1), dtype=bool)
+    finder = HierarchicalPathFinder(passable, cluster_size=4)
+    # (3, 0) and (4, 0) are the two sides of the only entrance
+    for start in [(3, 0), (4, 0), (0, 0)]:
+        for goal in [(7, 0), (0, 0)]:
+            path = finder.find_full_path(start, goal)
+            assert_valid_path(path, start, goal, passable)
+            assert len(path) == abs(goal[0] - start[0]) + 1
+
+
+def test_hierarchical_map_one_cluster_tall():
+    passable = np.ones((12, 3), dtype=bool)
+    passable[4, 1:] = False
+    finder = HierarchicalPathFinder(passable, cluster_size=4)
+    path = finder.find_full_path((0, 2), (11, 2))
+    assert_valid_path(path, (0, 2), (11, 2), passable)
+    assert (4, 0) in path
+
+
+def test_hierarchical_impassable_start_steps_across_border():
+    passable = np.ones((8, 3), dtype=bool)
+    # The start is blocked and walled in on its own side of the border, its only way out is into the next cluster
+    passable[3, :] = False
+    passable[2, 1] = False
+    finder = HierarchicalPathFinder(passable, cluster_size=4)
+    path = finder.find_full_path((3, 1), (7, 1))
+    assert path[:2] == [(3, 1), (4, 1)]
+    assert_valid_path(path, (3, 1), (7, 1), passable)
+
+
+def test_hierarchical_open_map_is_near_optimal():
+    passable = np.ones((64, 64), dtype=bool)
+    finder = HierarchicalPathFinder(passable, cluster_size=8)
+    path = finder.find_full_path((0, 0), (63, 63))
+    assert_valid_path(path, (0, 0), (63, 63), passable)
+    assert len(path) == 127
+
+
+def test_hierarchical_segments_are_lazy():
+    passable = np.ones((40, 40), dtype=bool)
+    finder = HierarchicalPathFinder(passable, cluster_size=10)
+    path = finder.find_path((0, 0), (39, 0))
+    assert len(path.waypoints) > 2
+    first = path.next_segment()
+    assert first[0] == (0, 0)
+    assert first[-1] == path.finder.cell(path.waypoints[1])
+    assert len(path.remaining_waypoints()) == len(path.waypoints) - 2
+
+
+def test_hierarchical_update_rebuilds_changed_clusters():
+    passable = np.ones((20, 20), dtype=bool)
+    finder = HierarchicalPathFinder(passable, cluster_size=5)
+    passable = passable.copy()
+    passable[10, :] = False
+    assert finder.update(passable, [(10, y) for y in range(20)] + [(3, 3)]) == 20
+    with pytest.raises(PathFindingError):
+        finder.find_path((0, 0), (19, 19))
+    passable[10, 17] = True
+    assert finder.update(passable) == 1
+    path = finder.find_full_path((0, 0), (19, 19))
+    assert_valid_path(path, (0, 0), (19, 19), passable)
+
+
+def test_grid_shares_and_updates_hierarchical_path_finder():
+    grid = GameGrid(12, 12, cluster_size=4)
+    walls = [Block(Pose(6, y), tile_size=5) for y in range(12)]
+    for wall in walls:
+        grid.add(wall)
+    agent = Block(Pose(0, 0))
+    grid.add(agent)
+    finder = grid.get_hierarchical_path_finder(agent)
+    assert grid.get_hierarchical_path_finder(Block(Pose(1, 1))) is finder
+    with pytest.raises(PathFindingError):
+        finder.find_path((0, 0), (11, 11))
+
+    grid.remove(walls[5])
+    assert grid.get_hierarchical_path_finder(agent) is finder
+    path = finder.find_full_path((0, 0), (11, 11))
+    assert (6, 5) in path
@@ -0,0 +1,77 @@
+import random
+
+import numpy as np
+
+from game.gameGrid import GameGrid
+from game.landmarks import LandmarkTable
+from game.math import a_star, DiscretePoint, PathFindingError
+from game.pose import Pose
+from testing.helpers import Block
+
+
+def serpentine(width, height):
+    """ Corridors that force a path back and forth across the whole map
+    """
+    passable = np.ones((width, height), dtype=bool)
+    for i, x in enumerate(range(2, width - 1, 3)):
+        passable[x, :] = False
+        passable[x, 0 if i % 2 else height - 1] = True
+    return passable
+
+
+def test_landmark_heuristic_keeps_paths_optimal():
+    rng = random.Random(0)
+    for seed in range(30):
+        passable = np.random.RandomState(seed).rand(14, 10) > 0.3
+        table = LandmarkTable(passable, count=4)
+        for _ in range(5):
+            start = DiscretePoint(rng.randrange(14), rng.randrange(10))
+            target = DiscretePoint(rng.randrange(14), rng.randrange(10))
+            try:
+                expected = len(a_star(start, target, passable))
+            except PathFindingError:
+                continue
+            path = a_star(start, target, passable, heuristic=table.heuristic((target.x, target.y)))
+            assert len(path) == expected
+
+
+def test_landmark_heuristic_expands_less_in_corridors():
+    passable = serpentine(40, 20)
+    table = LandmarkTable(passable, count=4)
+    start, target = DiscretePoint(0, 0), DiscretePoint(39, 19)
+    manhattan_stats, landmark_stats = {}, {}
+    expected = len(a_star(start, target, passable, stats=manhattan_stats))
+    path = a_star(start, target, passable, stats=landmark_stats, heuristic=table.heuristic((39, 19)))
+    assert len(path) == expected
+    assert landmark_stats['expansions'] < manhattan_stats['expansions'] * 0.75
+
+
+def test_landmarks_cover_every_component():
+    passable = np.ones((9, 5), dtype=bool)
+    passable[4, :] = False
+    table = LandmarkTable(passable, count=2)
+    assert {x < 4 for x, _ in table.landmarks} == {True, False}
+
+
+def test_service_falls_back_while_stale():
+    grid = GameGrid(10, 10, landmark_count=3)
+    try:
+        wall = Block(Pose(5, 5), tile_size=5)
+        grid.add(wall)
+        agent = Block(Pose(0, 0))
+        grid.add(agent)
+        assert grid.landmarks.get_table(agent) is None
+        grid.landmarks.wait()
+        table = grid.landmarks.get_table(agent)
+        assert table is not None
+
+        # More walls only make the old bounds looser
+        grid.add(Block(Pose(6, 6), tile_size=5))
+        assert grid.landmarks.get_table(agent) is table
+        # An opened cell could make them overestimate
+        grid.remove(wall)
+        assert grid.landmarks.get_table(agent) is None
+        grid.landmarks.wait()
+        assert grid.landmarks.get_table(agent) not in (None, table)
+    finally:
+        grid.close()
@@ -0,0 +1,87 @@
+import numpy as np
+import pytest
+
+from game.math import a_star, DiscretePoint, PathFindingError
+
+
+def open_map(width, height):
+    return [[True for _ in range(height)] for _ in range(width)]
+
+
+def assert_valid_path(path, start, target, grid):
+    assert path[0] == start
+    assert path[-1] == target
+    for a, b in zip(path, list(path)[1:]):
+        assert abs(a.x - b.x) + abs(a.y - b.y) == 1
+        assert grid[b.x][b.y]
+
+
+def test_a_star_straight_line():
+    grid = open_map(10, 5)
+    path = a_star(DiscretePoint(0, 2), DiscretePoint(9, 2), grid)
+    assert_valid_path(path, DiscretePoint(0, 2), DiscretePoint(9, 2), grid)
+    assert len(path) == 10
+
+
+def test_a_star_same_start_and_target():
+    path = a_star(DiscretePoint(3, 3), DiscretePoint(3, 3), open_map(5, 5))
+    assert list(path) == [DiscretePoint(3, 3)]
+
+
+def test_a_star_around_wall():
+    grid = open_map(7, 7)
+    for y in range(6):
+        grid[3][y] = False
+    start, target = DiscretePoint(0, 0), DiscretePoint(6, 0)
+    path = a_star(start, target, grid)
+    assert_valid_path(path, start, target, grid)
+    # Up 6, across 6, down 6
+    assert len(path) == 19
+
+
+def test_a_star_blocked_target():
+    grid = open_map(5, 5)
+    grid[4][4] = False
+    with pytest.raises(PathFindingError):
+        a_star(DiscretePoint(0, 0), DiscretePoint(4, 4), grid)
+
+
+def test_a_star_unreachable_target():
+    grid = open_map(5, 5)
+    for y in range(5):
+        grid[2][y] = False
+    with pytest.raises(PathFindingError):
+        a_star(DiscretePoint(0, 0), DiscretePoint(4, 4), grid)
+
+
+def test_a_star_out_of_bounds_target():
+    with pytest.raises(PathFindingError):
+        a_star(DiscretePoint(0, 0), DiscretePoint(5, 0), open_map(5, 5))
+
+
+def test_jump_point_search_matches_a_star_length():
+    for seed in range(200):
+        random_state = np.random.RandomState(seed)
+        grid = random_state.rand(15, 11) > random_state.rand() * 0.5
+        start = DiscretePoint(random_state.randint(15), random_state.randint(11))
+        target = DiscretePoint(random_state.randint(15), random_state.randint(11))
+        try:
+            expected = len(a_star(start, target, grid))
+        except PathFindingError:
+            with pytest.raises(PathFindingError):
+                a_star(start, target, grid, jump_points=True)
+            continue
+        path = a_star(start, target, grid, jump_points=True)
+        assert_valid_path(path, start, target, grid)
+        assert len(path) == expected
+
+
+def test_jump_point_search_expands_fewer_nodes_on_open_map():
+    grid = open_map(50, 50)
+    for y in range(40):
+        grid[25][y] = False
+    a_star_stats, jump_point_stats = {}, {}
+    start, target = DiscretePoint(0, 0), DiscretePoint(49, 0)
+    assert len(a_star(start, target, grid, stats=a_star_stats)) == \
+           len(a_star(start, target, grid, jump_points=True, stats=jump_point_stats))
+    assert jump_point_stats['expansions'] * 10 < a_star_stats['expansions']
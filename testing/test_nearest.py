@@ -0,0 +1,62 @@
+from game.gameGrid import GameGrid
+from game.math import a_star
+from game.pose import Pose
+from testing.helpers import Block
+
+
+class Pad(Block):
+    """ Something to look for
+    """
+
+
+def make_grid():
+    grid = GameGrid(12, 12)
+    for y in range(9):
+        grid.add(Block(Pose(5, y), tile_size=5))
+    agent = Block(Pose(4, 0))
+    grid.add(agent)
+    behind_wall = Pad(Pose(6, 0))
+    around = Pad(Pose(0, 8))
+    grid.add(behind_wall)
+    grid.add(around)
+    return grid, agent, behind_wall, around
+
+
+def test_find_nearest_uses_path_distance():
+    grid, agent, behind_wall, around = make_grid()
+    found, path = grid.find_nearest(agent, Pad)
+    # Straight across the wall is closer, but walking around it is not
+    assert found is around
+    expected = a_star(agent.pose.as_discrete_point(), around.pose.as_discrete_point(),
+                      grid.get_collision_matrix(agent))
+    assert len(path) == len(expected)
+    assert path[0].coordinates_equal(agent.pose) and path[-1].coordinates_equal(around.pose)
+
+
+def test_find_nearest_with_predicate_and_cache():
+    grid, agent, behind_wall, around = make_grid()
+
+    def is_behind_wall(other):
+        return other is behind_wall
+
+    found, path = grid.find_nearest(agent, is_behind_wall)
+    assert found is behind_wall
+    assert len(path) == 21
+    assert len(grid.nearest_cache) == 1
+    other_agent = Block(Pose(4, 10))
+    grid.add(other_agent)
+    assert grid.find_nearest(other_agent, is_behind_wall)[0] is behind_wall
+    assert grid.nearest_cache.hits == 0  # Adding an element changed the grid version
+
+    third = Block(Pose(0, 0))
+    grid.add(third)
+    grid.find_nearest(third, Pad)
+    grid.find_nearest(other_agent, Pad)
+    assert grid.nearest_cache.hits == 1
+
+
+def test_find_nearest_never_finds_itself():
+    grid, agent, behind_wall, around = make_grid()
+    found, _ = grid.find_nearest(around, Pad)
+    assert found is behind_wall
+    assert grid.find_nearest(agent, lambda other: False) is None
@@ -0,0 +1,56 @@
+import pytest
+
+from game.gameGrid import GameGrid
+from game.orderedSet import OrderedSet
+from game.pose import Pose
+from testing.helpers import Block
+
+
+def test_ordered_set_keeps_insertion_order():
+    items = OrderedSet([3, 1, 2, 1])
+    items.add(0)
+    items.remove(1)
+    assert list(items) == [3, 2, 0]
+    assert len(items) == 3
+    assert 2 in items and 1 not in items
+    with pytest.raises(KeyError):
+        items.remove(1)
+    items.discard(1)
+
+
+def test_ordered_set_compacts():
+    items = OrderedSet(range(1000))
+    for item in range(0, 1000, 3):
+        items.remove(item)
+    assert list(items) == [item for item in range(1000) if item % 3]
+    for item in range(1000):
+        items.discard(item)
+    assert len(items) == 0 and list(items) == []
+    assert len(items._slots) < 1000
+
+
+def test_ordered_set_stable_while_modified():
+    items = OrderedSet(range(10))
+    seen = []
+    for item in items:
+        seen.append(item)
+        if item == 2:
+            items.remove(5)
+            items.remove(1)
+            items.add(10)
+            # Removing most items would compact, which has to wait for the iteration to end
+            for other in range(6, 10):
+                items.remove(other)
+    assert seen == [0, 1, 2, 3, 4, 10]
+    assert list(items) == [0, 2, 3, 4, 10]
+
+
+def test_grid_registries():
+    grid = GameGrid(4, 4)
+    blocks = [Block(Pose(x, 0)) for x in range(4)]
+    for block in blocks:
+        grid.add(block)
+    assert grid.remove(blocks[1])
+    assert not grid.remove(blocks[1])
+    assert list(grid.elements) == [blocks[0], blocks[2], blocks[3]]
+    grid.update()
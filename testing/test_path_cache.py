@@ -0,0 +1,48 @@
+from game.gameGrid import GameGrid
+from game.math import DiscretePoint
+from game.pose import Pose
+from testing.helpers import Block
+
+
+def make_grid():
+    grid = GameGrid(5, 5)
+    agent = Block(Pose(0, 0))
+    grid.add(agent)
+    return grid, agent
+
+
+def test_path_cache_hit_returns_fresh_deque():
+    grid, agent = make_grid()
+    cache = grid.path_cache
+    first = cache.find_path(agent, DiscretePoint(0, 0), DiscretePoint(4, 0))
+    first.popleft()
+    second = cache.find_path(agent, DiscretePoint(0, 0), DiscretePoint(4, 0))
+    assert len(second) == 5
+    assert cache.hits == 1 and cache.misses == 1
+
+
+def test_path_cache_invalidates_only_crossing_paths():
+    grid, agent = make_grid()
+    cache = grid.path_cache
+    cache.find_path(agent, DiscretePoint(0, 0), DiscretePoint(4, 0))
+    cache.find_path(agent, DiscretePoint(0, 4), DiscretePoint(4, 4))
+    assert len(cache) == 2
+
+    # Blocks a cell on the bottom path only
+    grid.add(Block(Pose(2, 0), tile_size=5))
+    path = cache.find_path(agent, DiscretePoint(0, 4), DiscretePoint(4, 4))
+    assert cache.hits == 1
+    assert cache.invalidations == 1
+    path = cache.find_path(agent, DiscretePoint(0, 0), DiscretePoint(4, 0))
+    assert DiscretePoint(2, 0) not in path
+    assert cache.misses == 3
+
+
+def test_path_cache_memory_budget():
+    grid, agent = make_grid()
+    cache = grid.path_cache
+    cache.max_bytes = 1
+    cache.find_path(agent, DiscretePoint(0, 0), DiscretePoint(4, 0))
+    assert len(cache) == 0
+    assert cache.evictions == 1
+    assert cache.bytes == 0
@@ -0,0 +1,78 @@
+from game.attributes import AttrPathFinding, PathFindingStrategy
+from game.camera import Camera
+from game.gameGrid import GameGrid
+from game.pose import Pose
+from testing.helpers import Block
+
+
+class Walker(AttrPathFinding, Block):
+    """ Path finding object without any graphics, remembers the paths it is given
+    """
+
+    def __init__(self, pose: Pose):
+        super().__init__(pose)
+        self.paths = []
+
+    def set_path(self, path, wrap: bool = False):
+        self.paths.append(list(path))
+        super().set_path(path, wrap)
+
+
+def test_scheduler_spreads_search_over_ticks():
+    grid = GameGrid(30, 30)
+    grid.path_scheduler.expansion_budget = 10
+    walker = Walker(Pose(0, 0))
+    grid.add(walker)
+    assert walker.path_find(Pose(29, 29), PathFindingStrategy.SCHEDULED)
+    ticks = 0
+    while grid.path_scheduler.is_pending(walker):
+        assert grid.path_scheduler.run() <= 10
+        ticks += 1
+    assert ticks > 5
+    assert len(walker.paths) == 1
+    assert len(walker.paths[0]) == 59
+    assert walker.paths[0][0].coordinates_equal(Pose(0, 0))
+
+
+def test_scheduler_prefers_agents_near_camera():
+    grid = GameGrid(20, 20)
+    grid.path_scheduler.expansion_budget = 12
+    grid.path_scheduler.camera = Camera(Pose(19, 19))
+    far, near = Walker(Pose(0, 0)), Walker(Pose(18, 18))
+    grid.add(far)
+    grid.add(near)
+    far.path_find(Pose(5, 5), PathFindingStrategy.SCHEDULED)
+    near.path_find(Pose(13, 13), PathFindingStrategy.SCHEDULED)
+    grid.path_scheduler.run()
+    assert near.paths and not far.paths
+    while len(grid.path_scheduler):
+        grid.path_scheduler.run()
+    assert len(far.paths[0]) == 11
+
+
+def test_scheduler_picks_up_path_after_agent_moved():
+    grid = GameGrid(10, 10)
+    grid.path_scheduler.expansion_budget = 3
+    walker = Walker(Pose(0, 0))
+    grid.add(walker)
+    walker.path_find(Pose(9, 0), PathFindingStrategy.SCHEDULED)
+    grid.path_scheduler.run()
+    walker.move_to_position(Pose(1, 0))
+    while len(grid.path_scheduler):
+        grid.path_scheduler.run()
+    assert walker.paths[0][0].coordinates_equal(Pose(1, 0))
+    assert len(walker.paths[0]) == 9
+
+
+def test_scheduler_drops_unreachable_and_removed():
+    grid = GameGrid(10, 10)
+    walker = Walker(Pose(0, 0))
+    grid.add(walker)
+    grid.add(Block(Pose(5, 5), tile_size=5))
+    walker.path_find(Pose(5, 5), PathFindingStrategy.SCHEDULED)
+    grid.path_scheduler.run()
+    assert not grid.path_scheduler.is_pending(walker) and not walker.paths
+
+    walker.path_find(Pose(9, 9), PathFindingStrategy.SCHEDULED)
+    grid.remove(walker)
+    assert len(grid.path_scheduler) == 0
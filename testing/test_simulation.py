@@ -0,0 +1,33 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+
+SCRIPT = '''
+from game.headless import enable_headless
+enable_headless()
+from game.simulation import Simulation
+simulation = Simulation.chase(drones=5)
+drone = next(element for element in simulation.grid.elements if type(element).__name__ == 'Drone')
+assert drone.get_sprites() == []
+start = drone.pose.get_coordinates_as_pose()
+simulation.run(20)
+assert simulation.ticks == 20
+assert not drone.pose.coordinates_equal(start)
+'''
+
+
+def test_simulation_runs_without_display():
+    env = {key: value for key, value in os.environ.items() if key not in ('DISPLAY', 'PYGLET_HEADLESS')}
+    env['PYTHONPATH'] = str(ROOT)
+    result = subprocess.run([sys.executable, '-c', SCRIPT], cwd=ROOT, env=env, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+
+
+def test_importing_simulation_keeps_graphics():
+    script = 'import game.simulation\nfrom game.headless import is_headless\nassert not is_headless()'
+    env = dict(os.environ, PYTHONPATH=str(ROOT))
+    result = subprocess.run([sys.executable, '-c', script], cwd=ROOT, env=env, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
@@ -0,0 +1,82 @@
+from collections import deque
+
+from game.camera import Camera
+from game.drone import Drone
+from game.gameGrid import GameGrid
+from game.pose import Pose
+from game.simulationLod import LodTier, SimulationLod
+from testing.helpers import Sleeper
+
+
+class Ticker(Sleeper):
+    """ Asks to be updated every tick, and remembers the dt of every update
+    """
+
+    def __init__(self, pose: Pose):
+        super().__init__(pose, sleep=1)
+        self.dts = []
+
+    def update(self, dt: float) -> None:
+        super().update(dt)
+        self.dts.append(dt)
+
+
+def lod_grid(camera: Camera) -> GameGrid:
+    grid = GameGrid(100, 100)
+    grid.lod = SimulationLod(grid, camera, view_width=10, view_height=10, near_distance=10, near_interval=4,
+                             far_interval=10)
+    return grid
+
+
+def test_tiers_by_distance_to_view():
+    lod = lod_grid(Camera(Pose(50, 50))).lod
+    assert lod.tier_at(50, 50) is LodTier.VIEW
+    assert lod.tier_at(55, 45) is LodTier.VIEW
+    assert lod.tier_at(56, 50) is LodTier.NEAR
+    assert lod.tier_at(50, 65) is LodTier.NEAR
+    assert lod.tier_at(50, 66) is LodTier.FAR
+    assert lod.tier_at(0, 0) is LodTier.FAR
+
+
+def test_far_elements_run_less_often_with_accumulated_dt():
+    grid = lod_grid(Camera(Pose(50, 50)))
+    view, near, far = Ticker(Pose(50, 50)), Ticker(Pose(60, 50)), Ticker(Pose(90, 90))
+    for ticker in (view, near, far):
+        grid.add(ticker)
+    for _ in range(41):
+        grid.update(0.5)
+    assert view.updates == 41
+    # Every element is updated once when added, then after the interval of its tier
+    assert near.updates == 11
+    assert far.updates == 5
+    assert near.dts[1:] == [2.0] * 10
+    assert far.dts[1:] == [5.0] * 4
+    assert grid.lod.totals == {LodTier.VIEW: 41, LodTier.NEAR: 11, LodTier.FAR: 5}
+    assert grid.lod.stats()['FAR'] == {'elements': 1, 'updated last tick': 1, 'updated per tick': 5 / 41}
+
+
+def test_camera_moving_closer_brings_updates_forward():
+    camera = Camera(Pose(50, 50))
+    grid = lod_grid(camera)
+    ticker = Ticker(Pose(90, 90))
+    grid.add(ticker)
+    grid.update()
+    grid.update()
+    assert grid.lod.tiers[ticker] is LodTier.FAR
+    camera.pose.set_to(Pose(88, 88))
+    grid.update()
+    assert grid.lod.tiers[ticker] is LodTier.VIEW
+    assert ticker.dts == [1, 2]
+    grid.update()
+    assert ticker.dts == [1, 2, 1]
+
+
+def test_held_back_drones_catch_up():
+    grid = lod_grid(Camera(Pose(0, 0)))
+    path = deque([Pose(x, 90) for x in range(60, 80)])
+    drone = Drone(Pose(60, 90), path=path)
+    grid.add(drone)
+    for _ in range(11):
+        grid.update()
+    # Updated on the first and eleventh tick, the second update makes up for the ten ticks since the first
+    assert drone.pose.coordinates_equal(Pose(71, 90))
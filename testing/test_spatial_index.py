@@ -0,0 +1,64 @@
+import random
+
+from game.attributes import AttrHealthy
+from game.gameGrid import GameGrid
+from game.player import Player
+from game.pose import Pose
+from game.spatialIndex import SpatialIndex
+from game.wall import Wall
+from testing.helpers import Block
+
+
+def populate(grid: GameGrid, seed: int):
+    rng = random.Random(seed)
+    for _ in range(150):
+        x, y = rng.randrange(grid.width), rng.randrange(grid.height)
+        if not grid.get(x, y):
+            grid.add(Player(Pose(x, y)) if rng.random() < 0.3 else Block(Pose(x, y)))
+    return rng
+
+
+def test_queries_match_brute_force():
+    grid = GameGrid(40, 50, bucket_size=8)
+    rng = populate(grid, 0)
+    index = grid.spatial_index
+    for _ in range(50):
+        block = next(element for element in grid.elements if isinstance(element, Block))
+        block.move_to_position(Pose(rng.randrange(50), rng.randrange(40)))
+        x, y = rng.randrange(-5, 55), rng.randrange(-5, 45)
+        players = [element for element in grid.elements if isinstance(element, Player)]
+
+        expected = [p for p in players if (p.pose.x - x) ** 2 + (p.pose.y - y) ** 2 <= 36]
+        assert sorted(map(id, index.in_radius(AttrHealthy, x, y, 6))) == sorted(map(id, expected))
+
+        expected = [e for e in grid.elements if x <= e.pose.x < x + 7 and y <= e.pose.y < y + 3]
+        assert sorted(map(id, index.in_rect(object, x, y, 7, 3))) == sorted(map(id, expected))
+
+        distances = sorted((p.pose.x - x) ** 2 + (p.pose.y - y) ** 2 for p in players)
+        nearest = index.nearest(Player, x, y, k=5)
+        assert [(p.pose.x - x) ** 2 + (p.pose.y - y) ** 2 for p in nearest] == distances[:5]
+
+
+def test_queries_filter_by_class():
+    grid = GameGrid(20, 20)
+    for x in range(20):
+        grid.add(Wall(Pose(x, 10)))
+    player = Player(Pose(3, 4))
+    grid.add(player)
+    assert grid.spatial_index.in_radius(Player, 3, 9, 5) == [player]
+    assert grid.spatial_index.nearest(AttrHealthy, 19, 19) == [player]
+    assert grid.spatial_index.nearest(Block, 0, 0) == []
+    grid.remove(player)
+    assert grid.spatial_index.in_radius(Player, 3, 4, 1) == []
+
+
+def test_radius_query_only_visits_nearby_buckets():
+    index = SpatialIndex(10000, 10000, bucket_size=8)
+    far = [Block(Pose(x, 5000)) for x in range(0, 10000, 10)]
+    for block in far:
+        index.add(block, block.pose.x, block.pose.y)
+    near = Block(Pose(12, 12))
+    index.add(near, 12, 12)
+    visited = list(index._buckets_in(Block, 0, 0, 3, 3))
+    assert visited == [{near: None}]
+    assert index.in_radius(Block, 10, 10, 10) == [near]
@@ -0,0 +1,128 @@
+from collections import deque
+
+import pytest
+
+from game.attributes import PathFindingStrategy
+from game.drone import Drone
+from game.gameGrid import GameGrid
+from game.player import Player
+from game.pose import Pose
+from game.timerWheel import TimerWheel
+from testing.helpers import Block, Sleeper
+
+
+def test_timer_wheel_fires_on_time():
+    # Small wheel so timers go through every level and the overflow list
+    wheel = TimerWheel(slots=4, levels=2)
+    delays = {f'item {delay}': delay for delay in [1, 2, 3, 4, 5, 15, 16, 17, 31, 40, 63, 64, 100]}
+    for item, delay in delays.items():
+        wheel.schedule(item, delay)
+    assert len(wheel) == len(delays)
+    fired = {}
+    for _ in range(120):
+        for item in wheel.advance():
+            fired[item] = wheel.now
+    assert fired == delays
+    assert len(wheel) == 0
+
+
+def test_timer_wheel_cancel_and_reschedule():
+    wheel = TimerWheel(slots=4, levels=2)
+    wheel.schedule('a', 3)
+    wheel.schedule('b', 3)
+    assert wheel.cancel('a')
+    assert not wheel.cancel('a')
+    wheel.advance()
+    wheel.schedule('b', 10)
+    assert wheel.due_tick('b') == 11
+    fired = [(wheel.now, item) for _ in range(20) for item in wheel.advance()]
+    assert fired == [(11, 'b')]
+
+
+def test_idle_elements_are_not_updated():
+    grid = GameGrid(5, 5)
+    active, idle = Sleeper(Pose(0, 0), sleep=3), Sleeper(Pose(1, 1))
+    grid.add(active)
+    grid.add(idle)
+    for _ in range(9):
+        grid.update()
+    # Both are woken once when added, only the active one asks again
+    assert idle.updates == 1
+    assert active.updates == 3
+    assert grid.wakeups.is_idle(idle)
+    assert not grid.wakeups.is_idle(active)
+
+    grid.wakeups.wake_on_cell_change(idle, 2, 2)
+    grid.update()
+    assert idle.updates == 1
+    grid.add(Block(Pose(2, 2)))
+    grid.update()
+    assert idle.updates == 2
+
+    updates = active.updates
+    grid.remove(active)
+    for _ in range(9):
+        grid.update()
+    assert active.updates == updates
+
+
+def test_players_are_never_updated():
+    grid = GameGrid(5, 5)
+    grid.add(Player(Pose(0, 0)))
+    grid.update()
+    assert not grid.always_update_list and not grid.update_list
+    assert grid.wakeups.timers.now == 1
+
+
+@pytest.mark.parametrize('strategy', [PathFindingStrategy.A_STAR, PathFindingStrategy.FLOW_FIELD])
+def test_drone_sleeps_until_target_moves(strategy):
+    grid = GameGrid(10, 10)
+    player = Player(Pose(5, 0))
+    drone = Drone(Pose(0, 0))
+    grid.add(player)
+    grid.add(drone)
+    drone.actively_path_find(player, strategy)
+    for _ in range(10):
+        grid.update()
+    assert drone.pose.coordinates_equal(player.pose)
+    assert not grid.wakeups.is_idle(drone)
+    assert not grid.update_list and drone not in grid.wakeups.timers
+
+    woken = grid.wakeups.woken
+    for _ in range(5):
+        grid.update()
+    assert grid.wakeups.woken == woken
+
+    player.move_to_position(Pose(5, 3))
+    for _ in range(5):
+        grid.update()
+    assert drone.pose.coordinates_equal(player.pose)
+    assert grid.moved[player] == (5, 0)
+
+
+def test_drone_on_fixed_path_goes_idle_at_the_end():
+    grid = GameGrid(10, 10)
+    drone = Drone(Pose(0, 0), path=deque([Pose(0, 0), Pose(1, 0), Pose(2, 0)]))
+    grid.add(drone)
+    for _ in range(5):
+        grid.update()
+    assert drone.pose.coordinates_equal(Pose(2, 0))
+    assert grid.wakeups.is_idle(drone)
+
+
+@pytest.mark.parametrize('strategy', list(PathFindingStrategy))
+def test_drone_stops_chasing_removed_target(strategy):
+    grid = GameGrid(10, 10)
+    player = Player(Pose(2, 0))
+    drone = Drone(Pose(0, 0))
+    grid.add(player)
+    grid.add(drone)
+    drone.actively_path_find(player, strategy)
+    for _ in range(10):
+        grid.update()
+    grid.remove(player)
+    for _ in range(3):
+        grid.update()
+    assert not drone.actively_path_finding
+    assert grid.wakeups.is_idle(drone)
+    assert player not in grid.wakeups._on_move